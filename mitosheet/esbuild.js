@@ -6,6 +6,9 @@ esbuild
         outfile: 'mitosheet/mito_frontend.js',
         bundle: true,
         minify: true,
+        // The bundle defines the MitoFrontend global, so it only has to be loaded once per page
+        format: 'iife',
+        globalName: 'MitoFrontend',
         plugins: [],
         loader: {
             '.ttf': 'dataurl'
@@ -6,11 +6,15 @@
 """
 Contains handlers for the Mito API
 """
-from queue import Queue
-from threading import Thread
+from collections import deque
+from heapq import heapify, heappop, heappush
+from threading import Condition, Event, Thread
 from time import perf_counter
-from typing import Any, Callable, Dict, NoReturn, Optional
+from typing import Any, Callable, Deque, Dict, List, NoReturn, Optional, Set, Tuple
 
+from mitosheet.api.api_call_cancellation import (
+    ApiCallCancelledError, is_api_call_cancelled,
+    set_running_api_call_cancelled_event)
 from mitosheet.api.get_saved_analysis_code import get_saved_analysis_code
 from mitosheet.api.get_all_params_for_step_type import get_all_params_for_step_type
 from mitosheet.api.get_ai_completion import get_ai_completion
@@ -37,6 +41,8 @@ from mitosheet.api.get_render_count import get_render_count
 from mitosheet.api.get_search_matches import get_search_matches
 from mitosheet.api.get_split_text_to_columns_preview import \
     get_split_text_to_columns_preview
+from mitosheet.api.get_step_history_memory_footprint import \
+    get_step_history_memory_footprint
 from mitosheet.api.get_test_imports import get_test_imports
 from mitosheet.api.get_unique_value_counts import get_unique_value_counts
 from mitosheet.api.get_validate_snowflake_credentials import \
@@ -51,6 +57,37 @@ from mitosheet.user.location import is_dash, is_jupyterlite, is_streamlit
 # As the column summary statistics tab does three calls, we defaulted to this max
 MAX_QUEUED_API_CALLS = 3
 
+# The number of threads that handle API calls, so that a slow API call, like exporting
+# a large dataframe, does not block the other API calls behind it
+MAX_API_WORKERS = 4
+
+# API calls with a lower priority are handled first. The calls that the user is waiting on
+# as they use the sheet come before the default, and exports and other slow calls after it
+API_CALL_PRIORITIES: Dict[str, int] = {
+    'get_column_describe': 0,
+    'get_render_count': 0,
+    'get_search_matches': 0,
+    'get_unique_value_counts': 0,
+    'get_ai_completion': 2,
+    'get_dataframe_as_csv': 2,
+    'get_dataframe_as_excel': 2,
+    'get_pr_url_of_new_pr': 2,
+    'get_step_history_memory_footprint': 2,
+}
+DEFAULT_API_CALL_PRIORITY = 1
+
+# A newer API call of one of these types supersedes an older call of the same type with 
+# the same values of these params, e.g. a newer search of the same sheet. Superseded calls
+# are dropped if they are queued, and cancelled if they are running
+SUPERSEDING_API_CALL_PARAMS: Dict[str, List[str]] = {
+    'get_search_matches': ['sheet_index'],
+    'get_split_text_to_columns_preview': [],
+    'get_unique_value_counts': ['sheet_index', 'column_id'],
+}
+
+# The number of finished API calls we keep the timings of
+MAX_FINISHED_API_CALLS = 100
+
 # NOTE: BE CAREFUL WITH THIS. When in development mode, you can set it to False
 # so the API calls are handled in the main thread, to make printing easy.
 # In newer versions of JupyterLab, to see these print statements:
@@ -78,13 +115,45 @@ def get_api_should_be_threaded() -> bool:
 
 
 
+class ApiCall:
+    """
+    An API call that is handled by the API threads, along with when it was queued, started
+    and finished, and whether it has been cancelled.
+    """
+
+    def __init__(self, event: Dict[str, Any], sequence_number: int):
+        self.event = event
+        self.sequence_number = sequence_number
+        self.priority = API_CALL_PRIORITIES.get(event['type'], DEFAULT_API_CALL_PRIORITY)
+
+        superseding_params = SUPERSEDING_API_CALL_PARAMS.get(event['type'])
+        self.superseding_key: Optional[Tuple[Any, ...]] = (event['type'], *(str(event['params'].get(param)) for param in superseding_params)) if superseding_params is not None else None
+
+        self.cancelled_event = Event()
+        self.queued_time = perf_counter()
+        self.start_time: Optional[float] = None
+        self.end_time: Optional[float] = None
+
+    @property
+    def queue_wait_seconds(self) -> Optional[float]:
+        return self.start_time - self.queued_time if self.start_time is not None else None
+
+    @property
+    def run_seconds(self) -> Optional[float]:
+        return self.end_time - self.start_time if self.start_time is not None and self.end_time is not None else None
+
+
 class API:
     """
-    The API provides a wrapper around a thread that responds to API calls.
+    The API provides a wrapper around a pool of threads that respond to API calls.
 
     Some notes:
-    -   We allow at most MAX_QUEUED_API_CALLS API calls to be in the queue, which practically
-        Stops a backlog of calls from building up.
+    -   We allow at most MAX_QUEUED_API_CALLS API calls to be waiting for a thread, which practically
+        Stops a backlog of calls from building up. Calls are handled in order of their priority, 
+        and then in the order they were made.
+    -   A newer API call can supersede an older call, in which case the older call is dropped, or
+        cancelled if it is running. Running calls can check if they are cancelled with 
+        raise_if_api_call_cancelled.
     -   All API calls should only be reads. This stops us from having to worry
         about most concurrency issues
     -   Note that printing inside of a thread does not work properly! Use sys.stdout.flush() after the print statement.
@@ -92,34 +161,82 @@ class API:
     """
 
     def __init__(self, steps_manager: StepsManager, mito_backend: MitoWidgetType):
-        self.api_queue: Queue = Queue(MAX_QUEUED_API_CALLS)
+        # The queued API calls are a heap of (priority, sequence_number, api_call), and the condition
+        # guards the queued and running API calls, and notifies the threads of new calls
+        self.queued_api_calls: List[Tuple[int, int, ApiCall]] = []
+        self.running_api_calls: Set[ApiCall] = set()
+        self.finished_api_calls: Deque[ApiCall] = deque(maxlen=MAX_FINISHED_API_CALLS)
+        self.api_calls_condition = Condition()
+        self.num_api_calls = 0
 
         # Save some variables for ease
         self.steps_manager = steps_manager
         self.mito_backend = mito_backend
 
-        self.thread: Optional[Thread] = None
+        self.threads: List[Thread] = []
         self.had_first_api_call = False
 
-    def start_api_thread(self) -> None:
-        # Note that we make the thread a daemon thread, which practically means that when
-        # The process that starts this thread terminate, our API will terminate as well.
-        self.thread = Thread(
-            target=handle_api_event_thread,
-            args=(self.api_queue, self.steps_manager, self.mito_backend),
-            daemon=True,
-        )
+    def start_api_threads(self) -> None:
+        # Note that we make the threads daemon threads, which practically means that when
+        # The process that starts these threads terminate, our API will terminate as well.
+        for _ in range(MAX_API_WORKERS):
+            thread = Thread(
+                target=self.handle_api_calls,
+                daemon=True,
+            )
+            thread.start()
+            self.threads.append(thread)
+
+    def handle_api_calls(self) -> NoReturn:
+        """
+        This is the worker thread function, that actually is
+        responsible for handling the API calls.
 
-        self.thread.start()
+        It lives forever, and just handles API calls as they 
+        are queued
+        """
+        while True:
+            # Note that this blocks when there are no queued calls, and waits 
+            # till there is one - so no infinite loop as it is waiting!
+            with self.api_calls_condition:
+                while len(self.queued_api_calls) == 0:
+                    self.api_calls_condition.wait()
+                _, _, api_call = heappop(self.queued_api_calls)
+                self.running_api_calls.add(api_call)
+
+            api_call.start_time = perf_counter()
+            set_running_api_call_cancelled_event(api_call.cancelled_event)
+            # We place the API handling inside of a try catch,
+            # because otherwise if an error is thrown, then the entire thread crashes,
+            # and then the API never works again
+            try:
+                handle_api_event(self.mito_backend.mito_send, api_call.event, self.steps_manager)
+            except:
+                # Log in error if it occurs
+                log_event_processed(api_call.event, self.steps_manager, failed=True)
+            finally:
+                set_running_api_call_cancelled_event(None)
+                api_call.end_time = perf_counter()
+                with self.api_calls_condition:
+                    self.running_api_calls.discard(api_call)
+                    self.finished_api_calls.append(api_call)
+
+    def drop_queued_api_call(self, api_call: ApiCall) -> None:
+        """
+        Removes a call from the queue, and responds to it with None. The caller must hold the api_calls_condition.
+        """
+        self.queued_api_calls = [queued_api_call for queued_api_call in self.queued_api_calls if queued_api_call[2] is not api_call]
+        heapify(self.queued_api_calls)
+        self.mito_backend.mito_send({"event": "api_response", "id": api_call.event["id"], "data": None})
 
 
     def process_new_api_call(self, event: Dict[str, Any]) -> None:
         """
         We privilege new API calls over old calls, and evict the old ones
-        if the API queue is full.
+        if the API queue is full, starting with those with the lowest priority.
 
-        Because we are using a queue, only events that have not been started
-        being processed will get removed.
+        Only calls that have not been started being processed will get removed. 
+        Running calls that are superseded by this call are cancelled instead.
 
         If the key 'priority' is in the event, then we handle it in the main
         thread, as we don't want to drop the event. For example, lazy loading
@@ -129,8 +246,8 @@ class API:
         global THREADED
 
         if not self.had_first_api_call:
-            if self.thread is None and get_api_should_be_threaded():
-                self.start_api_thread()
+            if len(self.threads) == 0 and get_api_should_be_threaded():
+                self.start_api_threads()
                 THREADED = True
             else:
                 THREADED = False
@@ -138,43 +255,29 @@ class API:
             self.had_first_api_call = True
 
         if THREADED and "priority" not in event:
-
-            if self.api_queue.full():
-                # If the queue is full, we drop the first event, and just return a None
-                lost_event = self.api_queue.get()
-
-                self.mito_backend.mito_send({"event": "api_response", "id": lost_event["id"], "data": None})
-
-            self.api_queue.put(event)
+            with self.api_calls_condition:
+                api_call = ApiCall(event, self.num_api_calls)
+                self.num_api_calls += 1
+
+                if api_call.superseding_key is not None:
+                    for _, _, queued_api_call in list(self.queued_api_calls):
+                        if queued_api_call.superseding_key == api_call.superseding_key:
+                            self.drop_queued_api_call(queued_api_call)
+                    for running_api_call in self.running_api_calls:
+                        if running_api_call.superseding_key == api_call.superseding_key:
+                            running_api_call.cancelled_event.set()
+
+                if len(self.queued_api_calls) >= MAX_QUEUED_API_CALLS:
+                    # If the queue is full, we drop the oldest call with the lowest priority, and just return a None
+                    _, _, lost_api_call = max(self.queued_api_calls, key=lambda queued_api_call: (queued_api_call[0], -queued_api_call[1]))
+                    self.drop_queued_api_call(lost_api_call)
+
+                heappush(self.queued_api_calls, (api_call.priority, api_call.sequence_number, api_call))
+                self.api_calls_condition.notify()
         else:
             handle_api_event(self.mito_backend.mito_send, event, self.steps_manager)
 
 
-def handle_api_event_thread(
-    queue: Queue, steps_manager: StepsManager, mito_backend: MitoWidgetType
-) -> NoReturn:
-    """
-    This is the worker thread function, that actually is
-    responsible for handling at the API call events.
-
-    It lives forever, and just handles events as it
-    receives them from the queue
-    """
-    while True:
-        # Note that this blocks when there is nothing in the queue,
-        # and waits till there is something there - so no infinite
-        # loop as it is waiting!
-        event = queue.get()
-        # We place the API handling inside of a try catch,
-        # because otherwise if an error is thrown, then the entire thread crashes,
-        # and then the API never works again
-        try:
-            handle_api_event(mito_backend.mito_send, event, steps_manager)
-        except:
-            # Log in error if it occurs
-            log_event_processed(event, steps_manager, failed=True)
-
-
 def handle_api_event(
     send: Callable, event: Dict[str, Any], steps_manager: StepsManager
 ) -> None:
@@ -239,12 +342,20 @@ def handle_api_event(
             result = get_pr_url_of_new_pr(params, steps_manager)
         elif event["type"] == "get_saved_analysis_code":
             result = get_saved_analysis_code(params, steps_manager)
+        elif event["type"] == "get_step_history_memory_footprint":
+            result = get_step_history_memory_footprint(params, steps_manager)
         # AUTOGENERATED LINE: API.PY CALL (DO NOT DELETE)
         else:
             raise Exception(f"Event: {event} is not a valid API call")
 
+    except ApiCallCancelledError:
+        pass
     except:
         failed = True
+
+    # If the call was cancelled while it was running, no one is waiting for its result
+    if is_api_call_cancelled():
+        result = None
     
     # Log processing this event (with potential failure)
     log_event_processed(event, steps_manager, failed=failed, start_time=start_time)
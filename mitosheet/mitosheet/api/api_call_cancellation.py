@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Lets long running API calls check if they have been cancelled, for example
+because a newer call of the same type superseded them, so that they can
+stop early rather than computing a result that will not be used.
+"""
+from threading import Event, local
+from typing import Optional
+
+_running_api_call = local()
+
+
+class ApiCallCancelledError(Exception):
+    """
+    Raised inside an API call that has been cancelled. The API call then
+    responds with no data.
+    """
+    pass
+
+
+def set_running_api_call_cancelled_event(cancelled_event: Optional[Event]) -> None:
+    """
+    Sets the event that is set once the API call running on this thread is cancelled.
+    """
+    _running_api_call.cancelled_event = cancelled_event
+
+
+def is_api_call_cancelled() -> bool:
+    cancelled_event: Optional[Event] = getattr(_running_api_call, 'cancelled_event', None)
+    return cancelled_event is not None and cancelled_event.is_set()
+
+
+def raise_if_api_call_cancelled() -> None:
+    """
+    API calls can call this between units of work, to stop once they are cancelled.
+    """
+    if is_api_call_cancelled():
+        raise ApiCallCancelledError()
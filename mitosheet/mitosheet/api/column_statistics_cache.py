@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Contains the cache of the statistics that the column panel shows, which
+are shared by the get_unique_value_counts, get_column_describe and
+get_column_summary_graph API calls.
+"""
+from threading import Lock, RLock
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+from mitosheet.cache_utils import DataframeRef, get_dataframe_ref, is_same_column_data, is_same_dataframe
+from mitosheet.is_type_utils import is_number_dtype
+from mitosheet.types import ColumnID
+
+# The most columns we cache statistics for at once, so that we don't hold onto the data of many columns
+MAX_CACHED_COLUMN_STATISTICS = 20
+
+
+class ColumnStatistics():
+    """
+    The statistics of a single version of a column. Each statistic is computed
+    the first time it is needed, and then reused.
+    """
+
+    def __init__(self, column: pd.Series):
+        self.column = column
+
+        # The column panel makes its API calls at once, and they are handled on different
+        # threads, so the lock makes sure that each statistic is only computed once
+        self.lock = RLock()
+
+        self._value_counts: Optional[pd.Series] = None
+        self._unique_value_counts_df: Optional[pd.DataFrame] = None
+        self._sorted_unique_value_counts_dfs: Dict[str, pd.DataFrame] = dict()
+        self._describe_obj: Optional[Dict[str, str]] = None
+
+    def get_value_counts(self) -> pd.Series:
+        """
+        Returns the count of each value in the column, including missing values, from most to least common.
+        """
+        with self.lock:
+            if self._value_counts is None:
+                self._value_counts = self.column.value_counts(dropna=False)
+            return self._value_counts
+
+    def get_unique_value_counts_df(self) -> pd.DataFrame:
+        """
+        Returns a dataframe with the values, the percent of the column that has each value, and
+        the count of each value, indexed by the values.
+        """
+        with self.lock:
+            if self._unique_value_counts_df is None:
+                value_counts = self.get_value_counts()
+                self._unique_value_counts_df = pd.DataFrame({
+                    'values': value_counts.index,
+                    'percents': value_counts / value_counts.sum(),
+                    'counts': value_counts
+                })
+            return self._unique_value_counts_df
+
+    def get_sorted_unique_value_counts_df(self, sort: str) -> pd.DataFrame:
+        """
+        Returns the unique value counts dataframe sorted in the given order, with
+        the values_strings column added so that it can be searched.
+        """
+        with self.lock:
+            if sort in self._sorted_unique_value_counts_dfs:
+                return self._sorted_unique_value_counts_dfs[sort]
+
+            sorted_unique_value_counts_df = self.get_unique_value_counts_df().copy(deep=True)
+            sorted_unique_value_counts_df['values_strings'] = sorted_unique_value_counts_df['values'].astype('str')
+
+            try:
+                if sort == 'Ascending Value':
+                    sorted_unique_value_counts_df = sorted_unique_value_counts_df.sort_values(by='values', ascending=True, na_position='first')
+                elif sort == 'Descending Value':
+                    sorted_unique_value_counts_df = sorted_unique_value_counts_df.sort_values(by='values', ascending=False, na_position='first')
+                elif sort == 'Ascending Occurence':
+                    sorted_unique_value_counts_df = sorted_unique_value_counts_df.sort_values(by='counts', ascending=True, na_position='first')
+                elif sort == 'Descending Occurence':
+                    sorted_unique_value_counts_df = sorted_unique_value_counts_df.sort_values(by='counts', ascending=False, na_position='first')
+            except:
+                # If the sort values throws an exception, then this must be because we have a mixed value type, and so we instead
+                # sort on the string representation of the values (as this will always work)
+                if sort == 'Ascending Value':
+                    sorted_unique_value_counts_df = sorted_unique_value_counts_df.sort_values(by='values_strings', ascending=True, na_position='first')
+                elif sort == 'Descending Value':
+                    sorted_unique_value_counts_df = sorted_unique_value_counts_df.sort_values(by='values_strings', ascending=False, na_position='first')
+
+            self._sorted_unique_value_counts_dfs[sort] = sorted_unique_value_counts_df
+            return sorted_unique_value_counts_df
+
+    def get_describe_obj(self) -> Dict[str, str]:
+        """
+        Returns all the results from the .describe function for the column, as
+        well as some other statistics, with all of them turned into strings.
+        """
+        with self.lock:
+            if self._describe_obj is not None:
+                return self._describe_obj
+
+            column_dtype = str(self.column.dtype)
+            describe = self.column.describe()
+
+            describe_obj = {}
+
+            for index, row in describe.items():
+                # We turn all the items to strings, as some items are not valid JSON
+                # e.g. some wacky numpy datatypes. This allows us to send all of this
+                # to the front-end.
+
+                # If the series is a number, round the statistics so they look good.
+                if is_number_dtype(column_dtype):
+                    row = round(row, 2)
+
+                describe_obj[index] = str(row)
+
+            # We fill in some specific values that dont get filled by default
+            describe_obj['count: NaN'] = str(self.column.isna().sum())
+
+            # NOTE: be careful adding things here, as we dont want to destroy performance
+            if is_number_dtype(column_dtype):
+                describe_obj['median'] = str(round(self.column.median(), 2))
+                describe_obj['sum'] = str(round(self.column.sum(), 2))
+
+            self._describe_obj = describe_obj
+            return describe_obj
+
+
+class ColumnStatisticsCache():
+    """
+    Caches the ColumnStatistics of each column that is opened in the column panel,
+    so that the API calls that the panel makes share them, and so that they are only
+    recomputed once a step changes the data in the column.
+    """
+
+    def __init__(self) -> None:
+        # Maps from the (sheet_index, column_id) to a reference to the dataframe the column was in, and its statistics
+        self.column_statistics: Dict[Tuple[int, ColumnID], Tuple[DataframeRef, ColumnStatistics]] = dict()
+        # API calls are handled on different threads, so the lock makes sure calls for the same column share one entry
+        self.lock = Lock()
+
+    def get_column_statistics(self, sheet_index: int, column_id: ColumnID, df: pd.DataFrame, column: pd.Series) -> ColumnStatistics:
+        with self.lock:
+            key = (sheet_index, column_id)
+            if key in self.column_statistics:
+                df_ref, column_statistics = self.column_statistics[key]
+                if is_same_dataframe(df_ref, df) or is_same_column_data(column_statistics.column, column):
+                    self.column_statistics[key] = (get_dataframe_ref(df), column_statistics)
+                    return column_statistics
+
+            column_statistics = ColumnStatistics(column)
+
+            self.column_statistics.pop(key, None)
+            if len(self.column_statistics) >= MAX_CACHED_COLUMN_STATISTICS:
+                # Remove the statistics that were cached first
+                del self.column_statistics[next(iter(self.column_statistics))]
+            self.column_statistics[key] = (get_dataframe_ref(df), column_statistics)
+
+            return column_statistics
@@ -9,6 +9,7 @@ import pandas as pd
 from typing import Any, Dict, List, Optional
 import plotly.express as px
 import plotly.graph_objects as go
+from mitosheet.api.column_statistics_cache import ColumnStatistics
 from mitosheet.step_performers.graph_steps.graph_utils import (
     get_html_and_script_from_figure,
 )
@@ -37,10 +38,12 @@ def get_column_summary_graph(params: Dict[str, Any], steps_manager: StepsManager
 
 
     # Create a copy of the dataframe, just for safety.
-    df: pd.DataFrame = steps_manager.dfs[sheet_index].copy()
+    # The graph does not modify the dataframe, so we don't need to copy it
+    df: pd.DataFrame = steps_manager.dfs[sheet_index]
 
     column_header = steps_manager.curr_step.final_defined_state.column_ids.get_column_header_by_id(sheet_index, column_id)
-    fig = _get_column_summary_graph(df, column_header)
+    column_statistics = steps_manager.column_statistics_cache.get_column_statistics(sheet_index, column_id, df, df[column_header])
+    fig = _get_column_summary_graph(df, column_header, column_statistics)
         
     # Get rid of some of the default white space
     fig.update_layout(
@@ -60,6 +63,7 @@ def filter_df_to_top_unique_values_in_series(
     df: pd.DataFrame,
     main_series: pd.Series,
     num_unique_values: int,
+    value_counts_series: Optional[pd.Series] = None,
 ) -> pd.Series:
     """
     Helper function for filtering the dataframe down to the top most common
@@ -69,15 +73,22 @@ def filter_df_to_top_unique_values_in_series(
     The function filters the entire dataframe to make sure that the columns stay
     the same length (which is necessary if you want to graph them).
 
+    If the value counts of the main_series are already computed, they can be passed
+    as value_counts_series, which can include the count of missing values.
+
     It returns the filtered dataframe
     """
+    if value_counts_series is None:
+        value_counts_series = main_series.value_counts()
+    else:
+        value_counts_series = value_counts_series[value_counts_series.index.notna()]
+
     if (
         len(main_series) < num_unique_values
-        or main_series.nunique() < num_unique_values
+        or len(value_counts_series) < num_unique_values
     ):
         return df
 
-    value_counts_series = main_series.value_counts()
     most_frequent_values_list = value_counts_series.head(
         n=num_unique_values
     ).index.tolist()
@@ -85,7 +96,7 @@ def filter_df_to_top_unique_values_in_series(
     return df[main_series.isin(most_frequent_values_list)]
 
 
-def _get_column_summary_graph(df: pd.DataFrame, column_header: ColumnHeader) -> go.Figure:
+def _get_column_summary_graph(df: pd.DataFrame, column_header: ColumnHeader, column_statistics: Optional[ColumnStatistics]=None) -> go.Figure:
     """
     One Axis Graphs heuristics:
     1. Number Column - we do no filtering. These graphs are pretty efficient up to 1M rows
@@ -99,9 +110,11 @@ def _get_column_summary_graph(df: pd.DataFrame, column_header: ColumnHeader) ->
 
     filtered = False
     if not is_number_dtype(column_dtype):
-        if series.nunique() > MAX_UNIQUE_NON_NUMBER_VALUES:
+        # The value counts are shared with the other column statistics, when we have them
+        value_counts_series = column_statistics.get_value_counts() if column_statistics is not None else series.value_counts(dropna=False)
+        if value_counts_series.index.notna().sum() > MAX_UNIQUE_NON_NUMBER_VALUES:
             df = filter_df_to_top_unique_values_in_series(
-                df, series, MAX_UNIQUE_NON_NUMBER_VALUES
+                df, series, MAX_UNIQUE_NON_NUMBER_VALUES, value_counts_series
             )
             # Set series as the newly filtered series
             series = df[column_header]
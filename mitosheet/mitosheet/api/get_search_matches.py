@@ -3,48 +3,108 @@
 
 # Copyright (c) Saga Inc.
 # Distributed under the terms of the GPL License.
-import re
+from threading import Lock
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
 import pandas as pd
-from typing import Any, Dict
+from mitosheet.api.api_call_cancellation import raise_if_api_call_cancelled
+from mitosheet.cache_utils import DataframeRef, get_dataframe_ref, is_same_column_data, is_same_dataframe
 from mitosheet.types import StepsManagerType
+from mitosheet.utils import MAX_ROWS
 
 
-def get_search_matches(params: Dict[str, Any], steps_manager: StepsManagerType) -> Any:
+def _get_lowercase_strings(values: pd.Series) -> pd.Series:
     """
-    Finds the number of matches to a given search value in the dataframe.
+    Returns str(value).lower() for each of the values.
     """
-    sheet_index = params['sheet_index']
-    search_value = params['search_value']
-    df = steps_manager.dfs[sheet_index]
+    if isinstance(values.dtype, np.dtype) and values.dtype.kind in 'biuf':
+        # Numpy formats numbers the same way that str does, but much faster
+        strings = values.to_numpy().astype(str)
+    else:
+        strings = [str(value) for value in values.tolist()]
+    return pd.Series(strings, dtype=object).str.lower()
+
 
-    # First, generate a count for each value in the dataframe:
-    unique_value_counts = df.stack().value_counts()
+class ColumnSearchView():
+    """
+    The lowercased strings of the values in a column, as they are searched. We keep
+    the count of each unique value, so that counting the matches only has to search
+    each unique value once, and the values in the rows shown in the editor, so that
+    we can find the cells to highlight.
+    """
+
+    def __init__(self, column: pd.Series):
+        self.column = column
 
-    escaped_search_value = re.escape(search_value)
+        # Missing values are not counted as matches
+        value_counts = column.value_counts()
+        self.unique_values = _get_lowercase_strings(pd.Series(value_counts.index).astype(column.dtype))
+        self.unique_value_counts = value_counts.to_numpy()
+        self.shown_values = _get_lowercase_strings(column.iloc[:MAX_ROWS])
 
-    # Use the same regex for all searching
-    search_regex = re.compile(escaped_search_value, re.IGNORECASE)
 
-    # Then, filter for the search value:
-    matches = unique_value_counts.filter(regex=search_regex, axis=0)
+class SearchMatchesCache():
+    """
+    Caches the ColumnSearchViews of the sheets that are searched, so that each
+    keystroke in the search bar only has to match against them. When a sheet is
+    edited, only the views of the columns whose data changed are rebuilt.
+    """
+
+    def __init__(self) -> None:
+        # Maps from the sheet index to a reference to the dataframe that was searched and its column search views
+        self.sheets: Dict[int, Tuple[DataframeRef, List[ColumnSearchView]]] = dict()
+        # Searches are handled on different threads, so the lock makes sure they build each view only once
+        self.lock = Lock()
 
-    # Then, sum the matches:
-    total_number_matches = int(matches.sum())
+    def get_column_search_views(self, sheet_index: int, df: pd.DataFrame) -> List[ColumnSearchView]:
+        with self.lock:
+            cached_df_ref_and_views = self.sheets.get(sheet_index)
+            if cached_df_ref_and_views is not None and is_same_dataframe(cached_df_ref_and_views[0], df):
+                return cached_df_ref_and_views[1]
 
-    # Then, add the column names to the matches:
-    total_number_matches += len([col for col in df.columns if re.search(search_regex,str(col)) is not None])
+            cached_views = cached_df_ref_and_views[1] if cached_df_ref_and_views is not None else []
+            column_search_views = []
+            for column_index in range(len(df.columns)):
+                column = df.iloc[:, column_index]
+                if column_index < len(cached_views) and is_same_column_data(cached_views[column_index].column, column):
+                    column_search_views.append(cached_views[column_index])
+                else:
+                    column_search_views.append(ColumnSearchView(column))
 
-    # Get the number of rows and columns so that we don't have to calculate the length in each iteration
-    num_rows = len(df.index)
-    num_cols = len(df.columns)
+            self.sheets[sheet_index] = (get_dataframe_ref(df), column_search_views)
+            return column_search_views
 
-    # Find the indices of cells containing the search value
-    # Only search the first 1500 rows because the editor only shows the first 1500 rows. 
-    cell_matches = [{'rowIndex': i, 'colIndex': j} for i in range(min(1500, num_rows)) for j in range(num_cols) if (re.search(search_regex,str(df.iat[i, j])) is not None)]
+
+def get_search_matches(params: Dict[str, Any], steps_manager: StepsManagerType) -> Any:
+    """
+    Finds the number of matches to a given search value in the dataframe.
+    """
+    sheet_index = params['sheet_index']
+    search_value = params['search_value'].lower()
+    df = steps_manager.dfs[sheet_index]
+
+    column_search_views = steps_manager.search_matches_cache.get_column_search_views(sheet_index, df)
+
+    # Count the matches in each column, and find the cells containing the search value. We only
+    # search the first 1500 rows for the cells, because the editor only shows the first 1500 rows.
+    total_number_matches = 0
+    shown_cell_matches = np.zeros((min(MAX_ROWS, len(df.index)), len(df.columns)), dtype=bool)
+    for column_index, column_search_view in enumerate(column_search_views):
+        # Stop if a newer search has superseded this one
+        raise_if_api_call_cancelled()
+        unique_value_matches = column_search_view.unique_values.str.contains(search_value, regex=False).to_numpy(dtype=bool)
+        total_number_matches += int(column_search_view.unique_value_counts[unique_value_matches].sum())
+        shown_cell_matches[:, column_index] = column_search_view.shown_values.str.contains(search_value, regex=False).to_numpy(dtype=bool)
 
     # Find the indices of columns containing the search value
-    column_matches = [{'rowIndex': -1, 'colIndex': j} for j, column in enumerate(df.columns) if (re.search(search_regex,str(column)) is not None)]
-    
+    column_matches = [{'rowIndex': -1, 'colIndex': j} for j, column in enumerate(df.columns) if search_value in str(column).lower()]
+    total_number_matches += len(column_matches)
+
+    # The cells are in order of their row, and then their column
+    row_indexes, column_indexes = np.nonzero(shown_cell_matches)
+    cell_matches = [{'rowIndex': i, 'colIndex': j} for i, j in zip(row_indexes.tolist(), column_indexes.tolist())]
+
     # We want the columns to come first
     all_matches = column_matches + cell_matches
-    return {'total_number_matches': total_number_matches, 'matches': all_matches }
\ No newline at end of file
+    return {'total_number_matches': total_number_matches, 'matches': all_matches }
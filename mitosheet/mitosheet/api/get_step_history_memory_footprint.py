@@ -0,0 +1,12 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+
+from typing import Any, Dict
+from mitosheet.types import StepHistoryMemoryFootprint, StepsManagerType
+
+
+def get_step_history_memory_footprint(params: Dict[str, Any], steps_manager: StepsManagerType) -> StepHistoryMemoryFootprint:
+    return steps_manager.get_step_history_memory_footprint()
@@ -3,10 +3,8 @@
 
 # Copyright (c) Saga Inc.
 # Distributed under the terms of the GPL License.
-import json
 from typing import Any, Dict
 
-import pandas as pd
 from mitosheet.types import StepsManagerType
 from mitosheet.utils import get_row_data_array
 
@@ -35,40 +33,17 @@ def get_unique_value_counts(params: Dict[str, Any], steps_manager: StepsManagerT
 
     column_header = steps_manager.curr_step.column_ids.get_column_header_by_id(sheet_index, column_id)
     
-    series: pd.Series = steps_manager.dfs[sheet_index][column_header]
+    df = steps_manager.dfs[sheet_index]
+    column_statistics = steps_manager.column_statistics_cache.get_column_statistics(sheet_index, column_id, df, df[column_header])
 
-    unique_value_counts_percents_series = series.value_counts(normalize=True, dropna=False)
-    unique_value_counts_series = series.value_counts(dropna=False)
-    
-    unique_value_counts_df = pd.DataFrame({
-        'values': unique_value_counts_percents_series.index,
-        'percents': unique_value_counts_percents_series, 
-        'counts': unique_value_counts_series
-    })
+    # The value counts, and the sorted value counts, are computed once for each version of the
+    # column, so that each keystroke in the search only has to filter them
+    unique_value_counts_df = column_statistics.get_unique_value_counts_df()
 
     if len(unique_value_counts_df) > MAX_UNIQUE_VALUES:
-        # First, we turn the series into a string series, so that we can
-        # easily filter on it without issues (and sort in some cases)
-        new_unique_value_counts_df = unique_value_counts_df.copy(deep=True)
-        new_unique_value_counts_df['values_strings'] = new_unique_value_counts_df['values'].astype('str')
-
-        # First, we sort in the order they want
-        try:
-            if sort == 'Ascending Value':
-                new_unique_value_counts_df = new_unique_value_counts_df.sort_values(by='values', ascending=True, na_position='first')
-            elif sort == 'Descending Value':
-                new_unique_value_counts_df = new_unique_value_counts_df.sort_values(by='values', ascending=False, na_position='first')
-            elif sort == 'Ascending Occurence':
-                new_unique_value_counts_df = new_unique_value_counts_df.sort_values(by='counts', ascending=True, na_position='first')
-            elif sort == 'Descending Occurence':
-                new_unique_value_counts_df = new_unique_value_counts_df.sort_values(by='counts', ascending=False, na_position='first')
-        except:
-            # If the sort values throws an exception, then this must be because we have a mixed value type, and so we instead
-            # sort on the string representation of the values (as this will always work)
-            if sort == 'Ascending Value':
-                new_unique_value_counts_df = new_unique_value_counts_df.sort_values(by='values_strings', ascending=True, na_position='first')
-            elif sort == 'Descending Value':
-                new_unique_value_counts_df = new_unique_value_counts_df.sort_values(by='values_strings', ascending=False, na_position='first')
+        # The values are turned into strings, so that we can easily filter on them without 
+        # issues, and are sorted in the order they want
+        new_unique_value_counts_df = column_statistics.get_sorted_unique_value_counts_df(sort)
 
         # Then, we filter with the string. Note that we always filter on the string representation
         # because the front-end sends a string
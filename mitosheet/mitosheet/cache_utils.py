@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Helpers for the caches of values that are computed from the dataframes in a sheet.
+
+The dataframes in the step history are never modified in place, as each step creates
+new dataframes for the sheets it changes. So a value computed from a dataframe is valid
+for as long as that same dataframe is alive, which we check with a weak reference, so
+that the cache does not keep the dataframe alive. Once a step creates a new dataframe,
+a value computed from one of its columns is only still valid if the data in the column
+did not change, which we check by comparing the column to the one the value was computed from.
+"""
+import weakref
+from typing import Callable, Optional
+
+import pandas as pd
+
+# A weak reference to a dataframe, which returns the dataframe, or None once it is no longer alive
+DataframeRef = Callable[[], Optional[pd.DataFrame]]
+
+
+def get_dataframe_ref(df: pd.DataFrame) -> DataframeRef:
+    return weakref.ref(df)
+
+
+def is_same_dataframe(df_ref: Optional[DataframeRef], df: pd.DataFrame) -> bool:
+    """
+    Returns True if the reference is to this dataframe, and so values computed from
+    the dataframe it references are still valid.
+    """
+    return df_ref is not None and df_ref() is df
+
+
+def is_same_column_data(cached_column: pd.Series, column: pd.Series) -> bool:
+    """
+    Returns True if the column has the same data and index as the column that a
+    cached value was computed from, and so the cached value is still valid.
+    """
+    return cached_column is column or (cached_column.equals(column) and cached_column.index.equals(column.index))
@@ -111,6 +111,24 @@ class ColumnIDMap():
                 self.column_id_to_column_header[sheet_index][column_id] = column_header
                 self.column_header_to_column_id[sheet_index][column_header] = column_id
 
+    def copy_on_write(self, modified_sheet_indexes: Collection[int]) -> "ColumnIDMap":
+        """
+        Returns a copy of this map that shares the per-sheet mappings with this
+        map for every sheet that is not in modified_sheet_indexes. Only the
+        mappings of the modified sheets are copied, so they can be edited
+        without changing this map.
+        """
+        new_column_id_map = ColumnIDMap([])
+        new_column_id_map.column_id_to_column_header = [
+            dict(column_id_to_column_header) if sheet_index in modified_sheet_indexes else column_id_to_column_header
+            for sheet_index, column_id_to_column_header in enumerate(self.column_id_to_column_header)
+        ]
+        new_column_id_map.column_header_to_column_id = [
+            dict(column_header_to_column_id) if sheet_index in modified_sheet_indexes else column_header_to_column_id
+            for sheet_index, column_header_to_column_id in enumerate(self.column_header_to_column_id)
+        ]
+        return new_column_id_map
+
     def set_column_header(self, sheet_index: int, column_id: ColumnID, column_header: ColumnHeader) -> None:
         """
         Sets a column id and column header to match to eachother. 
@@ -7,6 +7,7 @@
 from ast import List
 import datetime
 import pprint
+from functools import lru_cache
 from typing import Any, Callable, Dict, Optional, Union
 import os
 from mitosheet.enterprise.license_key import decode_license_to_date
@@ -151,6 +152,13 @@ def create_mec_from_environment_variables() -> Optional[Dict[str, Any]]:
 
     return mec
 
+@lru_cache(maxsize=None)
+def get_license_expiration_date(license_key: str) -> datetime.date:
+    """
+    Decodes the license key once, as we check if the user is on enterprise many times per event.
+    """
+    return decode_license_to_date(license_key)
+
 def get_enterprise_from_config(mito_config_enterprise: Optional[str], mito_config_enterprise_temp_license: Optional[str]) -> bool:
     
     if mito_config_enterprise is None and mito_config_enterprise_temp_license is None:
@@ -165,7 +173,7 @@ def get_enterprise_from_config(mito_config_enterprise: Optional[str], mito_confi
     
     enterprise_temp_license_string = mito_config_enterprise_temp_license
     if enterprise_temp_license_string is not None:
-        enterprise_temp_license_date = decode_license_to_date(enterprise_temp_license_string)
+        enterprise_temp_license_date = get_license_expiration_date(enterprise_temp_license_string)
         enterprise_temp_license = enterprise_temp_license_date > datetime.date.today()
         return enterprise_temp_license
     
@@ -0,0 +1,128 @@
+import atexit
+import threading
+from collections import deque
+from time import perf_counter
+from typing import Any, Deque, Dict, List, Optional
+
+import requests
+
+from mitosheet.user.location import is_jupyterlite
+
+# The most analytics events we hold while they wait to be sent. If the analytics
+# url is slow or down, we drop the oldest events rather than hold on to all of them
+MAX_QUEUED_ANALYTICS_EVENTS = 1000
+
+# The most analytics events that the sender thread takes from the queue at once
+MAX_ANALYTICS_EVENTS_PER_BATCH = 100
+
+# How long we wait for the analytics url to respond to each event
+ANALYTICS_REQUEST_TIMEOUT_SECONDS = 10
+
+# How long we wait for the queued events to be sent when the kernel or script exits
+MAX_FLUSH_SECONDS_ON_EXIT = 5
+
+# JupyterLite does not support threads, so there we send the events as they are logged
+ANALYTICS_SENDER_IS_THREADED = not is_jupyterlite()
+
+
+class MitoAnalyticsSender:
+    """
+    The MitoAnalyticsSender is responsible for sending analytics events to the
+    custom analytics url set in the MITO_CONFIG.
+
+    Logging an event only adds it to a queue, and a background thread sends the
+    queued events in batches over a single session, so that a slow analytics url
+    does not slow down editing the mitosheet. Each event is still sent in its own
+    request, as the analytics url expects.
+    """
+    def __init__(self, analytics_url: str):
+        self.analytics_url = analytics_url
+        self.session = requests.Session()
+
+        # The condition guards the queued events, and if the thread is sending events
+        self.condition = threading.Condition()
+        self.queued_events: Deque[Dict[str, Any]] = deque(maxlen=MAX_QUEUED_ANALYTICS_EVENTS)
+        self.sending = False
+        self.num_dropped_events = 0
+
+        if ANALYTICS_SENDER_IS_THREADED:
+            self.send_thread = threading.Thread(target=self.__run_send, daemon=True)
+            self.send_thread.start()
+
+    def send(self, event: Dict[str, Any]) -> None:
+        """
+        Adds the event to the queue of events to be sent, dropping the oldest
+        queued event if the queue is full.
+        """
+        if not ANALYTICS_SENDER_IS_THREADED:
+            self.__send_events([event])
+            return
+
+        with self.condition:
+            if len(self.queued_events) == self.queued_events.maxlen:
+                self.num_dropped_events += 1
+            self.queued_events.append(event)
+            self.condition.notify_all()
+
+    def flush(self, timeout: Optional[float]=None) -> bool:
+        """
+        Waits for all of the queued events to be sent. Returns False if they
+        were not sent within the timeout.
+        """
+        with self.condition:
+            return self.condition.wait_for(lambda: len(self.queued_events) == 0 and not self.sending, timeout)
+
+    def __send_events(self, events: List[Dict[str, Any]]) -> None:
+        # NOTE: in JupyterLite, only requests.post is patched to work, and not the session
+        post = self.session.post if ANALYTICS_SENDER_IS_THREADED else requests.post
+        for event in events:
+            try:
+                post(
+                    self.analytics_url,
+                    json=event,
+                    timeout=ANALYTICS_REQUEST_TIMEOUT_SECONDS
+                )
+            except Exception:
+                # Failing to send analytics should never break the mitosheet
+                pass
+
+    def __run_send(self) -> None:
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: len(self.queued_events) > 0)
+                events = [self.queued_events.popleft() for _ in range(min(len(self.queued_events), MAX_ANALYTICS_EVENTS_PER_BATCH))]
+                self.sending = True
+                self.condition.notify_all()
+
+            self.__send_events(events)
+
+            with self.condition:
+                self.sending = False
+                self.condition.notify_all()
+
+
+# There is one sender for each analytics url, so that all mitosheets share its thread and session
+_mito_analytics_senders: Dict[str, MitoAnalyticsSender] = {}
+_mito_analytics_senders_lock = threading.Lock()
+
+def get_mito_analytics_sender(analytics_url: str) -> MitoAnalyticsSender:
+    with _mito_analytics_senders_lock:
+        if analytics_url not in _mito_analytics_senders:
+            _mito_analytics_senders[analytics_url] = MitoAnalyticsSender(analytics_url)
+        return _mito_analytics_senders[analytics_url]
+
+
+def flush_mito_analytics_senders() -> None:
+    """
+    Sends the queued events of all the senders. As the sender threads are daemon threads,
+    the events that are still queued when the kernel or script exits are otherwise lost.
+    """
+    with _mito_analytics_senders_lock:
+        mito_analytics_senders = list(_mito_analytics_senders.values())
+
+    end_time = perf_counter() + MAX_FLUSH_SECONDS_ON_EXIT
+    for mito_analytics_sender in mito_analytics_senders:
+        mito_analytics_sender.flush(timeout=max(end_time - perf_counter(), 0))
+
+
+atexit.register(flush_mito_analytics_senders)
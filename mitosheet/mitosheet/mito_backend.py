@@ -7,14 +7,14 @@
 """
 Main file containing the mito widget.
 """
+import base64
 import json
 import os
 import re
 import time
 from sysconfig import get_python_version
-from typing import Any, Dict, List, Optional, Union, Callable
+from typing import Any, Dict, List, Optional, Tuple, Union, Callable
 
-import numpy as np
 import pandas as pd
 from IPython import get_ipython
 from IPython.display import HTML, display
@@ -25,11 +25,12 @@ from mitosheet.api import API
 from mitosheet.enterprise.mito_config import MitoConfig
 from mitosheet.errors import (MitoError, get_recent_traceback,
                               make_execution_error)
-from mitosheet.saved_analyses import write_save_analysis_file
+from mitosheet.saved_analyses import SavedAnalysisWriter
+from mitosheet.step import Step
 from mitosheet.steps_manager import StepsManager
 from mitosheet.telemetry.telemetry_utils import (log, log_event_processed,
                                                  telemetry_turned_on)
-from mitosheet.types import CodeOptions, ColumnDefinintion, ColumnDefinitions, ConditionalFormat, DefaultEditingMode, MitoTheme, ParamMetadata
+from mitosheet.types import CodeOptions, ColumnDefinintion, ColumnDefinitions, ConditionalFormat, DefaultEditingMode, MitoTheme, ParamMetadata, SheetDataEncoding, StepStateRetentionPolicy
 from mitosheet.updates.replay_analysis import REPLAY_ANALYSIS_UPDATE
 from mitosheet.user.create import try_create_user_json_file
 from mitosheet.user.db import USER_JSON_PATH, get_user_field
@@ -61,6 +62,8 @@ class MitoBackend():
             default_editing_mode: Optional[DefaultEditingMode]=None,
             theme: Optional[MitoTheme]=None,
             input_cell_execution_count: Optional[int]=None,
+            state_retention_policy: Optional[StepStateRetentionPolicy]=None,
+            sheet_data_encoding: Optional[SheetDataEncoding]=None,
         ):
         """
         Takes a list of dataframes and strings that are paths to CSV files
@@ -110,12 +113,17 @@ class MitoBackend():
             column_definitions=column_definitions,
             theme=theme,
             default_editing_mode=default_editing_mode,
-            input_cell_execution_count=input_cell_execution_count
+            input_cell_execution_count=input_cell_execution_count,
+            state_retention_policy=state_retention_policy,
+            sheet_data_encoding=sheet_data_encoding
         )
 
         # And the api
         self.api = API(self.steps_manager, self)
 
+        # We write the analysis to a file after each edit in the background, so edits do not wait on the file system
+        self.saved_analysis_writer = SavedAnalysisWriter(self.steps_manager)
+
         # We store static variables to make writing the shared
         # state variables quicker; we store them so we don't 
         # have to recompute them on each update
@@ -123,6 +131,10 @@ class MitoBackend():
         self.num_usages = len(last_50_usages if last_50_usages is not None else [])
         self.received_tours = get_user_field(UJ_RECEIVED_TOURS)
 
+        # Writing the sheet data is slow, so we reuse it until the sheet changes, which it only 
+        # does when the current step, an update event, or the sheet data encoding changes
+        self._sheet_data_json_cache: Optional[Tuple[Tuple[Step, int, int, str], str]] = None
+
         self.mito_send: Callable = lambda x: None # type: ignore
 
         self.theme = theme
@@ -144,8 +156,13 @@ class MitoBackend():
         Helper function for updating all the variables that are shared
         between the backend and the frontend through trailets.
         """
+        steps_manager = self.steps_manager
+        cache_key = (steps_manager.curr_step, steps_manager.curr_step_idx, steps_manager.update_event_count, steps_manager.sheet_data_encoding)
+        if self._sheet_data_json_cache is None or self._sheet_data_json_cache[0] != cache_key:
+            self._sheet_data_json_cache = (cache_key, steps_manager.sheet_data_json)
+
         return {
-            'sheet_data_json': self.steps_manager.sheet_data_json,
+            'sheet_data_json': self._sheet_data_json_cache[1],
             'analysis_data_json': self.steps_manager.analysis_data_json,
             'user_profile_json': self.get_user_profile_json()
         }
@@ -183,8 +200,8 @@ class MitoBackend():
         # First, we send this new edit to the evaluator
         self.steps_manager.handle_edit_event(event)
 
-        # Also, write the analysis to a file!
-        write_save_analysis_file(self.steps_manager)
+        # Also, write the analysis to a file in the background!
+        self.saved_analysis_writer.request_write()
 
         # Tell the front-end to render the new sheet and new code with an empty
         # response. NOTE: in the future, we can actually send back some data
@@ -222,8 +239,8 @@ class MitoBackend():
                     raise e
                 raise make_execution_error(error_modal=False)
             raise
-        # Also, write the analysis to a file!
-        write_save_analysis_file(self.steps_manager)
+        # Also, write the analysis to a file in the background!
+        self.saved_analysis_writer.request_write()
 
         # Tell the front-end to render the new sheet and new code with an empty
         # response. 
@@ -322,6 +339,7 @@ def get_mito_backend(
         user_defined_editors: Optional[List[Callable]]=None,
         column_definitions: Optional[List[ColumnDefinitions]]=None,
         input_cell_execution_count: Optional[int]=None,
+        sheet_data_encoding: Optional[SheetDataEncoding]=None,
     ) -> MitoBackend:
 
     # We pass in the dataframes directly to the widget
@@ -332,7 +350,8 @@ def get_mito_backend(
         user_defined_importers=user_defined_importers,
         user_defined_editors=user_defined_editors,
         column_definitions=column_definitions,
-        input_cell_execution_count=input_cell_execution_count
+        input_cell_execution_count=input_cell_execution_count,
+        sheet_data_encoding=sheet_data_encoding
     ) 
 
     return mito_backend
@@ -365,24 +384,128 @@ def register_comm_target_on_mito_backend(
 
     return mito_backend
 
-def get_mito_frontend_code(kernel_id: str, comm_target_id: str, div_id: str, mito_backend: MitoBackend) -> str:
-
-    js_code = js_code_from_file.replace('REPLACE_THIS_WITH_DIV_ID', div_id)
-    js_code = js_code.replace('REPLACE_THIS_WITH_KERNEL_ID', kernel_id)
-    js_code = js_code.replace('REPLACE_THIS_WITH_COMM_TARGET_ID', comm_target_id)
+# Every mitosheet.sheet() call can fetch the frontend bundle over a comm with this target, if the page it renders in has
+# not loaded the frontend bundle already
+FRONTEND_BUNDLE_COMM_TARGET_ID = 'mito_frontend_bundle'
+
+# The JS that waits for the frontend bundle to be loaded into the page, and then renders the mitosheet. If no output in the
+# page has loaded the bundle, e.g. because the page was refreshed, it fetches the bundle from the kernel. Outputs that render
+# at the same time share the one fetch of the bundle
+LOAD_FRONTEND_BUNDLE_JS_CODE = """(function() {
+    const renderMitosheet = () => { REPLACE_THIS_WITH_RENDER_CODE };
+    if (typeof MitoFrontend !== 'undefined') {
+        renderMitosheet();
+        return;
+    }
+
+    if (window.mitoFrontendBundleLoaded === undefined) {
+        window.mitoFrontendBundleLoaded = new Promise(async (resolve, reject) => {
+            // The extension that creates comms may not be set up yet, so we try to create the comm for a few seconds
+            let comm = undefined;
+            for (let i = 0; i < 200 && comm === undefined; i++) {
+                try {
+                    comm = await window.commands?.execute('mitosheet:create-mitosheet-comm', {kernelID: 'REPLACE_THIS_WITH_KERNEL_ID', commTargetID: 'REPLACE_THIS_WITH_COMM_TARGET_ID'});
+                } catch (e) {
+                    console.error(e);
+                }
+                if (comm === undefined || comm === 'no_backend_comm_registered_error') {
+                    comm = undefined;
+                    await new Promise(resolveTimeout => setTimeout(resolveTimeout, 25));
+                }
+            }
+            if (comm === undefined) {
+                window.mitoFrontendBundleLoaded = undefined;
+                reject(new Error('Could not create the comm to load the Mito frontend bundle'));
+                return;
+            }
+
+            // If the backend never sends the bundle (e.g. the kernel is busy or was restarted), we stop 
+            // waiting for it, so that the output tells the user to rerun the cell rather than staying empty
+            const bundleTimeout = setTimeout(() => {
+                window.mitoFrontendBundleLoaded = undefined;
+                comm.onMsg = () => {};
+                reject(new Error('Timed out waiting for the Mito frontend bundle'));
+            }, REPLACE_THIS_WITH_BUNDLE_TIMEOUT_MS);
+
+            comm.onMsg = (msg) => {
+                const frontendBundle = msg.content.data.frontend_bundle;
+                if (frontendBundle !== undefined) {
+                    clearTimeout(bundleTimeout);
+                    const script = document.createElement('script');
+                    script.textContent = frontendBundle;
+                    document.head.appendChild(script);
+                    resolve();
+                }
+            };
+            comm.open();
+        });
+    }
+
+    window.mitoFrontendBundleLoaded.then(renderMitosheet, (e) => {
+        console.error(e);
+        document.getElementById('REPLACE_THIS_WITH_DIV_ID').innerText = 'Could not load Mito. Please rerun this cell to render the Mito spreadsheet.';
+    });
+})();"""
+
+# How long an output waits for the backend to send the frontend bundle before it asks the user to rerun the cell
+FRONTEND_BUNDLE_TIMEOUT_MS = 30_000
+
+# If the frontend bundle has been displayed in an output in this kernel, in which case later outputs
+# use the bundle that it loaded into the page, rather than including the bundle themselves
+frontend_bundle_displayed = False
+frontend_bundle_comm_target_registered = False
+
+
+def get_frontend_bundle() -> str:
+    """
+    Returns the JS that defines the MitoFrontend global, which renders mitosheets.
+    """
     # NOTE: because the CSS has strings inside of it, we need to replace the " quotes (which get created during code minifying)
     # with ` quotes, which properly contain the CSS string
-    js_code = js_code.replace('"REPLACE_THIS_WITH_CSS"', "`" + css_code_from_file + "`")
-    js_code = js_code.replace('`REPLACE_THIS_WITH_CSS`', "`" + css_code_from_file + "`")
-    # NOTE: we encode these as utf8 encoded byte arrays, so that we can avoid having to do complicated things with 
-    # replacing \t, etc, which is required because JSON.parse limits what characters are valid in strings (bah humbug)
-    def to_uint8_arr(string: str) -> List[int]:
-        return np.frombuffer(string.encode("utf8"), dtype=np.uint8).tolist()
+    frontend_bundle = js_code_from_file.replace('"REPLACE_THIS_WITH_CSS"', "`" + css_code_from_file + "`")
+    frontend_bundle = frontend_bundle.replace('`REPLACE_THIS_WITH_CSS`', "`" + css_code_from_file + "`")
+    return frontend_bundle
+
 
-    js_code = js_code.replace('["REPLACE_THIS_WITH_SHEET_DATA_BYTES"]', f'{to_uint8_arr(mito_backend.steps_manager.sheet_data_json)}')
-    js_code = js_code.replace('["REPLACE_THIS_WITH_ANALYSIS_DATA_BYTES"]', f'{to_uint8_arr(mito_backend.steps_manager.analysis_data_json)}')
-    js_code = js_code.replace('["REPLACE_THIS_WITH_USER_PROFILE_BYTES"]', f'{to_uint8_arr(mito_backend.get_user_profile_json())}')
+def register_frontend_bundle_comm_target() -> None:
+    """
+    Registers the comm target that sends the frontend bundle, so that outputs that don't include
+    the bundle can fetch it if the page has not loaded it.
+    """
+    global frontend_bundle_comm_target_registered
+    ipython = get_ipython() # type: ignore
+    if not ipython or frontend_bundle_comm_target_registered:
+        return
 
+    def on_comm_creation(comm: Comm, open_msg: Dict[str, Any]) -> None:
+        comm.send({'frontend_bundle': get_frontend_bundle()}) # type: ignore
+
+    ipython.kernel.comm_manager.register_target(FRONTEND_BUNDLE_COMM_TARGET_ID, on_comm_creation)
+    frontend_bundle_comm_target_registered = True
+
+
+def get_mito_frontend_code(kernel_id: str, comm_target_id: str, div_id: str, mito_backend: MitoBackend, include_frontend_bundle: bool=True) -> str:
+    """
+    Returns the JS that renders the mitosheet. If include_frontend_bundle is True, the JS loads the frontend bundle 
+    if the page has not loaded it yet. Otherwise, it uses the bundle that another output loaded, or fetches the 
+    bundle from the kernel.
+    """
+    # NOTE: we encode these as base64 encoded utf8 encoded strings, so that we can avoid having to do complicated things with 
+    # replacing \t, etc, which is required because JSON.parse limits what characters are valid in strings (bah humbug). 
+    # Base64 is also much smaller than writing out the bytes as a list of numbers
+    def to_base64(string: str) -> str:
+        return base64.b64encode(string.encode("utf8")).decode("ascii")
+
+    render_code = f"MitoFrontend.renderMitosheet('{div_id}', '{kernel_id}', '{comm_target_id}', '{to_base64(mito_backend.steps_manager.sheet_data_json)}', '{to_base64(mito_backend.steps_manager.analysis_data_json)}', '{to_base64(mito_backend.get_user_profile_json())}');"
+
+    if include_frontend_bundle:
+        return f"if (typeof MitoFrontend === 'undefined') {{\n{get_frontend_bundle()}\n}}\n{render_code}"
+
+    js_code = LOAD_FRONTEND_BUNDLE_JS_CODE.replace('REPLACE_THIS_WITH_DIV_ID', div_id)
+    js_code = js_code.replace('REPLACE_THIS_WITH_KERNEL_ID', kernel_id)
+    js_code = js_code.replace('REPLACE_THIS_WITH_COMM_TARGET_ID', FRONTEND_BUNDLE_COMM_TARGET_ID)
+    js_code = js_code.replace('REPLACE_THIS_WITH_BUNDLE_TIMEOUT_MS', str(FRONTEND_BUNDLE_TIMEOUT_MS))
+    js_code = js_code.replace('REPLACE_THIS_WITH_RENDER_CODE', render_code)
     return js_code
 
 def sheet(
@@ -393,7 +516,8 @@ def sheet(
         sheet_functions: Optional[List[Callable]]=None,
         importers: Optional[List[Callable]]=None,
         editors: Optional[List[Callable]]=None,
-        input_cell_execution_count: Optional[int]=None # If the sheet is a dataframe mime renderer, we pass the cell_id so we know where to generate the code. 
+        input_cell_execution_count: Optional[int]=None, # If the sheet is a dataframe mime renderer, we pass the cell_id so we know where to generate the code. 
+        sheet_data_encoding: Optional[SheetDataEncoding]=None # Set to 'columnar' to send the numeric and boolean columns to the frontend as typed-array buffers
     ) -> None:
     """
     Renders a Mito sheet. If no arguments are passed, renders an empty sheet. Otherwise, renders
@@ -446,7 +570,8 @@ def sheet(
             user_defined_functions=sheet_functions,
             user_defined_importers=importers,
             user_defined_editors=editors,
-            input_cell_execution_count=input_cell_execution_count
+            input_cell_execution_count=input_cell_execution_count,
+            sheet_data_encoding=sheet_data_encoding
         )
 
         # Setup the comm target on this
@@ -476,7 +601,11 @@ def sheet(
     div_id = get_new_id()
     kernel_id = get_current_kernel_id()
 
-    js_code = get_mito_frontend_code(kernel_id, comm_target_id, div_id, mito_backend)
+    # Only the first output in the kernel includes the frontend bundle, so that notebooks with many sheets stay small
+    global frontend_bundle_displayed
+    register_frontend_bundle_comm_target()
+    js_code = get_mito_frontend_code(kernel_id, comm_target_id, div_id, mito_backend, include_frontend_bundle=not frontend_bundle_displayed)
+    frontend_bundle_displayed = True
 
     display(HTML(f"""<div id={div_id} class="mito-container-container">
         <script>
@@ -1,2 +1,3 @@
 from mitosheet.mito_flask.v1.flatten_utils import (flatten_mito_backend_to_json, read_backend_state_string_to_mito_backend)
-from mitosheet.mito_flask.v1.process_event import process_mito_event
\ No newline at end of file
+from mitosheet.mito_flask.v1.process_event import process_mito_event
+from mitosheet.mito_flask.v1.session_store import MitoSessionStore, SessionStore
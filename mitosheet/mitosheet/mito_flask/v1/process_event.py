@@ -1,18 +1,28 @@
 from typing import Any, Dict, Optional
 from mitosheet.mito_backend import MitoBackend
 from mitosheet.mito_flask.v1.flatten_utils import (flatten_mito_backend_to_json, read_backend_state_string_to_mito_backend)
+from mitosheet.mito_flask.v1.session_store import DEFAULT_MITO_SESSION_STORE, SessionStore, get_session_token
+from mitosheet.saved_analyses import get_saved_analysis_string
 
-def process_mito_event(backend_state: Optional[str], mito_event: Optional[Dict[str, Any]]) -> Any:
+def process_mito_event(
+        backend_state: Optional[str], 
+        mito_event: Optional[Dict[str, Any]],
+        session_store: Optional[SessionStore]=DEFAULT_MITO_SESSION_STORE
+    ) -> Any:
+    """
+    Processes the event against the backend with the given state, and returns the new
+    state along with the response to the event.
+
+    If the session store has a live backend for the state, the event is processed 
+    by it. Otherwise, the backend is rebuilt by replaying the state. Pass None as
+    the session store to always replay the state.
+    """
 
     if backend_state is None:
         mito_backend = MitoBackend()
-        from flask import jsonify
-        return jsonify({
-            "state": flatten_mito_backend_to_json(mito_backend),
-            "response": None,
-        })
-
-    mito_backend = read_backend_state_string_to_mito_backend(backend_state)
+    else:
+        mito_backend_or_none = session_store.checkout(get_session_token(backend_state)) if session_store is not None else None
+        mito_backend = mito_backend_or_none if mito_backend_or_none is not None else read_backend_state_string_to_mito_backend(backend_state)
 
     response = None
     def mito_send(message):
@@ -23,8 +33,12 @@ def process_mito_event(backend_state: Optional[str], mito_event: Optional[Dict[s
     if mito_event:
         mito_backend.receive_message(mito_event)
 
+    saved_analysis_string = get_saved_analysis_string(mito_backend.steps_manager)
+    if session_store is not None:
+        session_store.checkin(get_session_token(saved_analysis_string), mito_backend)
+
     from flask import jsonify
     return jsonify({
-        "state": flatten_mito_backend_to_json(mito_backend),
+        "state": flatten_mito_backend_to_json(mito_backend, saved_analysis_string),
         "response": response,
-    })
\ No newline at end of file
+    })
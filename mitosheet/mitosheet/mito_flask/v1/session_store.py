@@ -0,0 +1,103 @@
+import hashlib
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional, Protocol, Tuple
+
+from mitosheet.mito_backend import MitoBackend
+
+# The most sessions that we keep live backends for
+DEFAULT_MAX_SESSIONS = 32
+
+# The most memory that the dataframes of the live backends can use together
+DEFAULT_MAX_SESSION_BYTES = 1024 * 1024 * 1024
+
+
+def get_session_token(backend_state: str) -> str:
+    """
+    Returns the token of the session with the given backend state. As the token
+    is derived from the backend state itself, a live backend is only ever used for
+    the exact state that the client sent, and clients do not need to hold on to
+    anything other than the state they already send.
+    """
+    return hashlib.sha256(backend_state.encode('utf-8')).hexdigest()
+
+
+class SessionStore(Protocol):
+    """
+    A store of live MitoBackends that process_mito_event can use, so that it only
+    replays the backend state of sessions that the store does not have.
+    """
+
+    def checkout(self, session_token: str) -> Optional[MitoBackend]:
+        ...
+
+    def checkin(self, session_token: str, mito_backend: MitoBackend) -> None:
+        ...
+
+
+class MitoSessionStore():
+    """
+    Keeps the MitoBackends of the most recently used sessions alive between requests,
+    so that processing an event does not need to replay every step of the analysis.
+
+    When there are more than max_sessions backends, or their dataframes use more
+    than max_bytes, the least recently used backends are evicted. Evicted sessions
+    are rebuilt by replaying their backend state.
+
+    A backend is removed from the store while it processes an event, so that two
+    requests with the same state never edit the same backend at once. Any other
+    SessionStore can be passed to process_mito_event instead of this store.
+    """
+
+    def __init__(self, max_sessions: int=DEFAULT_MAX_SESSIONS, max_bytes: int=DEFAULT_MAX_SESSION_BYTES):
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+
+        # The lock guards the sessions, which map session tokens to the backend and
+        # the bytes its dataframes use, from least to most recently used
+        self.lock = Lock()
+        self.sessions: 'OrderedDict[str, Tuple[MitoBackend, int]]' = OrderedDict()
+        self.total_bytes = 0
+
+    def checkout(self, session_token: str) -> Optional[MitoBackend]:
+        """
+        Removes the backend of the session from the store and returns it, or
+        returns None if there is no live backend for the session.
+        """
+        with self.lock:
+            session = self.sessions.pop(session_token, None)
+            if session is None:
+                return None
+
+            mito_backend, num_bytes = session
+            self.total_bytes -= num_bytes
+            return mito_backend
+
+    def checkin(self, session_token: str, mito_backend: MitoBackend) -> None:
+        """
+        Adds the backend to the store as the most recently used session, and
+        evicts the least recently used sessions that no longer fit.
+        """
+        num_bytes = mito_backend.steps_manager.get_step_history_memory_footprint()['total_bytes']
+        if num_bytes > self.max_bytes:
+            return
+
+        with self.lock:
+            previous_session = self.sessions.pop(session_token, None)
+            if previous_session is not None:
+                self.total_bytes -= previous_session[1]
+
+            self.sessions[session_token] = (mito_backend, num_bytes)
+            self.total_bytes += num_bytes
+
+            while len(self.sessions) > self.max_sessions or self.total_bytes > self.max_bytes:
+                _, (_, evicted_num_bytes) = self.sessions.popitem(last=False)
+                self.total_bytes -= evicted_num_bytes
+
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self.sessions)
+
+
+# The store that process_mito_event uses by default, shared by all of the requests of the server
+DEFAULT_MITO_SESSION_STORE = MitoSessionStore()
@@ -8,12 +8,15 @@ Exports the evaluate function, which takes a list of edit events
 as well as the original dataframe, and returns the current state 
 of the sheet as a dataframe
 """
+from collections import OrderedDict
 import datetime
 from distutils.version import LooseVersion
 import re
 import warnings
-from typing import Any, List, Optional, Set, Tuple, Union
+from threading import Lock
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
 
+import numpy as np
 import pandas as pd
 
 from mitosheet.column_headers import get_column_header_display
@@ -21,7 +24,7 @@ from mitosheet.errors import make_invalid_formula_error
 from mitosheet.is_type_utils import (is_datetime_dtype,
                                                    is_number_dtype,
                                                    is_string_dtype)
-from mitosheet.types import FORMULA_ENTIRE_COLUMN_TYPE, FrontendFormulaHeaderIndexReference, FrontendFormulaHeaderReference, IndexLabel
+from mitosheet.types import FORMULA_ENTIRE_COLUMN_TYPE, FormulaIndexRange, FrontendFormulaHeaderIndexReference, FrontendFormulaHeaderReference, IndexLabel
 from mitosheet.transpiler.transpile_utils import (
     get_column_header_list_as_transpiled_code, get_column_header_as_transpiled_code)
 from mitosheet.types import (ColumnHeader, FrontendFormula,
@@ -419,6 +422,104 @@ def get_index_match_from_string_index(formula: str, formula_label: Union[str, bo
     return None
 
 
+class ColumnHeaderMatcher():
+    """
+    A trie over the display strings of a set of column headers, which finds all the
+    column headers in a formula with a single pass over the formula, rather than 
+    a separate search of the formula for each column header.
+    """
+
+    def __init__(self, column_headers: List[ColumnHeader]):
+        # We look for column headers from longest to shortest
+        self.column_headers_sorted = sorted(column_headers, key=lambda ch: len(str(ch)), reverse=True)
+        # For booleans, and for multi-index headers, we need to make the same transformation 
+        # that we make on the frontend, so we match on the display of the column header
+        self.column_header_displays = [get_column_header_display(column_header) for column_header in self.column_headers_sorted]
+
+        # Each node in the trie maps from a character to the next node, and the
+        # _TRIE_END key maps to the display string that ends at that node
+        self.trie: Dict[str, Any] = dict()
+        self.column_header_positions_by_display: Dict[str, List[int]] = dict()
+        for position, column_header_display in enumerate(self.column_header_displays):
+            node = self.trie
+            for char in column_header_display:
+                node = node.setdefault(char, dict())
+            node[_TRIE_END] = column_header_display
+            self.column_header_positions_by_display.setdefault(column_header_display, []).append(position)
+
+    def _get_starts_by_display(self, formula: str) -> Dict[str, List[int]]:
+        """
+        Returns a mapping from the display of each column header in the formula to
+        all of the places it starts in the formula.
+        """
+        starts_by_display: Dict[str, List[int]] = dict()
+        for start in range(len(formula)):
+            node = self.trie
+            end = start
+            while end < len(formula) and formula[end] in node:
+                node = node[formula[end]]
+                end += 1
+                if _TRIE_END in node:
+                    starts_by_display.setdefault(node[_TRIE_END], []).append(start)
+        
+        # An empty column header matches everywhere
+        if '' in self.column_header_positions_by_display:
+            starts_by_display[''] = list(range(len(formula) + 1))
+            
+        return starts_by_display
+
+    def get_matches(self, formula: str) -> List[Tuple[ColumnHeader, str, List[ParserMatchSubstringRange]]]:
+        """
+        Returns (column_header, column_header_display, matches) for each column header that 
+        is in the formula, from the longest to shortest column header. The matches are the 
+        non-overlapping ranges of the formula that are the column header, found from left to
+        right, exactly as re.finditer would find them.
+        """
+        starts_by_display = self._get_starts_by_display(formula)
+
+        positions = sorted(
+            position 
+            for column_header_display in starts_by_display.keys() 
+            for position in self.column_header_positions_by_display[column_header_display]
+        )
+
+        column_header_matches = []
+        for position in positions:
+            column_header_display = self.column_header_displays[position]
+            matches: List[ParserMatchSubstringRange] = []
+            for start in starts_by_display[column_header_display]:
+                if len(matches) == 0 or start >= matches[-1][1] + (1 if column_header_display == '' else 0):
+                    matches.append((start, start + len(column_header_display)))
+            column_header_matches.append((self.column_headers_sorted[position], column_header_display, matches))
+
+        return column_header_matches
+
+
+# Building the trie for a sheet with many columns is slow, so we keep the tries
+# for the most recently used sets of column headers. Formulas are parsed on the
+# API threads as well as the main thread, so the lock guards the cached tries
+_TRIE_END = ''
+MAX_COLUMN_HEADER_MATCHERS_CACHED = 16
+_column_header_matchers: 'OrderedDict[Tuple[ColumnHeader, ...], ColumnHeaderMatcher]' = OrderedDict()
+_column_header_matchers_lock = Lock()
+
+def get_column_header_matcher(column_headers: List[ColumnHeader]) -> ColumnHeaderMatcher:
+    key = tuple(column_headers)
+    with _column_header_matchers_lock:
+        cached_column_header_matcher = _column_header_matchers.get(key)
+        if cached_column_header_matcher is not None:
+            _column_header_matchers.move_to_end(key)
+            return cached_column_header_matcher
+
+    # We build the trie outside of the lock, so that other threads do not wait on it
+    column_header_matcher = ColumnHeaderMatcher(column_headers)
+    with _column_header_matchers_lock:
+        _column_header_matchers[key] = column_header_matcher
+        if len(_column_header_matchers) > MAX_COLUMN_HEADER_MATCHERS_CACHED:
+            _column_header_matchers.popitem(last=False)
+    return column_header_matcher
+
+
 def get_raw_parser_matches(
         formula: str,
         formula_label: Union[str, bool, int, float], # Where the formula is written,
@@ -491,15 +592,13 @@ def get_raw_parser_matches(
 
     # We look for column headers from longest to shortest, to enable us
     # to issues if one column header is a substring of another
-    # column header
-    column_headers_sorted = sorted(column_headers, key=lambda ch: len(str(ch)), reverse=True)
-
-    # First, we go through and replace all the column headers
-    for column_header in column_headers_sorted:
-        def find_column_headers(match: Any) -> Any:
-            found_column_header: str = match.group() # type:ignore
-            start = match.start()
-            end = match.end()
+    # column header. We only look at the column headers that are in 
+    # the formula, which we find in a single pass over the formula
+    column_header_matcher = get_column_header_matcher(column_headers)
+
+    # First, we go through and find all the column headers
+    for column_header, found_column_header, matches in column_header_matcher.get_matches(formula):
+        def find_column_headers(found_column_header: str, start: int, end: int) -> None:
             match_range = (start, end)
 
             # Do not replace the column header if it is in a string
@@ -509,13 +608,13 @@ def get_raw_parser_matches(
                 ends_with_quote = is_quote(str(column_header)[-1])
 
                 if is_string and not (starts_with_quote and ends_with_quote):
-                    return found_column_header
+                    return
 
             # If this column header was already covered by another column header
             # that has been found, then this column header is just a substring
             # of another column header, so we avoid matching it
             if match_covered_by_matches([match['substring_range'] for match in raw_parser_matches], match_range):
-                return found_column_header
+                return
 
             # First, we check if it's an unqualified column header with no index
             if is_no_index_after_column_header_match(formula, index, start, end):
@@ -544,16 +643,12 @@ def get_raw_parser_matches(
                 })
                 raw_parser_matches.append(index_label_match)
                 return 
-            
-            # NOTE: we add the column_header, not the found column header
-            # as the found column header is a string, and the column_header 
-            # may not be
-            return found_column_header
 
-        # First, just find all of the matches, without changing the string, as this shifts indexes
-        # NOTE: for booleans, and for multi-index headers, we need to make the same transformation 
-        # that we make on the frontend
-        re.sub(re.escape(get_column_header_display(column_header)), find_column_headers, formula)
+        # NOTE: we add the column_header, not the found column header
+        # as the found column header is a string, and the column_header 
+        # may not be
+        for start, end in matches:
+            find_column_headers(found_column_header, start, end)
 
     # Sort the matches from start to end
     raw_parser_matches = sorted(raw_parser_matches, key=lambda x: x['substring_range'][0])
@@ -981,6 +1076,34 @@ def replace_functions(
     return formula_with_functions, functions
 
 
+# Parsing a formula only depends on the formula, where it is written, and the column headers,
+# dtypes and index of the sheets, so we keep the results of the most recent parses. This is
+# useful as the same formula is parsed many times when it is saturated, executed and transpiled.
+# The lock guards the results, as formulas are also parsed on the API threads
+MAX_PARSE_FORMULA_RESULTS_CACHED = 256
+_parse_formula_results: 'OrderedDict[Tuple[Any, ...], Tuple[Tuple[List[pd.Index], List[Any], pd.Index], Tuple[str, Set[str], Set[ColumnHeader], Set[IndexLabel]]]]' = OrderedDict()
+_parse_formula_results_lock = Lock()
+
+def _is_same_index(index: pd.Index, other_index: pd.Index) -> bool:
+    # Indexes are immutable, so if they are the same object they have not changed
+    return index is other_index or (index.dtype == other_index.dtype and index.equals(other_index))
+
+def _get_parse_formula_schema(dfs: List[pd.DataFrame], sheet_index: int) -> Tuple[List[pd.Index], List[Any], pd.Index]:
+    """
+    Returns the parts of the dataframes that parsing a formula in the sheet at sheet_index
+    depends on: the column headers of all sheets, and the dtypes and index of this sheet.
+    """
+    df = dfs[sheet_index]
+    return [other_df.columns for other_df in dfs], df.dtypes.tolist(), df.index
+
+def _is_same_parse_formula_schema(schema: Tuple[List[pd.Index], List[Any], pd.Index], other_schema: Tuple[List[pd.Index], List[Any], pd.Index]) -> bool:
+    (columns, dtypes, index), (other_columns, other_dtypes, other_index) = schema, other_schema
+    return len(columns) == len(other_columns) \
+        and all(_is_same_index(c, o) for c, o in zip(columns, other_columns)) \
+        and dtypes == other_dtypes \
+        and _is_same_index(index, other_index)
+
+
 def parse_formula(
         formula: Optional[str], 
         column_header: ColumnHeader, 
@@ -999,13 +1122,58 @@ def parse_formula(
     If include_df_set, then will return {df_name}[{column_header}] = {parsed formula}, and if
     not then will just return {parsed formula}
     """
-    df = dfs[sheet_index]
-    df_name = df_names[sheet_index]
-
     # If the column doesn't have a formula, then there are no dependencies, duh!
     if formula is None or formula == '':
         return '', set(), set(), set()
 
+    # NOTE: we include the types, as 1, 1.0 and True are equal but are not the same label
+    key = (
+        formula, column_header, type(column_header), formula_label, type(formula_label), 
+        repr(index_labels_formula_is_applied_to), tuple(df_names), sheet_index, include_df_set
+    )
+    schema = _get_parse_formula_schema(dfs, sheet_index)
+
+    try:
+        with _parse_formula_results_lock:
+            cached_schema, result = _parse_formula_results[key]
+        if _is_same_parse_formula_schema(schema, cached_schema):
+            with _parse_formula_results_lock:
+                if key in _parse_formula_results:
+                    _parse_formula_results.move_to_end(key)
+            final_code, functions, column_header_dependencies, index_label_dependencies = result
+            return final_code, set(functions), set(column_header_dependencies), set(index_label_dependencies)
+    except (KeyError, TypeError):
+        # If the key is not hashable, we just don't cache the result
+        pass
+
+    final_code, functions, column_header_dependencies, index_label_dependencies = _parse_formula(
+        formula, column_header, formula_label, index_labels_formula_is_applied_to, dfs, df_names, sheet_index, include_df_set
+    )
+
+    try:
+        with _parse_formula_results_lock:
+            _parse_formula_results[key] = (schema, (final_code, set(functions), set(column_header_dependencies), set(index_label_dependencies)))
+            if len(_parse_formula_results) > MAX_PARSE_FORMULA_RESULTS_CACHED:
+                _parse_formula_results.popitem(last=False)
+    except TypeError:
+        pass
+
+    return final_code, functions, column_header_dependencies, index_label_dependencies
+
+
+def _parse_formula(
+        formula: str, 
+        column_header: ColumnHeader, 
+        formula_label: Union[str, bool, int, float],
+        index_labels_formula_is_applied_to: FormulaAppliedToType,
+        dfs: List[pd.DataFrame],
+        df_names: List[str],
+        sheet_index: int,
+        include_df_set: bool,
+    ) -> Tuple[str, Set[str], Set[ColumnHeader], Set[IndexLabel]]:
+    df = dfs[sheet_index]
+    df_name = df_names[sheet_index]
+
     check_common_errors(formula, dfs, df_names, sheet_index)
 
     # Chop off any whitespace at the start
@@ -1152,6 +1320,26 @@ def get_frontend_formula(
     return frontend_formula
 
 
+def get_formula_index_reference(index: pd.Index) -> Union[FormulaIndexRange, List[Any]]:
+    """
+    Returns a reference to the index that a formula is written in, which the frontend
+    uses to figure out which index labels the formula references from other cells.
+
+    Most indexes are ranges, in which case we just return the range, rather than
+    a list of every index label in the dataframe.
+    """
+    if isinstance(index, pd.RangeIndex):
+        return {'type': 'range', 'start': int(index.start), 'stop': int(index.stop), 'step': int(index.step)}
+
+    if index.dtype.kind == 'i' and len(index) > 1:
+        index_values = index.to_numpy()
+        step = index_values[1] - index_values[0]
+        if step != 0 and (np.diff(index_values) == step).all():
+            return {'type': 'range', 'start': int(index_values[0]), 'stop': int(index_values[-1] + step), 'step': int(step)}
+
+    return index.to_list()
+
+
 def get_backend_formula_from_frontend_formula(
     frontend_formula: FrontendFormula,
     formula_label: Union[str, bool, int, float],
@@ -1,9 +1,79 @@
 import json
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple
 import pandas as pd
-from mitosheet.types import ConditionalFormattingCellResults, ConditionalFormattingInvalidResults, ConditionalFormattingResult, StateType
+from mitosheet.types import ColumnID, ConditionalFormattingCellResults, ConditionalFormattingInvalidResults, ConditionalFormattingResult, StateType
 from mitosheet.utils import MAX_ROWS, NpEncoder
 
+# The key of the result of a single conditional format on a single column: (sheet_index, format_uuid, column_id)
+ConditionalFormatColumnKey = Tuple[int, str, ColumnID]
+ConditionalFormatColumnResult = Dict[str, Dict[str, Optional[str]]]
+
+
+class ConditionalFormattingResultCache():
+    """
+    Caches the result of each conditional format on each column of a sheet, so
+    that when a sheet is edited, we only recompute the results for the conditional
+    formats that changed, or that are on columns that the edit modified.
+    """
+
+    def __init__(self) -> None:
+        # Maps from the key of the result to the (format_key, result), where the format_key describes the format
+        self.results: Dict[ConditionalFormatColumnKey, Tuple[str, ConditionalFormatColumnResult]] = dict()
+
+    def get_result(self, key: ConditionalFormatColumnKey, format_key: str) -> Optional[ConditionalFormatColumnResult]:
+        """
+        Returns the cached result, or None if the format has changed since the result was cached.
+        """
+        if key not in self.results:
+            return None
+
+        cached_format_key, result = self.results[key]
+        if cached_format_key != format_key:
+            return None
+
+        return result
+
+    def set_result(self, key: ConditionalFormatColumnKey, format_key: str, result: ConditionalFormatColumnResult) -> None:
+        self.results[key] = (format_key, result)
+
+    def remove_modified_results(self, modified_column_ids: Optional[Dict[int, Set[ColumnID]]]) -> None:
+        """
+        Removes the results for the columns that were modified, for each sheet index, or
+        all of the results if any column might have been modified.
+        """
+        if modified_column_ids is None:
+            self.results.clear()
+            return
+
+        for key in list(self.results.keys()):
+            sheet_index, _, column_id = key
+            if column_id in modified_column_ids.get(sheet_index, set()):
+                del self.results[key]
+
+    def remove_unused_results(self, sheet_index: int, used_keys: Set[ConditionalFormatColumnKey]) -> None:
+        """
+        Removes the results for this sheet that were not used, so we don't hold onto
+        the results of deleted columns or deleted conditional formats.
+        """
+        for key in list(self.results.keys()):
+            if key[0] == sheet_index and key not in used_keys:
+                del self.results[key]
+
+
+def _get_json_indexes(index: pd.Index) -> List[str]:
+    """
+    Returns the index labels as valid json, in a way that is consistent with how indexes
+    are sent to the frontend. However, if the index is a string, we don't add quotes around it
+    """
+    # Most indexes are integers, which we can convert all at once
+    if index.dtype.kind in 'iu':
+        return index.astype(str).tolist()
+
+    return [
+        index_label if isinstance(index_label, str) else json.dumps(index_label, cls=NpEncoder)
+        for index_label in index.tolist()
+    ]
+
 
 def get_conditonal_formatting_result(
         state: StateType,
@@ -11,11 +81,13 @@ def get_conditonal_formatting_result(
         df: pd.DataFrame,
         conditional_formatting_rules: List[Dict[str, Any]],
         max_rows: Optional[int]=MAX_ROWS,
-    ) -> ConditionalFormattingResult: 
+        conditional_formatting_result_cache: Optional[ConditionalFormattingResultCache]=None
+    ) -> ConditionalFormattingResult:
     from mitosheet.step_performers.filter import check_filters_contain_condition_that_needs_full_df
 
     invalid_conditional_formats: ConditionalFormattingInvalidResults = dict()
     formatted_result: ConditionalFormattingCellResults = dict()
+    used_keys: Set[ConditionalFormatColumnKey] = set()
 
     for conditional_format in conditional_formatting_rules:
         try:
@@ -30,38 +102,47 @@ def get_conditonal_formatting_result(
                 filters  = conditional_format["filters"]
                 backgroundColor = conditional_format.get("backgroundColor", None)
                 color = conditional_format.get("color", None)
-                
+
                 # Certain filter conditions require the entire dataframe to be present, as they calculate based
                 # on the full dataframe. In other cases, we only operate on the first 1500 rows, for speed
                 _df = df
-                if not check_filters_contain_condition_that_needs_full_df(filters):
-                    df = df.head(max_rows)
+                if max_rows is not None and not check_filters_contain_condition_that_needs_full_df(filters):
+                    _df = df.head(max_rows)
 
                 column_header = state.column_ids.get_column_header_by_id(sheet_index, column_id)
 
-                # Use the get_applied_filter function from our filtering infrastructure
-                from mitosheet.step_performers.filter import \
-                    get_full_applied_filter
-                full_applied_filter, _ = get_full_applied_filter(_df, column_header, 'And', filters)
+                key = (sheet_index, format_uuid, column_id)
+                format_key = json.dumps([filters, backgroundColor, color, max_rows], sort_keys=True, default=str)
 
-                # We can only take the first max_rows here, as this is all we need
-                applied_indexes = _df[full_applied_filter].head(max_rows).index.tolist()
+                result = None
+                if conditional_formatting_result_cache is not None:
+                    used_keys.add(key)
+                    result = conditional_formatting_result_cache.get_result(key, format_key)
 
-                for index in applied_indexes:
-                    # We need to make this index valid json, and do so in a way that is consistent with how indexes
-                    # are sent to the frontend. However, if the index is a string, we don't want to add quotes around it
-                    if isinstance(index, str):
-                        json_index = index
-                    else:
-                        json_index = json.dumps(index, cls=NpEncoder)
-                    formatted_result[column_id][json_index] = {'backgroundColor': backgroundColor, 'color': color}
+                if result is None:
+                    # Use the get_applied_filter function from our filtering infrastructure
+                    from mitosheet.step_performers.filter import \
+                        get_full_applied_filter
+                    full_applied_filter, _ = get_full_applied_filter(_df, column_header, 'And', filters)
+
+                    # We can only take the first max_rows here, as this is all we need
+                    applied_indexes = _df[full_applied_filter].head(max_rows).index
+                    result = dict.fromkeys(_get_json_indexes(applied_indexes), {'backgroundColor': backgroundColor, 'color': color})
+
+                    if conditional_formatting_result_cache is not None:
+                        conditional_formatting_result_cache.set_result(key, format_key, result)
+
+                formatted_result[column_id].update(result)
 
         except Exception as e:
             if format_uuid not in invalid_conditional_formats:
                 invalid_conditional_formats[format_uuid] = []
             invalid_conditional_formats[format_uuid].append(column_id)
 
+    if conditional_formatting_result_cache is not None:
+        conditional_formatting_result_cache.remove_unused_results(sheet_index, used_keys)
+
     return {
         'invalid_conditional_formats': invalid_conditional_formats,
         'results': formatted_result
-    }
\ No newline at end of file
+    }
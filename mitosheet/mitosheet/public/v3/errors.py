@@ -1,6 +1,6 @@
 import inspect
 from functools import wraps
-from typing import Any, Callable, Tuple
+from typing import Any, Callable, List, Optional, Sequence, Tuple
 
 from mitosheet.errors import MitoError, make_function_error
 
@@ -77,25 +77,48 @@ def get_type_args(tp: Any) -> Tuple[Any, ...]:
             return ()
 
 
+def get_sheet_function_parameter_types(sheet_function: Callable) -> List[Tuple[str, Optional[Tuple[Any, ...]]]]:
+    """
+    Returns the name and the valid types of each parameter of the sheet function, where the valid
+    types are None if the parameter has no annotation. 
+    
+    We compute these once when decorating the sheet function, as inspecting the signature is slow
+    compared to many sheet function calls. 
+    """
+    return [
+        (parameter.name, None if parameter.annotation == inspect.Parameter.empty else get_type_args(parameter.annotation))
+        for parameter in inspect.signature(sheet_function).parameters.values()
+    ]
+
+
+def call_sheet_function_handling_errors(sheet_function: Callable, parameter_types: List[Tuple[str, Optional[Tuple[Any, ...]]]], args: Sequence[Any]) -> Any:
+
+    # We ensure that all of the paramters match the type that is given to them
+    for index, ((parameter_name, types), arg) in enumerate(zip(parameter_types, args)):
+        if types is None:
+            continue
+        if not any(isinstance(arg, t) for t in types):
+            raise make_invalid_arg_error(sheet_function.__name__, parameter_name, index, type(arg).__name__)
+    
+    try:
+        return sheet_function(*args)
+    except MitoError:
+        raise 
+    except:
+        raise make_function_error(sheet_function.__name__, error_modal=False)
+
+
 def handle_sheet_function_errors(sheet_function: Callable) -> Callable:
 
-    @wraps(sheet_function)
+    parameter_types = get_sheet_function_parameter_types(sheet_function)
+
+    # We don't copy the attributes of the sheet function, as they describe how it is wrapped
+    @wraps(sheet_function, updated=())
     def wrapped_sheet_function(*args):   
+        return call_sheet_function_handling_errors(sheet_function, parameter_types, args)
 
-        parameters = inspect.signature(sheet_function).parameters
-
-        # We ensure that all of the paramters match the type that is given to them
-        for index, (parameter, arg) in enumerate(zip(parameters.values(), args)):
-            if parameter.annotation == inspect.Parameter.empty:
-                continue
-            if not any(isinstance(arg, t) for t in get_type_args(parameter.annotation)):
-                raise make_invalid_arg_error(sheet_function.__name__, parameter.name, index, type(arg).__name__)
-        
-        try:
-            return sheet_function(*args)
-        except MitoError:
-            raise 
-        except:
-            raise make_function_error(sheet_function.__name__, error_modal=False)
+    # The casting decorators call the sheet function with call_sheet_function_handling_errors 
+    # themselves, so that the casting and error handling happen in a single wrapper
+    wrapped_sheet_function.handled_sheet_function = (sheet_function, parameter_types) # type: ignore
     
     return wrapped_sheet_function
@@ -1,9 +1,123 @@
 
 from datetime import datetime, timedelta
-from typing import Callable, Union
+from typing import Callable, List, Optional, Union
 
+import numpy as np
 import pandas as pd
 
+# The aggregations that RollingRange.aggregate can compute for all windows at once, rather
+# than by calling a function on each window. They are named after the pandas DataFrame methods
+ROLLING_RANGE_AGGREGATIONS = {'sum', 'count', 'min', 'max', 'prod', 'all', 'any', 'std', 'var'}
+
+# Integers larger than this can't be converted to floats exactly, so we can't use pandas 
+# rolling windows on them, as they convert to floats
+MAX_EXACT_FLOAT_INTEGER = 2 ** 53
+
+
+def _get_window_sums(values: np.ndarray, window_starts: np.ndarray, window_ends: np.ndarray) -> np.ndarray:
+    """
+    Returns the sum of values in each window, using a cumulative sum. For integers, this is
+    exact, even if the cumulative sum overflows, as the overflow is undone by the subtraction.
+    """
+    cumulative_sums = np.concatenate([np.zeros(1, dtype=values.dtype), np.cumsum(values)])
+    return cumulative_sums[window_ends] - cumulative_sums[window_starts]
+
+
+def _get_column_aggregation_of_windows(
+        column: pd.Series, 
+        aggregation: str, 
+        window: int, 
+        window_starts: np.ndarray, 
+        window_ends: np.ndarray, 
+        rolling_positions: np.ndarray
+    ) -> Optional[np.ndarray]:
+    """
+    Returns the aggregation of the values in each window of the column, or None if we 
+    can't compute the aggregation for this column without calling a function on each window.
+    """
+    kind = column.dtype.kind
+    is_integer = kind in 'bi' or (kind == 'u' and column.dtype.itemsize < 8)
+    if not is_integer and kind != 'f':
+        return None
+
+    if aggregation in ('all', 'any'):
+        if kind != 'b':
+            return None
+        if aggregation == 'all':
+            return _get_window_sums((~column.to_numpy()).astype(np.int64), window_starts, window_ends) == 0
+        return _get_window_sums(column.to_numpy().astype(np.int64), window_starts, window_ends) > 0
+
+    if aggregation == 'count':
+        return _get_window_sums(column.notna().to_numpy().astype(np.int64), window_starts, window_ends)
+
+    if kind == 'b' and aggregation != 'sum':
+        return None
+
+    if is_integer and aggregation == 'sum':
+        return _get_window_sums(column.to_numpy().astype(np.int64), window_starts, window_ends)
+
+    values = column.to_numpy().astype(np.float64)
+    # Pandas rolling windows do not handle infinite values, so we only handle them with func
+    if np.isinf(values).any():
+        return None
+    if is_integer and len(values) > 0 and np.abs(values).max() >= MAX_EXACT_FLOAT_INTEGER:
+        return None
+
+    # The rolling window that ends at position end - 1 is exactly [start, end), as it is clipped at 
+    # the start of the column. We pad the end of the column with NaN values, so that the windows that 
+    # run off the end of the column are clipped at the end of the column too
+    padded_values = pd.Series(np.concatenate([values, np.full(window, np.nan)]))
+    if aggregation == 'sum':
+        result = padded_values.rolling(window, min_periods=0).sum()
+    elif aggregation == 'min':
+        result = padded_values.rolling(window, min_periods=1).min()
+    elif aggregation == 'max':
+        result = padded_values.rolling(window, min_periods=1).max()
+    elif aggregation == 'prod':
+        result = padded_values.rolling(window, min_periods=0).apply(np.nanprod, raw=True)
+    elif aggregation == 'std':
+        result = padded_values.rolling(window, min_periods=0).std()
+    elif aggregation == 'var':
+        result = padded_values.rolling(window, min_periods=0).var()
+    else:
+        return None
+
+    aggregated_values = result.to_numpy()[rolling_positions]
+
+    # The min, max and prod of integers are integers, so we convert them back if we can do so exactly
+    if is_integer and aggregation in ('min', 'max', 'prod'):
+        aggregated_values = np.where(np.isnan(aggregated_values), 0, aggregated_values)
+        if len(aggregated_values) > 0 and np.abs(aggregated_values).max() >= MAX_EXACT_FLOAT_INTEGER:
+            return None
+        return aggregated_values.astype(np.int64)
+
+    return aggregated_values
+
+
+def _combine_column_aggregations(aggregation: str, column_aggregations: List[np.ndarray]) -> Optional[np.ndarray]:
+    """
+    Combines the aggregations of each column into the aggregation of the whole window, in
+    the same way that the DataFrame method (e.g. df.sum().sum()) does. 
+    """
+    result = column_aggregations[0]
+    for column_aggregation in column_aggregations[1:]:
+        if aggregation in ('sum', 'count'):
+            result = result + column_aggregation
+        elif aggregation == 'min':
+            result = np.fmin(result, column_aggregation)
+        elif aggregation == 'max':
+            result = np.fmax(result, column_aggregation)
+        elif aggregation == 'prod':
+            result = result * column_aggregation
+        elif aggregation == 'all':
+            result = result & column_aggregation
+        elif aggregation == 'any':
+            result = result | column_aggregation
+        else:
+            # The std and var of all values can't be computed from the std and var of each column
+            return None
+    return result
+
 
 class RollingRange():
     """
@@ -67,4 +181,52 @@ class RollingRange():
             else:
                 result = result + default_values
 
-        return pd.Series(result, index=self.obj.index)
\ No newline at end of file
+        return pd.Series(result, index=self.obj.index)
+
+    def aggregate(self, aggregation: str, func: Callable[[pd.DataFrame], Union[str, float, int, bool, datetime, timedelta]], default_value: Union[str, float, int, bool, datetime, timedelta]=0) -> pd.Series:
+        """
+        Returns the same series as self.apply(func, default_value), where func computes the
+        aggregation (one of ROLLING_RANGE_AGGREGATIONS) of all the values in a window. For
+        example, for 'sum', func is lambda df: df.sum().sum().
+
+        Rather than calling func on each window, we compute the aggregation for every window 
+        at once with cumulative sums and pandas rolling windows, which is much faster. If the
+        aggregation is not supported for the values in the obj, we fall back to apply.
+        """
+        num_rows = len(self.obj)
+        if aggregation not in ROLLING_RANGE_AGGREGATIONS or num_rows == 0 or len(self.obj.columns) == 0 or self.window < 1:
+            return self.apply(func, default_value)
+
+        starts = np.arange(num_rows) + self.offset
+        ends = starts + self.window
+        window_starts = np.clip(starts, 0, num_rows)
+        window_ends = np.clip(ends, 0, num_rows)
+        rolling_positions = np.clip(ends - 1, 0, num_rows + self.window - 1)
+
+        column_aggregations = []
+        for column_index in range(len(self.obj.columns)):
+            column_aggregation = _get_column_aggregation_of_windows(
+                self.obj.iloc[:, column_index], aggregation, self.window, window_starts, window_ends, rolling_positions
+            )
+            if column_aggregation is None:
+                return self.apply(func, default_value)
+            column_aggregations.append(column_aggregation)
+
+        values = _combine_column_aggregations(aggregation, column_aggregations)
+        if values is None:
+            return self.apply(func, default_value)
+
+        # A negative end wraps around to the end of the dataframe in apply, so we call func on these windows
+        is_wrapped = ends < 0
+        is_empty = ~is_wrapped & (window_starts >= window_ends)
+        if not is_wrapped.any() and not is_empty.any():
+            return pd.Series(values, index=self.obj.index)
+
+        # Build the series from a list, so the default value affects the dtype exactly as it does in apply
+        result = values.astype(object)
+        result[is_empty] = default_value
+        for position in np.flatnonzero(is_wrapped):
+            df_subset = self.obj[0:ends[position]]
+            result[position] = default_value if len(df_subset) == 0 else func(df_subset)
+
+        return pd.Series(list(result), index=self.obj.index)
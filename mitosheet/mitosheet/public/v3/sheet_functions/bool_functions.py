@@ -62,7 +62,8 @@ def AND(*argv: Optional[BoolInputType]) -> BoolFunctionReturnType:
         argv,
         lambda df: df.all().all(),
         lambda previous_value, new_value: previous_value and new_value,
-        lambda previous_series, new_series: previous_series & new_series
+        lambda previous_series, new_series: previous_series & new_series,
+        'all'
     )
 
 @cast_values_in_arg_to_type('series', 'bool')
@@ -225,7 +226,8 @@ def OR(*argv: Optional[BoolInputType]) -> BoolFunctionReturnType:
         argv,
         lambda df: df.any().any(),
         lambda previous_value, new_value: previous_value or new_value,
-        lambda previous_series, new_series: previous_series | new_series
+        lambda previous_series, new_series: previous_series | new_series,
+        'any'
     )
 
 
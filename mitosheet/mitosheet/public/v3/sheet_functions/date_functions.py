@@ -8,9 +8,11 @@ Contains all functions that can be used in a sheet that operate on dates.
 
 NOTE: This file is alphabetical order!
 """
+import calendar
 from datetime import datetime
 from distutils.version import LooseVersion
 
+import numpy as np
 import pandas as pd
 
 from mitosheet.public.v3.errors import handle_sheet_function_errors
@@ -35,6 +37,17 @@ def to_end(t: pd.Timestamp, freq: pd.DateOffset) -> pd.Timestamp:
     except ValueError: # if freq is variable, we fall into here...
         return freq.rollforward(t.ceil("D"))
 
+# The same as calling to_start and to_end on each timestamp in the series for the 
+# variable frequencies we use, but on the whole series at once, with NaT staying NaT
+def series_to_start(series: pd.Series, freq: pd.DateOffset) -> pd.Series:
+    # Stepping forward and back a period rolls back any date not already on the frequency
+    floored_series = series.dt.floor("D")
+    return (floored_series + freq) - freq
+
+def series_to_end(series: pd.Series, freq: pd.DateOffset) -> pd.Series:
+    # Adding a frequency with n=0 rolls forward any date not already on the frequency
+    return series.dt.ceil("D") + freq
+
 
 @cast_values_in_arg_to_type('arg', 'datetime')
 @handle_sheet_function_errors
@@ -113,7 +126,7 @@ def ENDOFBUSINESSMONTH(arg: DatetimeRestrictedInputType) -> DatetimeFunctionRetu
     if isinstance(arg, datetime):
         return to_end(pd.Timestamp(arg), pd.tseries.offsets.BMonthEnd(n=0))
     
-    return arg.apply(lambda t: to_end(t, pd.tseries.offsets.BMonthEnd(n=0)))
+    return series_to_end(arg, pd.tseries.offsets.BMonthEnd(n=0))
 
 
 
@@ -143,7 +156,7 @@ def ENDOFMONTH(arg: DatetimeRestrictedInputType) -> DatetimeFunctionReturnType:
     if isinstance(arg, datetime):
         return to_end(pd.Timestamp(arg), pd.tseries.offsets.MonthEnd(n=0))
     
-    return arg.apply(lambda t: to_end(t, pd.tseries.offsets.MonthEnd(n=0)))
+    return series_to_end(arg, pd.tseries.offsets.MonthEnd(n=0))
 
 
 @cast_values_in_arg_to_type('arg', 'datetime')
@@ -251,7 +264,10 @@ def MONTHNAME(arg: DatetimeRestrictedInputType) -> StringFunctionReturnType:
     if isinstance(arg, datetime) or isinstance(arg, pd.Timestamp):
         return arg.strftime('%b')
 
-    return arg.dt.strftime('%b')
+    # Looking up the name of each month is much faster than formatting each date, and
+    # month 0 is the NaN that missing dates get
+    month_names = np.array([np.nan] + [calendar.month_abbr[month] for month in range(1, 13)], dtype=object)
+    return pd.Series(month_names[arg.dt.month.fillna(0).astype(int).to_numpy()], index=arg.index)
 
 
 @cast_values_in_arg_to_type('arg', 'datetime')
@@ -309,7 +325,7 @@ def STARTOFBUSINESSMONTH(arg: DatetimeRestrictedInputType) -> DatetimeFunctionRe
     elif isinstance(arg, datetime):
         return to_start(pd.Timestamp(arg), pd.tseries.offsets.BMonthBegin(n=1))
     
-    return arg.apply(lambda t: to_start(t, pd.tseries.offsets.BMonthBegin(n=1)))
+    return series_to_start(arg, pd.tseries.offsets.BMonthBegin(n=1))
     
 
 @cast_values_in_arg_to_type('arg', 'datetime')
@@ -338,7 +354,7 @@ def STARTOFMONTH(arg: DatetimeRestrictedInputType) -> DatetimeFunctionReturnType
     elif isinstance(arg, datetime):
         return to_start(pd.Timestamp(arg), pd.tseries.offsets.MonthBegin(n=1))
     
-    return arg.apply(lambda t: to_start(t, pd.tseries.offsets.MonthBegin(n=1)))
+    return series_to_start(arg, pd.tseries.offsets.MonthBegin(n=1))
 
 
 
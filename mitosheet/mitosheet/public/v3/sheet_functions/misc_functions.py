@@ -1,10 +1,13 @@
 
 from datetime import datetime, timedelta
-from typing import Any
+from threading import Lock
+from typing import Any, Dict, Tuple
 
 import numpy as np
 import pandas as pd
 
+from mitosheet.cache_utils import (DataframeRef, get_dataframe_ref,
+                                    is_same_dataframe)
 from mitosheet.errors import MitoError
 from mitosheet.is_type_utils import (is_bool_dtype, is_datetime_dtype,
                                      is_float_dtype, is_int_dtype,
@@ -88,6 +91,56 @@ def TYPE(series: pd.Series) -> pd.Series:
 
 
 
+def _get_previous_value_series(series: pd.Series, condition: BoolRestrictedInputType) -> pd.Series:
+    """
+    For each row, returns the value of the series at the last row at or before it
+    where the condition is True, or a default value that depends on the type of the
+    series if there is no such row.
+    """
+    # Default to a different last occurence depending on the type
+    column_dtype = str(series.dtype)
+    default_value: Any = -1
+    if is_int_dtype(column_dtype) or is_float_dtype(column_dtype):
+        default_value = -1
+    elif is_string_dtype(column_dtype):
+        default_value = ''
+    elif is_bool_dtype(column_dtype):
+        default_value = False
+    elif is_datetime_dtype(column_dtype):
+        default_value = pd.NaT
+
+    condition = get_series_from_primitive_or_series(condition, series.index)
+
+    # We take the value from the same row as the condition. If the condition is from a different
+    # index, we look up the value by label, which requires the labels to be unique
+    if condition.index.equals(series.index):
+        values = series
+    else:
+        values = series.loc[condition.index]
+        if len(values) != len(condition):
+            raise ValueError('The series and condition have different index labels')
+
+    # The position of the last row where the condition is True, or -1 if there is none yet
+    num_rows = len(condition)
+    positions = np.where(condition.to_numpy().astype(bool), np.arange(num_rows), -1)
+    last_true_positions = np.maximum.accumulate(positions) if num_rows > 0 else positions
+    has_previous_value = last_true_positions >= 0
+    taken_positions = np.maximum(last_true_positions, 0)
+
+    # For the common dtypes, we can take the values and fill in the default without changing the dtype
+    if has_previous_value.any() and column_dtype in ('int64', 'float64', 'bool', 'datetime64[ns]'):
+        taken_values = values.to_numpy()[taken_positions]
+        numpy_default_value = np.datetime64('NaT') if default_value is pd.NaT else default_value
+        return pd.Series(np.where(has_previous_value, taken_values, numpy_default_value), index=series.index)
+
+    # Otherwise, we build the series from a list, so that the dtype is inferred from the values. The
+    # rows without a previous value are always at the start, as the last True position only increases
+    result = list(values.to_numpy()[taken_positions])
+    num_rows_without_previous_value = num_rows - int(has_previous_value.sum())
+    result[:num_rows_without_previous_value] = [default_value] * num_rows_without_previous_value
+    return pd.Series(result, index=series.index)
+
+
 @handle_sheet_function_errors
 def GETPREVIOUSVALUE(series: pd.Series, condition: BoolRestrictedInputType) -> pd.Series:
     """
@@ -109,27 +162,7 @@ def GETPREVIOUSVALUE(series: pd.Series, condition: BoolRestrictedInputType) -> p
         ]
     }
     """
-    # Default to a different last occurence depending on the type
-    column_dtype = str(series.dtype)
-    last_occurrence: Any = -1
-    if is_int_dtype(column_dtype) or is_float_dtype(column_dtype):
-        last_occurrence = -1
-    elif is_string_dtype(column_dtype):
-        last_occurrence = ''
-    elif is_bool_dtype(column_dtype):
-        last_occurrence = False
-    elif is_datetime_dtype(column_dtype):
-        last_occurrence = pd.NaT
-
-    condition = get_series_from_primitive_or_series(condition, series.index)
-
-    result = []
-    for index, value in condition.items():
-        if value:
-            last_occurrence = series[index]
-        result.append(last_occurrence)
-
-    return pd.Series(result, index=series.index)
+    return _get_previous_value_series(series, condition)
 
 @handle_sheet_function_errors
 def GETNEXTVALUE(series: pd.Series, condition: BoolRestrictedInputType) -> pd.Series:
@@ -156,7 +189,96 @@ def GETNEXTVALUE(series: pd.Series, condition: BoolRestrictedInputType) -> pd.Se
     condition = get_series_from_primitive_or_series(condition, series.index)
     reversed_condition = condition[::-1]
 
-    return GETPREVIOUSVALUE(reversed_series, reversed_condition)[::-1]
+    return _get_previous_value_series(reversed_series, reversed_condition)[::-1]
+
+# The most lookup indexes we cache at once, so that we don't hold onto the indexes of many ranges
+MAX_CACHED_LOOKUP_INDEXES = 10
+
+
+class LookupIndex():
+    """
+    Maps each value in the first column of a VLOOKUP range to the position of the 
+    first row it is in, so that we can find the matching rows for many lookup 
+    values at once with a hash lookup, rather than merging or scanning the range. 
+    """
+
+    def __init__(self, first_column: pd.Series, case_insensitive: bool):
+        keys = first_column.str.lower() if case_insensitive else first_column
+        is_first_occurrence = ~keys.duplicated(keep='first').to_numpy()
+
+        self.keys = pd.Index(keys.to_numpy()[is_first_occurrence])
+        self.row_positions = np.flatnonzero(is_first_occurrence)
+
+    def get_row_positions(self, lookup_values: Any) -> np.ndarray:
+        """
+        Returns the position of the first row that matches each lookup value, or -1 if there is no match.
+        """
+        key_positions = self.keys.get_indexer(lookup_values)
+        return np.where(key_positions >= 0, self.row_positions[key_positions], -1)
+
+
+# Maps from the id of a VLOOKUP range and the case insensitivity to a reference to the range and its LookupIndex.
+# This is shared by all of the sheets in the process, so it is only read and written while holding the lock
+_cached_lookup_indexes: Dict[Tuple[int, bool], Tuple[DataframeRef, LookupIndex]] = dict()
+_cached_lookup_indexes_lock = Lock()
+
+
+def get_lookup_index(where: pd.DataFrame, case_insensitive: bool) -> LookupIndex:
+    """
+    Returns the LookupIndex for the first column of a VLOOKUP range. As formulas often look up 
+    values in the same range, we cache the LookupIndex, and reuse it for as long as the range
+    dataframe it was built from is alive, as it is never modified in place.
+    """
+    key = (id(where), case_insensitive)
+    with _cached_lookup_indexes_lock:
+        cached_lookup_index = _cached_lookup_indexes.get(key)
+    if cached_lookup_index is not None and is_same_dataframe(cached_lookup_index[0], where):
+        return cached_lookup_index[1]
+
+    lookup_index = LookupIndex(where.iloc[:, 0], case_insensitive)
+
+    with _cached_lookup_indexes_lock:
+        _cached_lookup_indexes.pop(key, None)
+        if len(_cached_lookup_indexes) >= MAX_CACHED_LOOKUP_INDEXES:
+            # Remove the lookup index that was cached first
+            del _cached_lookup_indexes[next(iter(_cached_lookup_indexes))]
+        _cached_lookup_indexes[key] = (get_dataframe_ref(where), lookup_index)
+
+    return lookup_index
+
+
+def _get_vlookup_column(value: pd.Series, where: pd.DataFrame, row_positions: np.ndarray, index_to_return: Any) -> pd.Series:
+    """
+    Returns the values in the index_to_return column of the where range, at the matching row positions, with
+    missing values where there is no match. 
+    
+    The index is 1-based, and for consistency with how VLOOKUP used to merge the range with the lookup value, 
+    index 0 returns the case-insensitive value that matched, and -1 returns the lookup value.
+    """
+    # The columns are the lookup value, the case-insensitive first column, and then the columns in the where range
+    num_columns = len(where.columns) + 2
+    try:
+        column_index = int(index_to_return) + 1
+    except (TypeError, ValueError):
+        return pd.Series([None] * len(value), index=value.index, dtype=object)
+    if column_index < -num_columns or column_index >= num_columns:
+        return pd.Series([None] * len(value), index=value.index, dtype=object)
+    column_index = column_index % num_columns
+
+    if column_index == 0:
+        return value
+    
+    if column_index == 1:
+        column = where.iloc[:, 0].str.lower() if is_string_dtype(str(value.dtype)) else where.iloc[:, 0]
+    else:
+        column = where.iloc[:, column_index - 2]
+
+    # If nothing matches, merging returned NaN floats, even for object columns
+    if column.dtype == object and (row_positions == -1).all():
+        return pd.Series(np.nan, index=value.index)
+
+    return pd.Series(column.array.take(row_positions, allow_fill=True), index=value.index)
+
 
 @cast_values_in_arg_to_type('index', 'int')
 def VLOOKUP(lookup_value: AnyPrimitiveOrSeriesInputType, where: pd.DataFrame, index: IntRestrictedInputType) -> pd.Series:
@@ -185,8 +307,7 @@ def VLOOKUP(lookup_value: AnyPrimitiveOrSeriesInputType, where: pd.DataFrame, in
         ]
     }
     """
-    where_first_column_case_insensitive = where.iloc[:,0].copy()
-    where_first_column_case_insensitive.name = str(where_first_column_case_insensitive.name) + 'MITO_CASE_INSENSITIVE'
+    where_first_column = where.iloc[:,0]
 
     # If the lookup value and index are both a primitive, we don't need to merge. 
     if not isinstance(lookup_value, pd.Series) and isinstance(index, int):
@@ -198,58 +319,50 @@ def VLOOKUP(lookup_value: AnyPrimitiveOrSeriesInputType, where: pd.DataFrame, in
             )
 
         # If the lookup value and the first column are strings, make them lowecase for case-insensitive matching
+        case_insensitive = False
         if isinstance(lookup_value, str) and isinstance(where.iloc[0,0], str):
+            case_insensitive = True
             lookup_value = lookup_value.lower()
-            where_first_column_case_insensitive = where_first_column_case_insensitive.str.lower()
 
-        matching_row = where.loc[where_first_column_case_insensitive == lookup_value]
-        if matching_row.empty:
+        row_position = get_lookup_index(where, case_insensitive).get_row_positions([lookup_value])[0]
+        if row_position == -1:
             return None
         else:
-            return matching_row.iloc[0, index-1]
+            return where.iloc[row_position, index-1]
 
     value = get_series_from_primitive_or_series(lookup_value, where.index)
 
-    value.name = 'lookup_value'
-    indices_to_return_from_range = get_series_from_primitive_or_series(index, value.index)
-
     # If the lookup value and the first column of the where range are different types, we raise an error
-    if value.dtype != where_first_column_case_insensitive.dtype:
+    if value.dtype != where_first_column.dtype:
         raise MitoError(
             'invalid_args_error',
             'VLOOKUP',
-            f'VLOOKUP requires the lookup value and the first column of the where range to be the same type. The lookup value is of type {value.dtype} and the first column of the where range is of type {where_first_column_case_insensitive.dtype}.'
+            f'VLOOKUP requires the lookup value and the first column of the where range to be the same type. The lookup value is of type {value.dtype} and the first column of the where range is of type {where_first_column.dtype}.'
         )
 
     # If the series is a string, convert it to lowercase because Excel's vlookup is case insensitive
-    if is_string_dtype(str(value.dtype)):
+    case_insensitive = is_string_dtype(str(value.dtype))
+    if case_insensitive:
         value = value.str.lower()
-        where_first_column_case_insensitive = where_first_column_case_insensitive.str.lower()
 
-    # Add where_first_column_case_insensitive to the front of the dataframe so we can use the case insensitive merge 
-    # without effecting the return values
-    where = pd.concat([where_first_column_case_insensitive, where], axis=1)
-    indices_to_return_from_range = indices_to_return_from_range + 1
+    # The position of the first row in the where range that matches each lookup value, or -1 if there is none
+    row_positions = get_lookup_index(where, case_insensitive).get_row_positions(value.to_numpy())
 
-    where_deduplicated = where.drop_duplicates(subset=where_first_column_case_insensitive.name)
-    
-    # Update first column to use the deduplicated version
-    where_first_column = where_deduplicated.iloc[:,0]
-    
-    # Then merge on the column we're looking up from, and the df we're looking up in.
-    merged = pd.merge(value, where_deduplicated, left_on='lookup_value', right_on=where_first_column, how='left')
+    if not isinstance(index, pd.Series):
+        return _get_vlookup_column(value, where, row_positions, index)
 
-    # Change the indexes back to the indexes of the lookup value so the results 
-    # can be added back to the calling dataframe.
-    merged.index = value.index
-    
-    def get_value_at_index_in_row(row):
-        try:
-            return row.iloc[indices_to_return_from_range[row.name]]
-        # Because we can't control what the user puts in the index, we need to catch any errors
-        except Exception:
-            return None
-    return merged.apply(get_value_at_index_in_row, axis=1)
+    indices_to_return_from_range = index if index.index.equals(value.index) else index.reindex(value.index)
+
+    # We take the values for all of the rows that return the same column at once
+    unique_indices = pd.unique(indices_to_return_from_range.to_numpy())
+    if len(unique_indices) == 1:
+        return _get_vlookup_column(value, where, row_positions, unique_indices[0])
+
+    result = np.full(len(value), None, dtype=object)
+    for index_to_return in unique_indices:
+        is_index = (indices_to_return_from_range == index_to_return).to_numpy()
+        result[is_index] = _get_vlookup_column(value[is_index], where, row_positions[is_index], index_to_return).to_numpy(dtype=object)
+    return pd.Series(result, index=value.index).infer_objects()
 
 # TODO: we should see if we can list these automatically!
 MISC_FUNCTIONS = {
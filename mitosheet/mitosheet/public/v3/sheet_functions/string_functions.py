@@ -8,8 +8,10 @@ Contains all functions that can be used in a sheet that operate on strings.
 
 NOTE: This file is alphabetical order!
 """
+import re
 from typing import Callable, Optional
 
+import numpy as np
 import pandas as pd
 
 from mitosheet.public.v3.errors import handle_sheet_function_errors
@@ -22,6 +24,21 @@ from mitosheet.public.v3.types.sheet_function_types import (
     IntFunctionReturnType, IntRestrictedInputType, StringFunctionReturnType,
     StringInputType, StringRestrictedInputType)
 
+# CLEAN keeps the ASCII characters from space up to, but not including, ~
+NON_CLEAN_CHARACTERS_REGEX = re.compile('[^\\x20-\\x7d]')
+
+
+def _slice_string_series(string_series: pd.Series, start: Optional[int], stop: Optional[int]) -> pd.Series:
+    """
+    Slices each string in the series like string[start:stop], treating missing values 
+    as empty strings.
+    """
+    string_series = string_series.fillna('')
+    return pd.Series(
+        [s[start:stop] for s in string_series.to_numpy()],
+        index=string_series.index
+    )
+
 
 @cast_values_in_arg_to_type('arg', 'str')
 @handle_sheet_function_errors
@@ -47,8 +64,13 @@ def CLEAN(arg: StringRestrictedInputType) -> StringFunctionReturnType:
 
     if isinstance(arg, str):
         return clean_helper(arg)
-    
-    return arg.fillna('').apply(clean_helper)
+
+    arg = arg.fillna('')
+    # Most strings are already clean, and checking this is much faster than rebuilding them
+    return pd.Series(
+        [s if s.isascii() and s.isprintable() and '~' not in s else NON_CLEAN_CHARACTERS_REGEX.sub('', s) for s in arg.to_numpy()],
+        index=arg.index
+    )
 
 
 @cast_values_in_all_args_to_type('str')
@@ -118,6 +140,13 @@ def FIND(string: StringRestrictedInputType, substrings: StringRestrictedInputTyp
         
         return string.find(substrings) + 1
 
+    if isinstance(string, pd.Series) and isinstance(substrings, str):
+        # Building the positions as a numpy array is much faster than having pandas infer their type
+        return pd.Series(
+            np.array([s.find(substrings) for s in string.fillna('').to_numpy()], dtype=np.int64) + 1,
+            index=string.index
+        )
+
     # otherwise, turn them into series
     index = get_index_from_series(string, substrings)
     string = get_series_from_primitive_or_series(string, index).fillna('')
@@ -164,6 +193,9 @@ def LEFT(string: StringRestrictedInputType, num_chars: Optional[IntRestrictedInp
     if isinstance(string, str) and isinstance(num_chars, int):
         return left_helper(string, num_chars)
 
+    if isinstance(string, pd.Series) and isinstance(num_chars, int):
+        return _slice_string_series(string, None, num_chars)
+
     # otherwise, turn them into series for simplicity
     index = get_index_from_series(string, num_chars)
     string_series = get_series_from_primitive_or_series(string, index).fillna('')
@@ -267,6 +299,9 @@ def MID(string: StringRestrictedInputType, start_loc: IntRestrictedInputType, nu
     if isinstance(string, str) and isinstance(start_loc, int) and isinstance(num_chars, int):
         return string[start_loc - 1:start_loc + num_chars - 1]
 
+    if isinstance(string, pd.Series) and isinstance(start_loc, int) and isinstance(num_chars, int):
+        return _slice_string_series(string, start_loc - 1, start_loc + num_chars - 1)
+
     # Turn all of them into a series to simplify things
     index = get_index_from_series(string, start_loc, num_chars)
     string = get_series_from_primitive_or_series(string, index).fillna('')
@@ -340,7 +375,10 @@ def RIGHT(string: StringRestrictedInputType, num_chars: Optional[IntRestrictedIn
 
     if isinstance(string, str) and isinstance(num_chars, int):
         return right_helper(string, num_chars)
-    
+
+    if isinstance(string, pd.Series) and isinstance(num_chars, int):
+        return _slice_string_series(string, -num_chars, None) if num_chars != 0 else _slice_string_series(string, 0, 0)
+
     index = get_index_from_series(string, num_chars)
     string_series = get_series_from_primitive_or_series(string, index).fillna('')
     num_chars_series = get_series_from_primitive_or_series(num_chars, index).fillna(0)
@@ -394,6 +432,13 @@ def SUBSTITUTE(string: StringRestrictedInputType, old_text: StringRestrictedInpu
     if isinstance(string, str) and isinstance(old_text, str) and isinstance(new_text, str) and isinstance(count, int):
         return string.replace(old_text, new_text, count)
 
+    if isinstance(string, pd.Series) and isinstance(old_text, str) and isinstance(new_text, str) and isinstance(count, int):
+        string_series = string.fillna('')
+        return pd.Series(
+            [s.replace(old_text, new_text, count) for s in string_series.to_numpy()],
+            index=string_series.index
+        )
+
     index = get_index_from_series(string, old_text, new_text, count)
     string_series = get_series_from_primitive_or_series(string, index).fillna('')
     old_text_series = get_series_from_primitive_or_series(old_text, index).fillna('')
@@ -2,46 +2,49 @@ from datetime import datetime, timedelta
 from typing import Optional, Union
 
 import numpy as np
+import pandas as pd
+
+from mitosheet.public.v3.types.float import is_series_of_strings
+
+STRING_TO_BOOL_CONVERSION_DICT = {
+    '1': True,
+    '1.0': True,
+    1: True,
+    1.0: True,
+    'TRUE': True,
+    'True': True, 
+    'true': True,
+    'T': True,
+    't': True,
+    'Y': True,
+    'y': True,
+    'Yes': True,
+    'yes': True,
+    #########################
+    '0': False,
+    '0.0': False,
+    0: False,
+    0.0: False,
+    'FALSE': False,
+    'False': False,
+    'false': False,
+    'F': False,
+    'f': False,
+    'N': False,
+    'n': False,
+    'No': False,
+    'no': False, 
+    'none': False,
+    'None': False
+}
 
 
 def cast_string_to_bool(
         s: str,
     ) -> Optional[bool]:
 
-    string_to_bool_conversion_dict = {
-        '1': True,
-        '1.0': True,
-        1: True,
-        1.0: True,
-        'TRUE': True,
-        'True': True, 
-        'true': True,
-        'T': True,
-        't': True,
-        'Y': True,
-        'y': True,
-        'Yes': True,
-        'yes': True,
-        #########################
-        '0': False,
-        '0.0': False,
-        0: False,
-        0.0: False,
-        'FALSE': False,
-        'False': False,
-        'false': False,
-        'F': False,
-        'f': False,
-        'N': False,
-        'n': False,
-        'No': False,
-        'no': False, 
-        'none': False,
-        'None': False
-    }
-
-    if s in string_to_bool_conversion_dict:
-        return string_to_bool_conversion_dict[s]
+    if s in STRING_TO_BOOL_CONVERSION_DICT:
+        return STRING_TO_BOOL_CONVERSION_DICT[s]
     else:
         return None # TODO: maybe we should default to False
 
@@ -60,4 +63,27 @@ def cast_to_bool(unknown: Union[str, int, float, bool, datetime, timedelta]) ->
     elif isinstance(unknown, bool):
         return unknown
 
-    return None
\ No newline at end of file
+    return None
+
+
+def cast_series_to_bool(series: pd.Series) -> pd.Series:
+    """
+    Casts the entire series at once when we can, returning the same result 
+    as calling cast_to_bool on each element.
+    """
+    dtype = series.dtype
+    if dtype == bool:
+        return series
+    elif isinstance(dtype, np.dtype) and dtype.kind in 'iu':
+        return series != 0
+    elif isinstance(dtype, np.dtype) and dtype.kind == 'f':
+        # We cast NaN's to false
+        return (series != 0) & series.notna()
+    elif is_series_of_strings(series, skipna=False):
+        string_to_bool_conversion_dict = {key: value for key, value in STRING_TO_BOOL_CONVERSION_DICT.items() if isinstance(key, str)}
+        result = series.map(string_to_bool_conversion_dict)
+        if result.notna().all():
+            return result.astype(bool)
+        return result.astype(object).where(result.notna(), None)
+
+    return series.apply(cast_to_bool)
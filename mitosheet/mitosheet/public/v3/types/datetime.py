@@ -2,7 +2,7 @@ from datetime import datetime, timedelta
 from typing import Optional, Union
 
 import pandas as pd
-from mitosheet.is_type_utils import is_string_dtype
+from mitosheet.is_type_utils import is_datetime_dtype, is_string_dtype
 
 from mitosheet.public.v1.sheet_functions.types.utils import get_to_datetime_params
 
@@ -45,7 +45,9 @@ def cast_series_to_datetime(series: pd.Series) -> pd.Series:
     """
 
     dtype = str(series.dtype)
-    if is_string_dtype(dtype):
+    if is_datetime_dtype(dtype):
+        return series
+    elif is_string_dtype(dtype):
         return pd.to_datetime(
             series,
             errors='coerce',
@@ -1,10 +1,60 @@
 import inspect
 from functools import wraps
-from typing import Callable, List
+from typing import Any, Callable, List, Optional, Tuple
 
+from mitosheet.public.v3.errors import call_sheet_function_handling_errors
 from mitosheet.public.v3.types.utils import get_arg_cast_to_type
 from mitosheet.types import PrimitiveTypeName
 
+# The index of the arg to cast, or None to cast all args, the type to cast to and the types to ignore
+ArgCast = Tuple[Optional[int], PrimitiveTypeName, List[PrimitiveTypeName]]
+
+
+def _get_fused_sheet_function(sheet_function: Callable, arg_cast: ArgCast) -> Callable:
+    """
+    Sheet functions are usually decorated with a few casting decorators, and then with
+    handle_sheet_function_errors. Rather than wrapping the sheet function once for each 
+    decorator, we fuse them all into a single wrapper that casts the args, and then calls
+    the sheet function with call_sheet_function_handling_errors. 
+
+    To do so, the wrapper records the original sheet function, the casts it does, and the
+    parameter types, so that the next decorator can fuse itself into a new wrapper.
+    """
+    fused_sheet_function = getattr(sheet_function, 'fused_sheet_function', None)
+    handled_sheet_function = getattr(sheet_function, 'handled_sheet_function', None)
+    
+    arg_casts: List[ArgCast]
+    parameter_types: Optional[List[Tuple[str, Optional[Tuple[Any, ...]]]]]
+    if fused_sheet_function is not None:
+        original_sheet_function, arg_casts, parameter_types = fused_sheet_function
+    elif handled_sheet_function is not None:
+        (original_sheet_function, parameter_types), arg_casts = handled_sheet_function, []
+    else:
+        original_sheet_function, arg_casts, parameter_types = sheet_function, [], None
+
+    # The decorator we are fusing is outside the ones already fused, so it casts first
+    arg_casts = [arg_cast] + arg_casts
+
+    # We don't copy the attributes of the sheet function, as they describe how it is wrapped
+    @wraps(sheet_function, updated=())
+    def wrapped_sheet_function(*args):
+        final_args = list(args)
+        for arg_index, target_primitive_type_name, primitive_types_to_ignore in arg_casts:
+            if arg_index is None:
+                final_args = [
+                    get_arg_cast_to_type(target_primitive_type_name, arg, primitive_types_to_ignore=primitive_types_to_ignore)
+                    for arg in final_args
+                ]
+            elif arg_index < len(final_args):
+                final_args[arg_index] = get_arg_cast_to_type(target_primitive_type_name, final_args[arg_index])
+
+        if parameter_types is None:
+            return original_sheet_function(*final_args)
+        return call_sheet_function_handling_errors(original_sheet_function, parameter_types, final_args)
+
+    wrapped_sheet_function.fused_sheet_function = (original_sheet_function, arg_casts, parameter_types) # type: ignore
+    return wrapped_sheet_function
+
 
 def cast_values_in_all_args_to_type(
     target_primitive_type_name: PrimitiveTypeName,
@@ -12,17 +62,8 @@ def cast_values_in_all_args_to_type(
 ) -> Callable:
 
     def wrap(sheet_function):
-        @wraps(sheet_function)
-        def wrapped_sheet_function(*args):   
-
-            # For every arguement, go through and cast them to the correct type
-            final_args = [
-                get_arg_cast_to_type(target_primitive_type_name, arg, primitive_types_to_ignore=primitive_types_to_ignore)
-                for arg in args
-            ]
-
-            return sheet_function(*final_args)        
-        return wrapped_sheet_function
+        # For every arguement, go through and cast them to the correct type
+        return _get_fused_sheet_function(sheet_function, (None, target_primitive_type_name, primitive_types_to_ignore))
     return wrap
 
 
@@ -31,18 +72,9 @@ def cast_values_in_arg_to_type(
     target_primitive_type_name: PrimitiveTypeName,
 ) -> Callable:
     def wrap(sheet_function):
+        # We find the position of the arg once, rather than on every call
+        arg_names = list(inspect.signature(sheet_function).parameters.keys())
+        arg_index = arg_names.index(arg_name)
 
-        @wraps(sheet_function)
-        def wrapped_sheet_function(*args):   
-
-            arg_names = list(inspect.signature(sheet_function).parameters.keys())
-            arg_index = arg_names.index(arg_name)
-
-            final_args = [
-                get_arg_cast_to_type(target_primitive_type_name, arg) if index == arg_index else arg
-                for index, arg in enumerate(args)
-            ]
-
-            return sheet_function(*final_args)        
-        return wrapped_sheet_function
-    return wrap
\ No newline at end of file
+        return _get_fused_sheet_function(sheet_function, (arg_index, target_primitive_type_name, []))
+    return wrap
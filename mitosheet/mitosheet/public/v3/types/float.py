@@ -1,6 +1,17 @@
 
 from datetime import datetime, timedelta
-from typing import Optional, Union
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+# Sorted so that we return the biggest matching identifier
+MILLION_IDENTIFIERS = list(sorted(["Million", 'Mil', 'M', 'million', 'mil', 'm'], key=len, reverse=True))
+BILLION_IDENTIFIERS = list(sorted(["Billion", 'Bil', 'B', 'billion', 'bil', 'b'], key=len, reverse=True))
+
+# The longest strings that we cast to floats all at once, and how many we cast at a time
+MAX_FORMATTED_NUMBER_LENGTH = 32
+FORMATTED_NUMBER_CHUNK_SIZE = 100_000
 
 
 def get_million_identifier_in_string(string: str) -> Union[str, None]:
@@ -8,11 +19,7 @@ def get_million_identifier_in_string(string: str) -> Union[str, None]:
     Given a string, returns the million identifier in it. 
     Returns '' if none exist. 
     """
-    million_identifiers = ["Million", 'Mil', 'M', 'million', 'mil', 'm']
-    # So that we return the biggest matching element
-    million_identifiers = list(sorted(million_identifiers, key=len, reverse=True))
-
-    for identifier in million_identifiers:
+    for identifier in MILLION_IDENTIFIERS:
         if identifier in string:
             return identifier
 
@@ -24,12 +31,7 @@ def get_billion_identifier_in_string(string: str) -> Union[str, None]:
     Given a string, returns the billion identifier in it. 
     Returns '' if none exist. 
     """
-
-    billion_identifiers = ["Billion", 'Bil', 'B', 'billion', 'bil', 'b']
-    # So that we return the biggest matching element
-    billion_identifiers = list(sorted(billion_identifiers, key=len, reverse=True))
-
-    for identifier in billion_identifiers:
+    for identifier in BILLION_IDENTIFIERS:
         if identifier in string:
             return identifier
 
@@ -122,4 +124,171 @@ def cast_to_float(unknown: Union[str, int, float, bool, datetime, timedelta]) ->
     elif isinstance(unknown, bool):
         return float(unknown)
 
-    return None
\ No newline at end of file
+    return None
+
+
+def is_series_of_strings(series: pd.Series, skipna: bool=True) -> bool:
+    """
+    Returns True if the series is an object series that only contains strings, 
+    and missing values if skipna is True.
+    """
+    return series.dtype == object and pd.api.types.infer_dtype(series, skipna=skipna) == 'string'
+
+
+def _cast_formatted_number_strings_to_float(strings: np.ndarray, lengths: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Casts strings like 1,234.5, -$1,234, ($1,234.50) or 12.5% to floats all at once, by reading 
+    the strings as a 2D array of character codes. The result is the same as cast_string_to_float,
+    as we only cast strings where the value is exactly representable from its digits.
+
+    Returns the floats, a mask of the strings that were cast, and a mask of the strings that 
+    might be numbers but need to be cast element-wise (e.g. 1e5 or 3 Million). 
+    """
+    num_strings = len(strings)
+    chars = strings.astype(str)
+    width = chars.dtype.itemsize // 4
+    if width == 0:
+        return np.full(num_strings, np.nan), np.zeros(num_strings, dtype=bool), np.zeros(num_strings, dtype=bool)
+
+    chars = chars.view(np.uint32).reshape(num_strings, width)
+    rows = np.arange(num_strings)
+    positions = np.arange(width)
+
+    is_digit = (chars >= ord('0')) & (chars <= ord('9'))
+    is_comma = chars == ord(',')
+    is_dot = chars == ord('.')
+    is_space = (chars == ord(' ')) | ((chars >= ord('\t')) & (chars <= ord('\r')))
+
+    # Find the first and last character after stripping whitespace. Numpy pads the strings with 0's, so we 
+    # use the lengths of the strings to tell the padding apart from 0's in the strings
+    is_content = ~is_space & (positions < lengths[:, None])
+    first = is_content.argmax(axis=1)
+    last = width - 1 - is_content[:, ::-1].argmax(axis=1)
+    is_valid = is_content.any(axis=1) & (np.count_nonzero(is_content, axis=1) == last - first + 1)
+
+    # Then, remove the prefixes and parentheses in the same order as cast_string_to_float
+    def char_at(index: np.ndarray, character: str) -> np.ndarray:
+        return (index <= last) & (chars[rows, np.minimum(index, width - 1)] == ord(character))
+
+    is_negative = char_at(first, '-')
+    number_start = first + is_negative
+    number_start = number_start + char_at(number_start, '$')
+    has_parentheses = char_at(number_start, '(') & char_at(last, ')') & (number_start < last)
+    is_negative = is_negative | has_parentheses
+    number_start = number_start + has_parentheses
+    string_end = last + 1 - has_parentheses
+
+    # The commas are decided before the percentage sign is removed
+    is_percentage = char_at(string_end - 1, '%') & (string_end - 1 >= number_start)
+    number_end = string_end - is_percentage
+    is_number = (positions >= number_start[:, None]) & (positions < number_end[:, None])
+    is_valid &= ~(is_number & ~is_digit & ~is_comma & ~is_dot).any(axis=1)
+
+    is_number_comma = is_comma & is_number
+    is_number_dot = is_dot & is_number
+    num_commas = np.count_nonzero(is_number_comma, axis=1)
+    num_dots = np.count_nonzero(is_number_dot, axis=1)
+    last_comma = width - 1 - is_number_comma[:, ::-1].argmax(axis=1)
+    is_european_comma = (num_commas > 0) & (num_dots == 0) & (last_comma - number_start != string_end - number_start - 4)
+    is_valid &= np.where(is_european_comma, num_commas == 1, num_dots <= 1)
+    is_decimal_point = np.where(is_european_comma[:, None], is_number_comma, is_number_dot)
+
+    # Floats represent integers below 2^53 exactly, so dividing by an exact power of ten rounds the same as float does
+    is_number_digit = is_digit & is_number
+    num_digits = np.count_nonzero(is_number_digit, axis=1)
+    is_valid &= (num_digits > 0) & (num_digits <= 15)
+    mantissa = np.zeros(num_strings, dtype=np.int64)
+    num_decimals = np.zeros(num_strings, dtype=np.int64)
+    is_after_decimal_point = np.zeros(num_strings, dtype=bool)
+    for position in range(width):
+        is_position_digit = is_number_digit[:, position] & is_valid
+        mantissa = np.where(is_position_digit, mantissa * 10 + (chars[:, position].astype(np.int64) - ord('0')), mantissa)
+        num_decimals += is_position_digit & is_after_decimal_point
+        is_after_decimal_point |= is_decimal_point[:, position]
+
+    result = mantissa / 10.0 ** num_decimals * np.where(is_negative, -1, 1) * np.where(is_percentage, 1.0 / 100, 1.0)
+    result[~is_valid] = np.nan
+
+    # Strings without digits can only be numbers if they are nan or inf, as the heuristics only remove characters
+    might_be_number = ~is_valid
+    lower_chars = chars[might_be_number] | 0x20
+    def has_letter(letter: str) -> np.ndarray:
+        return (lower_chars == ord(letter)).any(axis=1)
+
+    might_be_number[might_be_number] = is_digit[might_be_number].any(axis=1) | (lower_chars > 127).any(axis=1) | (has_letter('n') & (has_letter('a') | (has_letter('i') & has_letter('f'))))
+
+    return result, is_valid, might_be_number
+
+
+def cast_string_series_to_float(series: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Casting strings to floats element-wise is slow, so this casts the common formats of
+    numbers all at once, and only casts the rest element-wise with cast_string_to_float. 
+    Returns the floats, and a mask of the strings that could be cast.
+    """
+    values = series.to_numpy(dtype=object)
+    try:
+        # Optimistically handle the case where every string is a number
+        return values.astype(np.float64), np.ones(len(values), dtype=bool)
+    except (ValueError, TypeError):
+        pass
+
+    result = np.full(len(values), np.nan)
+    is_cast = np.zeros(len(values), dtype=bool)
+    needs_element_cast = np.zeros(len(values), dtype=bool)
+
+    # We read strings in chunks, and leave long strings to be cast element-wise, so we don't use too much memory
+    lengths = np.fromiter(map(len, values), dtype=np.int64, count=len(values))
+    is_short = lengths <= MAX_FORMATTED_NUMBER_LENGTH
+    needs_element_cast[~is_short] = True
+    short_indexes = np.flatnonzero(is_short)
+    for chunk_start in range(0, len(short_indexes), FORMATTED_NUMBER_CHUNK_SIZE):
+        chunk_indexes = short_indexes[chunk_start:chunk_start + FORMATTED_NUMBER_CHUNK_SIZE]
+        result[chunk_indexes], is_cast[chunk_indexes], needs_element_cast[chunk_indexes] = _cast_formatted_number_strings_to_float(values[chunk_indexes], lengths[chunk_indexes])
+
+    # Columns often repeat the same strings, so we only cast each unique string once
+    cast_strings: Dict[str, Optional[float]] = {}
+    for index in np.flatnonzero(needs_element_cast):
+        string = values[index]
+        if string not in cast_strings:
+            cast_strings[string] = cast_string_to_float(string)
+
+        value = cast_strings[string]
+        if value is not None:
+            result[index] = value
+            is_cast[index] = True
+
+    return result, is_cast
+
+
+def get_series_from_cast_string_series(series: pd.Series) -> pd.Series:
+    """
+    Given a series of strings and missing values, returns the series with each string cast
+    to a float, matching the result of casting each element. Missing values stay NaN, except
+    for missing values that are not floats (e.g. None), which casting turns into None. 
+    """
+    is_missing = series.isna().to_numpy()
+    result = np.full(len(series), np.nan)
+    is_float = np.zeros(len(series), dtype=bool)
+    result[~is_missing], is_float[~is_missing] = cast_string_series_to_float(series[~is_missing])
+    is_float[is_missing] = [isinstance(value, float) for value in series[is_missing]]
+
+    # If every element is cast to None, then pandas does not make the series a float series
+    if not is_float.any():
+        return pd.Series([None] * len(series), index=series.index, name=series.name, dtype=object)
+
+    return pd.Series(result, index=series.index, name=series.name)
+
+
+def cast_series_to_float(series: pd.Series) -> pd.Series:
+    """
+    Casts the entire series at once when we can, returning the same result 
+    as calling cast_to_float on each element.
+    """
+    dtype = series.dtype
+    if isinstance(dtype, np.dtype) and dtype.kind in 'biuf':
+        return series.astype(np.float64, copy=False)
+    elif is_series_of_strings(series):
+        return get_series_from_cast_string_series(series)
+
+    return series.apply(cast_to_float)
@@ -2,6 +2,9 @@
 from datetime import datetime, timedelta
 from typing import Optional, Union
 
+import numpy as np
+import pandas as pd
+
 from mitosheet.public.v3.errors import make_invalid_param_type_conversion_error
 from mitosheet.public.v3.types.float import cast_string_to_float
 
@@ -26,4 +29,20 @@ def cast_to_int(unknown: Union[str, int, float, bool, datetime, timedelta]) -> O
         except:
             raise make_invalid_param_type_conversion_error(unknown, 'int')
 
-    return None
\ No newline at end of file
+    return None
+
+
+def cast_series_to_int(series: pd.Series) -> pd.Series:
+    """
+    Casts the entire series at once when we can, returning the same result 
+    as calling cast_to_int on each element.
+    """
+    dtype = series.dtype
+    if isinstance(dtype, np.dtype) and (dtype.kind in 'bi' or (dtype.kind == 'u' and dtype.itemsize < 8)):
+        return series.astype(np.int64, copy=False)
+    elif isinstance(dtype, np.dtype) and dtype.kind == 'f' and (series.abs() < 2**63).all():
+        # NaN and infinite values cannot be cast to an int, so we let casting
+        # each element raise the error in that case
+        return series.astype(np.int64)
+
+    return series.apply(cast_to_int)
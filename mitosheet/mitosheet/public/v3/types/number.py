@@ -2,7 +2,12 @@
 from datetime import datetime, timedelta
 from typing import Optional, Union
 
-from mitosheet.public.v3.types.float import cast_string_to_float
+import numpy as np
+import pandas as pd
+
+from mitosheet.public.v3.types.float import (cast_string_to_float,
+                                             get_series_from_cast_string_series,
+                                             is_series_of_strings)
 
 
 def cast_to_number(unknown: Union[str, int, float, bool, datetime, timedelta]) -> Optional[Union[int, float]]:
@@ -20,4 +25,20 @@ def cast_to_number(unknown: Union[str, int, float, bool, datetime, timedelta]) -
         return unknown
     
 
-    return None
\ No newline at end of file
+    return None
+
+
+def cast_series_to_number(series: pd.Series) -> pd.Series:
+    """
+    Casts the entire series at once when we can, returning the same result 
+    as calling cast_to_number on each element.
+    """
+    dtype = series.dtype
+    if isinstance(dtype, np.dtype) and (dtype.kind in 'bi' or (dtype.kind == 'u' and dtype.itemsize < 8)):
+        return series.astype(np.int64, copy=False)
+    elif isinstance(dtype, np.dtype) and dtype.kind == 'f':
+        return series.astype(np.float64, copy=False)
+    elif is_series_of_strings(series):
+        return get_series_from_cast_string_series(series)
+
+    return series.apply(cast_to_number)
@@ -2,9 +2,34 @@ from datetime import datetime, timedelta
 from typing import Optional, Union
 
 import numpy as np
+import pandas as pd
+
+from mitosheet.public.v3.types.float import is_series_of_strings
+
 
 def cast_to_string(unknown: Union[str, int, float, bool, datetime, timedelta]) -> Optional[str]:
     if isinstance(unknown, float) and np.isnan(unknown):
         return None
 
-    return str(unknown)
\ No newline at end of file
+    return str(unknown)
+
+
+def cast_series_to_string(series: pd.Series) -> pd.Series:
+    """
+    Casts the entire series at once when we can, returning the same result 
+    as calling cast_to_string on each element.
+    """
+    dtype = series.dtype
+    if isinstance(dtype, np.dtype) and (dtype.kind in 'biu' or dtype == np.float64):
+        return series.astype(str).where(series.notna(), None)
+    elif is_series_of_strings(series):
+        # Casting turns NaN into None, but any other missing value into a string
+        missing_values = series[series.isna()]
+        if all(isinstance(value, float) for value in missing_values):
+            return series.where(series.notna(), None) if len(missing_values) > 0 else series
+    elif str(dtype) == 'string':
+        # String columns, like string[pyarrow], already hold strings. We cast their missing
+        # values to None, as we do NaN in object columns, rather than to the string '<NA>'
+        return series.astype(object).where(series.notna(), None)
+
+    return series.apply(cast_to_string)
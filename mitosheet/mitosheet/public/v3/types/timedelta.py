@@ -2,6 +2,7 @@ from datetime import datetime, timedelta
 from typing import Optional, Union
 
 import pandas as pd
+from mitosheet.is_type_utils import is_timedelta_dtype
 
 def cast_to_timedelta(unknown: Union[str, int, float, bool, datetime, timedelta]) -> Optional[timedelta]:
     if isinstance(unknown, str):
@@ -13,4 +14,15 @@ def cast_to_timedelta(unknown: Union[str, int, float, bool, datetime, timedelta]
     elif isinstance(unknown, timedelta):
         return unknown
 
-    return None
\ No newline at end of file
+    return None
+
+
+def cast_series_to_timedelta(series: pd.Series) -> pd.Series:
+    """
+    Timedelta series do not need to be cast, so we only cast other 
+    series element-wise.
+    """
+    if is_timedelta_dtype(str(series.dtype)):
+        return series
+
+    return series.apply(cast_to_timedelta)
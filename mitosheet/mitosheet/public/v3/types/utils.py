@@ -5,23 +5,23 @@ import pandas as pd
 from mitosheet.is_type_utils import is_bool_dtype, is_datetime_dtype, is_float_dtype, is_int_dtype, is_string_dtype, is_timedelta_dtype
 
 from mitosheet.public.v3.rolling_range import RollingRange
-from mitosheet.public.v3.types.bool import cast_to_bool
+from mitosheet.public.v3.types.bool import cast_series_to_bool, cast_to_bool
 from mitosheet.public.v3.types.datetime import cast_series_to_datetime, cast_to_datetime
-from mitosheet.public.v3.types.float import cast_to_float
-from mitosheet.public.v3.types.int import cast_to_int
-from mitosheet.public.v3.types.number import cast_to_number
-from mitosheet.public.v3.types.str import cast_to_string
-from mitosheet.public.v3.types.timedelta import cast_to_timedelta
+from mitosheet.public.v3.types.float import cast_series_to_float, cast_to_float
+from mitosheet.public.v3.types.int import cast_series_to_int, cast_to_int
+from mitosheet.public.v3.types.number import cast_series_to_number, cast_to_number
+from mitosheet.public.v3.types.str import cast_series_to_string, cast_to_string
+from mitosheet.public.v3.types.timedelta import cast_series_to_timedelta, cast_to_timedelta
 from mitosheet.types import PrimitiveTypeName
 
 SERIES_CONVERSION_FUNCTIONS: Dict[PrimitiveTypeName, Optional[Callable[[pd.Series], pd.Series]]] = {
-    'str': None,
-    'int': None,
-    'float': None,
-    'number': None,
-    'bool': None,
+    'str': cast_series_to_string,
+    'int': cast_series_to_int,
+    'float': cast_series_to_float,
+    'number': cast_series_to_number,
+    'bool': cast_series_to_bool,
     'datetime': cast_series_to_datetime,
-    'timedelta': None,
+    'timedelta': cast_series_to_timedelta,
 }
 
 ELEMENT_CONVERSION_FUNCTIONS: Dict[PrimitiveTypeName, Callable[[Any], Optional[Any]]] = {
@@ -99,6 +99,10 @@ def get_arg_cast_to_type(
 
     if series_conversion_function_without_skip is not None:
         def series_conversion_function(arg: Any) -> Any:
+            # An object series can have elements of any type, so we have to check each element for types to ignore
+            if len(primitive_types_to_ignore) > 0 and arg.dtype == object: # type: ignore
+                return arg.apply(element_conversion_function)
+
             arg_type_name = get_primitive_type_name_from_series(arg)
             if arg_type_name in primitive_types_to_ignore: # type: ignore
                 return arg
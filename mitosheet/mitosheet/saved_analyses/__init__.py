@@ -10,7 +10,8 @@ from mitosheet.saved_analyses.save_utils import (
     _get_all_analysis_filenames, _delete_analyses,
     SAVED_ANALYSIS_FOLDER, read_analysis,
     get_steps_obj_for_saved_analysis, get_analysis_exists, 
-    get_saved_analysis_string
+    get_saved_analysis_string, write_saved_analysis_string
 )
+from mitosheet.saved_analyses.saved_analysis_writer import SavedAnalysisWriter
 from mitosheet.saved_analyses.upgrade import is_prev_version
 from mitosheet.saved_analyses.upgrade import upgrade_saved_analysis_to_current_version
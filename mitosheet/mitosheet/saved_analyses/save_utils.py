@@ -11,7 +11,8 @@ in analyses.
 from mitosheet.step import Step
 import os
 import json
-from typing import Any, Dict, List, Optional
+import tempfile
+from typing import Any, Dict, List, Optional, Set
 from mitosheet._version import __version__
 from mitosheet.types import CodeOptions, StepsManagerType
 from mitosheet.utils import NpEncoder
@@ -31,6 +32,10 @@ def get_analysis_exists(analysis_name: Optional[str]) -> bool:
     if analysis_name is None:
         return False
 
+    # If the analysis is being written in the background, we wait for it to be written
+    from mitosheet.saved_analyses.saved_analysis_writer import flush_saved_analysis_writers
+    flush_saved_analysis_writers(analysis_name)
+
     analysis_path = f'{SAVED_ANALYSIS_FOLDER}/{analysis_name}.json'
     return os.path.exists(analysis_path)
 
@@ -41,6 +46,10 @@ def read_analysis(analysis_name: str) -> Optional[Dict[str, Any]]:
     representing it.
     """
 
+    # If the analysis is being written in the background, we wait for it to be written
+    from mitosheet.saved_analyses.saved_analysis_writer import flush_saved_analysis_writers
+    flush_saved_analysis_writers(analysis_name)
+
     analysis_path = f'{SAVED_ANALYSIS_FOLDER}/{analysis_name}.json'
     if not os.path.exists(analysis_path):
         return None
@@ -120,7 +129,7 @@ def rename_saved_analysis(old_analysis_name, new_analysis_name):
 def get_saved_analysis_string(steps_manager: StepsManagerType) -> str:
     saved_analysis_string = json.dumps({
         'version': __version__,
-        'steps_data': get_steps_obj_for_saved_analysis(steps_manager.steps_including_skipped),
+        'steps_data': get_steps_obj_for_saved_analysis(steps_manager.steps_including_skipped, steps_manager.get_step_indexes_to_skip()),
         'public_interface_version': steps_manager.public_interface_version,
         'args': steps_manager.original_args_raw_strings,
         'code': steps_manager.code(),
@@ -128,14 +137,22 @@ def get_saved_analysis_string(steps_manager: StepsManagerType) -> str:
     }, cls=NpEncoder)
     return saved_analysis_string
 
-def _write_saved_analysis_file(analysis_path: str, steps_manager: StepsManagerType) -> None:
-    saved_analysis_string = get_saved_analysis_string(steps_manager)
-    with open(analysis_path, 'w+') as f:
-        f.write(saved_analysis_string)
+def _write_saved_analysis_file(analysis_path: str, saved_analysis_string: str) -> None:
+    # We write to a temporary file, and then replace the saved analysis with it, so that
+    # the saved analysis is never partially written if we are interrupted while writing
+    fd, temp_analysis_path = tempfile.mkstemp(dir=os.path.dirname(analysis_path), suffix='.json.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(saved_analysis_string)
+        os.replace(temp_analysis_path, analysis_path)
+    except:
+        os.remove(temp_analysis_path)
+        raise
 
 
 def get_steps_obj_for_saved_analysis(
-        steps: List[Step]
+        steps: List[Step],
+        skipped_step_indexes: Optional[Set[int]]=None
     ) -> List[Dict[str, Any]]:
     """
     Given a steps dictonary from a steps_manager, puts the steps
@@ -157,13 +174,15 @@ def get_steps_obj_for_saved_analysis(
 
     Notably, does not return any skipped steps, which is necessary
     because we don't save the step id, so then we cannot detect
-    which should be skipped properly
+    which should be skipped properly. If the skipped_step_indexes are not
+    passed, they are computed from the steps.
     """
     from mitosheet.steps_manager import get_step_indexes_to_skip
 
     steps_json_obj = []
 
-    skipped_step_indexes = get_step_indexes_to_skip(steps)
+    if skipped_step_indexes is None:
+        skipped_step_indexes = get_step_indexes_to_skip(steps)
 
     for step_index, step in enumerate(steps):
         # Skip the initialize step
@@ -195,15 +214,19 @@ def write_save_analysis_file(steps_manager: StepsManagerType, analysis_name: Opt
     date steps, but we save them all, as they will play back validly
     as they were valid when they were added.
     """
-
-    if not os.path.exists(MITO_FOLDER):
-        os.mkdir(MITO_FOLDER)
-
-    if not os.path.exists(SAVED_ANALYSIS_FOLDER):
-        os.mkdir(SAVED_ANALYSIS_FOLDER)
-
     if analysis_name is None:
         analysis_name = steps_manager.analysis_name
 
+    write_saved_analysis_string(analysis_name, get_saved_analysis_string(steps_manager))
+
+def write_saved_analysis_string(analysis_name: str, saved_analysis_string: str) -> None:
+    """
+    Writes a saved analysis string from get_saved_analysis_string to 
+    ~/.mito/{analysis_name}. This only touches the file system, and not 
+    the steps manager, so it is safe to call while the sheet is being edited.
+    """
+    # NOTE: the analysis is written in the background, so we allow the folders to be created concurrently
+    os.makedirs(SAVED_ANALYSIS_FOLDER, exist_ok=True)
+
     analysis_path = f'{SAVED_ANALYSIS_FOLDER}/{analysis_name}.json'
-    _write_saved_analysis_file(analysis_path, steps_manager)
\ No newline at end of file
+    _write_saved_analysis_file(analysis_path, saved_analysis_string)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Contains the SavedAnalysisWriter, which writes the saved analysis of a
+mitosheet in the background, so that edits do not wait on the file system.
+
+The saved analysis is built on the thread that requests the write, as building
+it transpiles the steps, which reads their states while they may be evicted or
+rebuilt by the next edit. Only writing the file happens in the background.
+"""
+import atexit
+import weakref
+from threading import Condition, Thread
+from time import perf_counter
+from typing import Optional, Tuple
+
+from mitosheet.saved_analyses.save_utils import get_saved_analysis_string, write_saved_analysis_string
+from mitosheet.types import StepsManagerType
+
+# How long we wait after a write is requested before writing, so that a burst
+# of edits only writes the analysis once
+SAVED_ANALYSIS_WRITE_DELAY_SECONDS = .5
+
+# How long we wait for the pending writes to finish when the kernel shuts down
+MAX_FLUSH_SECONDS_ON_EXIT = 10
+
+# The writers that may have pending writes, which we flush when the kernel shuts down
+_saved_analysis_writers: 'weakref.WeakSet[SavedAnalysisWriter]' = weakref.WeakSet()
+
+
+class SavedAnalysisWriter():
+    """
+    Writes the analysis of a steps manager to its saved analysis file on a background
+    thread. Writes that are requested while a write is waiting to happen replace that
+    write, and the thread exits once there are no writes to make.
+    """
+
+    def __init__(self, steps_manager: StepsManagerType, write_delay_seconds: float=SAVED_ANALYSIS_WRITE_DELAY_SECONDS):
+        self.steps_manager = steps_manager
+        self.write_delay_seconds = write_delay_seconds
+
+        # The condition guards all of the following variables
+        self.condition = Condition()
+        self.last_write_request_time: Optional[float] = None
+        # The analysis name and saved analysis string of the last requested write
+        self.requested_write: Optional[Tuple[str, str]] = None
+        self.flush_requested = False
+        self.thread: Optional[Thread] = None
+
+        _saved_analysis_writers.add(self)
+
+    def request_write(self) -> None:
+        """
+        Writes the analysis once no write has been requested for write_delay_seconds.
+        """
+        # We place building the saved analysis inside of a try catch, as failing to save
+        # the analysis should never stop the edit that requested the write
+        try:
+            requested_write = (self.steps_manager.analysis_name, get_saved_analysis_string(self.steps_manager))
+        except:
+            return
+
+        with self.condition:
+            self.requested_write = requested_write
+            self.last_write_request_time = perf_counter()
+            if self.thread is None:
+                self.thread = Thread(target=self._write_requested_analyses, daemon=True)
+                self.thread.start()
+            self.condition.notify_all()
+
+    def flush(self, timeout: Optional[float]=None) -> bool:
+        """
+        Writes any requested write now, and waits for it to finish. Returns
+        False if the write did not finish within the timeout.
+        """
+        with self.condition:
+            if self.thread is None:
+                return True
+            self.flush_requested = True
+            self.condition.notify_all()
+            return self.condition.wait_for(lambda: self.thread is None, timeout)
+
+    def _write_requested_analyses(self) -> None:
+        while True:
+            with self.condition:
+                if self.last_write_request_time is None or self.requested_write is None:
+                    # There are no writes left to make, so we exit this thread
+                    self.thread = None
+                    self.flush_requested = False
+                    self.condition.notify_all()
+                    return
+
+                # Wait till no write has been requested for the delay
+                while not self.flush_requested:
+                    remaining_seconds = self.last_write_request_time + self.write_delay_seconds - perf_counter()
+                    if remaining_seconds <= 0:
+                        break
+                    self.condition.wait(remaining_seconds)
+
+                self.last_write_request_time = None
+                analysis_name, saved_analysis_string = self.requested_write
+                self.requested_write = None
+
+            # We place the write inside of a try catch, as failing to save the analysis
+            # should never stop the writes that are requested after it
+            try:
+                write_saved_analysis_string(analysis_name, saved_analysis_string)
+            except:
+                pass
+
+
+def flush_saved_analysis_writers(analysis_name: Optional[str]=None) -> None:
+    """
+    Writes all of the requested writes, or just the requested writes of the analysis
+    with the given name. We flush all of the writes when the kernel shuts down.
+    """
+    for saved_analysis_writer in list(_saved_analysis_writers):
+        if analysis_name is None or saved_analysis_writer.steps_manager.analysis_name == analysis_name:
+            saved_analysis_writer.flush(timeout=MAX_FLUSH_SECONDS_ON_EXIT)
+
+
+atexit.register(flush_saved_analysis_writers)
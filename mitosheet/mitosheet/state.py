@@ -168,6 +168,89 @@ class State:
             user_defined_editors=deepcopy(self.user_defined_editors),
         )
 
+    def copy_on_write(self, modified_sheet_indexes: Union[List[int], Set[int]]) -> "State":
+        """
+        Returns a copy of the state that structurally shares everything it can
+        with this state. Only the dataframes and per-sheet metadata of the sheets
+        in modified_sheet_indexes get new objects; all other sheets are shared
+        between this state and the returned state.
+
+        The lists themselves are always new, so appending, removing or replacing
+        a sheet in the returned state does not change this state. However, the
+        caller must not mutate the dataframe or metadata of any sheet that is not
+        in modified_sheet_indexes, as this would also change this state. If you
+        cannot guarantee this, use copy instead.
+        """
+        modified_sheet_indexes = set(modified_sheet_indexes)
+
+        def copy_modified(values: List[Any]) -> List[Any]:
+            return [
+                deepcopy(value) if sheet_index in modified_sheet_indexes else value
+                for sheet_index, value in enumerate(values)
+            ]
+
+        return State(
+            [df.copy(deep=True) if index in modified_sheet_indexes else df for index, df in enumerate(self.dfs)],
+            self.public_interface_version,
+            df_names=list(self.df_names),
+            df_sources=list(self.df_sources),
+            column_ids=self.column_ids.copy_on_write(modified_sheet_indexes),
+            column_formulas=copy_modified(self.column_formulas),
+            column_filters=copy_modified(self.column_filters),
+            df_formats=copy_modified(self.df_formats),
+            graph_data_array=list(self.graph_data_array),
+            user_defined_functions=list(self.user_defined_functions),
+            user_defined_importers=list(self.user_defined_importers),
+            user_defined_editors=list(self.user_defined_editors),
+        )
+
+    def is_sheet_shared_with(self, other_state: "State", sheet_index: int) -> bool:
+        """
+        Returns True if the sheet at sheet_index is exactly the same in this state and
+        the other_state -- that is, the dataframe and all of its metadata are the same
+        objects, as they are when one state is a copy_on_write of the other that did
+        not modify this sheet.
+        """
+        if sheet_index >= len(self.dfs) or sheet_index >= len(other_state.dfs):
+            return False
+
+        return self.dfs[sheet_index] is other_state.dfs[sheet_index] \
+            and self.df_names[sheet_index] == other_state.df_names[sheet_index] \
+            and self.df_sources[sheet_index] == other_state.df_sources[sheet_index] \
+            and self.column_ids.column_id_to_column_header[sheet_index] is other_state.column_ids.column_id_to_column_header[sheet_index] \
+            and self.column_ids.column_header_to_column_id[sheet_index] is other_state.column_ids.column_header_to_column_id[sheet_index] \
+            and self.column_formulas[sheet_index] is other_state.column_formulas[sheet_index] \
+            and self.column_filters[sheet_index] is other_state.column_filters[sheet_index] \
+            and self.df_formats[sheet_index] is other_state.df_formats[sheet_index]
+
+    def copy_on_write_with_sheets_from(self, other_state: "State", sheet_indexes: Collection[int]) -> "State":
+        """
+        Returns a copy_on_write of this state, where the sheets in sheet_indexes are
+        instead shared with the other_state. Sheet indexes past the end of this state
+        are appended, in order.
+
+        As with copy_on_write, the caller must not mutate any of the shared sheets.
+        """
+        new_state = self.copy_on_write(set())
+        for sheet_index in sorted(sheet_indexes):
+            sheet_values = [
+                (new_state.dfs, other_state.dfs),
+                (new_state.df_names, other_state.df_names),
+                (new_state.df_sources, other_state.df_sources),
+                (new_state.column_ids.column_id_to_column_header, other_state.column_ids.column_id_to_column_header),
+                (new_state.column_ids.column_header_to_column_id, other_state.column_ids.column_header_to_column_id),
+                (new_state.column_formulas, other_state.column_formulas),
+                (new_state.column_filters, other_state.column_filters),
+                (new_state.df_formats, other_state.df_formats),
+            ]
+            for values, other_values in sheet_values:
+                if sheet_index < len(values):
+                    values[sheet_index] = other_values[sheet_index]
+                else:
+                    values.append(other_values[sheet_index])
+
+        return new_state
+
     def add_df_to_state(
         self,
         new_df: pd.DataFrame,
@@ -4,8 +4,11 @@
 # Copyright (c) Saga Inc.
 # Distributed under the terms of the GPL License.
 
-from typing import Any, Dict, List, Optional, Set, Type
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Type
 import json
+import re
+from copy import deepcopy
+from threading import RLock
 from mitosheet.code_chunks.code_chunk import CodeChunk
 from mitosheet.step_performers.step_performer import StepPerformer
 from mitosheet.step_performers.column_steps.set_column_formula import SetColumnFormulaStepPerformer
@@ -56,14 +59,117 @@ class Step:
         self.params = params
 
         # The state at the start of this step; is None only for the initialize step
-        self.prev_state = prev_state
+        self._prev_state = prev_state
         # The state you get from executing the prev_state with the passed params
-        self.post_state = post_state
+        self._post_state = post_state
         # execution_data is data from the execution of the data transformation that
         # is useful for the transpiler - that means the transpiler can do way less
         # work if it has already been done. See simple_import for an example
         self.execution_data = execution_data if execution_data is not None else {}
 
+        # If the states of this step have been evicted to save memory, this is the
+        # function that rebuilds them. See StepsManager.enforce_state_retention_policy
+        self._evicted_states_rebuilder: Optional[Callable[['Step'], None]] = None
+        # The lock that the states are evicted and rebuilt under, which is set the first 
+        # time the states are evicted, and is the same for all the steps of an analysis
+        self._states_lock: Optional[RLock] = None
+
+        # The code chunks from the last time this step was transpiled, along with the
+        # step id, params, prev_state and execution_data they were transpiled from
+        self._code_chunks_cache: Optional[Tuple[str, Dict[str, Any], Optional[State], Dict[str, Any], List[CodeChunk]]] = None
+
+    @property
+    def prev_state(self) -> Optional[State]:
+        return self._get_states()[0]
+
+    @prev_state.setter
+    def prev_state(self, prev_state: Optional[State]) -> None:
+        self._prev_state = prev_state
+
+    @property
+    def post_state(self) -> Optional[State]:
+        return self._get_states()[1]
+
+    @post_state.setter
+    def post_state(self, post_state: Optional[State]) -> None:
+        self._post_state = post_state
+
+    @property
+    def states_evicted(self) -> bool:
+        return self._evicted_states_rebuilder is not None
+
+    def evict_states(self, rebuilder: Callable[['Step'], None], states_lock: RLock) -> None:
+        """
+        Drops the prev and post state of this step, so that the dataframes
+        in them can be garbage collected. The next time either state is 
+        accessed, the rebuilder is called to recompute them under the states_lock. 
+        """
+        # The lock is set before the states are dropped, so that _get_states sees it
+        self._states_lock = states_lock
+        with states_lock:
+            self._prev_state = None
+            self._post_state = None
+            self._evicted_states_rebuilder = rebuilder
+            # The code chunks refer to the prev_state, so we drop them as well
+            self._code_chunks_cache = None
+
+    def restore_states(self, prev_state: Optional[State], post_state: Optional[State]) -> None:
+        """
+        Sets the states of a step after they were evicted and rebuilt.
+        """
+        self._prev_state = prev_state
+        self._post_state = post_state
+        self._evicted_states_rebuilder = None
+
+    def get_retained_states(self) -> List[State]:
+        """
+        Returns the states that this step currently keeps in memory, 
+        without rebuilding them if they have been evicted.
+        """
+        return [state for state in [self._prev_state, self._post_state] if state is not None]
+
+    def execute_on_state(self, prev_state: State) -> State:
+        """
+        Executes this step on the given prev_state with its current params, 
+        and returns the resulting post_state without updating the step. This
+        is used to rebuild evicted states, and so does not saturate the params 
+        again, as they were saturated when this step was first executed.
+        """
+        post_state_and_execution_data = self.step_performer.execute(prev_state, self.params)
+        if post_state_and_execution_data is None:
+            return prev_state
+        return post_state_and_execution_data[0]
+
+    def _get_states(self) -> Tuple[Optional[State], Optional[State]]:
+        """
+        Returns the prev and post state of this step, rebuilding them first if they 
+        were evicted. Once the states can be evicted, they are rebuilt and read under
+        the states lock, so that another thread cannot evict them in between.
+        """
+        if self._states_lock is None:
+            states = (self._prev_state, self._post_state)
+            # If the states were not evicted while we read them, they are the states of this step
+            if self._states_lock is None:
+                return states
+
+        with self._states_lock:
+            self._rebuild_evicted_states()
+            return self._prev_state, self._post_state
+
+    def _rebuild_evicted_states(self) -> None:
+        rebuilder = self._evicted_states_rebuilder
+        if rebuilder is None:
+            return
+        
+        # Clear the rebuilder first, so accessing the states while rebuilding cannot recurse
+        self._evicted_states_rebuilder = None
+        try:
+            rebuilder(self)
+        except:
+            # If we fail to rebuild, we keep the states evicted, so we can try again later
+            self._evicted_states_rebuilder = rebuilder
+            raise
+
 
     @property
     def dfs(self):
@@ -131,7 +237,118 @@ class Step:
         return self.post_state if self.post_state is not None else \
             (self.prev_state if self.prev_state is not None else State([], 1))
 
-    def set_prev_state_and_execute(self, new_prev_state: State, previous_steps: List["Step"]) -> bool:
+    def get_code_chunks(self) -> List[CodeChunk]:
+        """
+        Returns the code chunks that this step transpiles to. Transpiling only depends 
+        on the step id, params, prev_state and execution_data of the step, so the code
+        chunks are cached until one of them changes.
+
+        NOTE: the code chunks are shared between all callers, and so must not be modified.
+        """
+        prev_state = self.prev_state
+        if self._code_chunks_cache is not None:
+            step_id, params, cached_prev_state, execution_data, code_chunks = self._code_chunks_cache
+            if step_id == self.step_id and cached_prev_state is prev_state and execution_data is self.execution_data and params == self.params:
+                return list(code_chunks)
+
+        code_chunks = self.step_performer.transpile(
+            prev_state, # type: ignore
+            self.params,
+            self.execution_data,
+        )
+        self._code_chunks_cache = (self.step_id, deepcopy(self.params), prev_state, self.execution_data, code_chunks)
+        return list(code_chunks)
+
+    def get_read_sheet_indexes(self) -> Optional[Set[int]]:
+        """
+        Returns the indexes of the sheets in the prev_state that executing this step
+        reads from, or None if this step might read from any sheet.
+
+        These are the sheets the step modifies, the source sheets of any sheets that
+        its code chunks create, and any other sheet its code refers to by name (e.g.
+        a VLOOKUP into another sheet).
+        """
+        if self._prev_state is None:
+            return None
+
+        modified_dataframe_indexes = self.step_performer.get_modified_dataframe_indexes(self.params)
+        if len(modified_dataframe_indexes) == 0:
+            return None
+        
+        read_sheet_indexes = {sheet_index for sheet_index in modified_dataframe_indexes if sheet_index != -1}
+
+        try:
+            code_chunks = self.get_code_chunks()
+            code_lines: List[str] = []
+            for code_chunk in code_chunks:
+                created_sheet_indexes = code_chunk.get_created_sheet_indexes()
+                if created_sheet_indexes is not None and len(created_sheet_indexes) > 0:
+                    source_sheet_indexes = code_chunk.get_source_sheet_indexes()
+                    if source_sheet_indexes is None:
+                        return None
+                    read_sheet_indexes.update(source_sheet_indexes)
+                code_lines.extend(code_chunk.get_code()[0])
+        except:
+            return None
+
+        code = '\n'.join(code_lines)
+        for sheet_index, df_name in enumerate(self._prev_state.df_names):
+            if re.search(r'\b' + re.escape(df_name) + r'\b', code):
+                read_sheet_indexes.add(sheet_index)
+
+        return read_sheet_indexes
+
+    def get_reusable_post_state(self, new_prev_state: State, params: Dict[str, Any]) -> Optional[State]:
+        """
+        If executing this step on new_prev_state with params is guaranteed to give the
+        same result as the last time this step was executed, returns the post_state this
+        execution would create without executing the step. Otherwise, returns None.
+
+        This is the case when the params are the same, and every sheet that the step reads
+        is shared between the old and the new prev_state. The returned state shares the
+        sheets this step wrote with the old post_state, and all other sheets with the 
+        new_prev_state.
+        """
+        old_prev_state, old_post_state = self._prev_state, self._post_state
+        if old_prev_state is None or old_post_state is None or params != self.params:
+            return None
+
+        # The names of the dataframes, and any user defined functions, may be used in execution
+        if old_prev_state.df_names != new_prev_state.df_names \
+            or old_prev_state.public_interface_version != new_prev_state.public_interface_version \
+            or not _are_elements_identical(old_prev_state.user_defined_functions, new_prev_state.user_defined_functions) \
+            or not _are_elements_identical(old_prev_state.user_defined_importers, new_prev_state.user_defined_importers) \
+            or not _are_elements_identical(old_prev_state.user_defined_editors, new_prev_state.user_defined_editors):
+            return None
+
+        # We only reuse steps that just change sheets, and not graphs or other metadata
+        if len(old_post_state.dfs) < len(old_prev_state.dfs) \
+            or not _are_elements_identical(old_prev_state.graph_data_array, old_post_state.graph_data_array) \
+            or not _are_elements_identical(old_prev_state.user_defined_functions, old_post_state.user_defined_functions) \
+            or not _are_elements_identical(old_prev_state.user_defined_importers, old_post_state.user_defined_importers) \
+            or not _are_elements_identical(old_prev_state.user_defined_editors, old_post_state.user_defined_editors):
+            return None
+
+        read_sheet_indexes = self.get_read_sheet_indexes()
+        if read_sheet_indexes is None:
+            return None
+
+        for sheet_index in read_sheet_indexes:
+            if not old_prev_state.is_sheet_shared_with(new_prev_state, sheet_index):
+                return None
+
+        written_sheet_indexes = set(range(len(old_prev_state.dfs), len(old_post_state.dfs)))
+        for sheet_index in range(len(old_prev_state.dfs)):
+            if not old_prev_state.is_sheet_shared_with(old_post_state, sheet_index):
+                # If the step wrote a sheet it does not read, the write may depend on 
+                # the sheet that is now different, so we must execute it again
+                if sheet_index not in read_sheet_indexes:
+                    return None
+                written_sheet_indexes.add(sheet_index)
+
+        return new_prev_state.copy_on_write_with_sheets_from(old_post_state, written_sheet_indexes)
+
+    def set_prev_state_and_execute(self, new_prev_state: State, previous_steps: List["Step"], saturated_params: Optional[Dict[str, Any]]=None) -> bool:
         """
         Changes the prev_state of this step, which in turns triggers
         a reexecution with the same parameters. 
@@ -139,6 +356,9 @@ class Step:
         If successful, will update the step in-place. If it fails, 
         this will not update the step.
 
+        If saturated_params are passed, they are used instead of saturating
+        the params of this step again.
+
         NOTE: this is the only function you should use to get a step
         to execute!
 
@@ -148,7 +368,7 @@ class Step:
         # Saturate the event to get up to date parameters
         # TODO: this should fill in the execution data - hopefully
         # we can get all of it without executing. I think we probably can
-        params = self.step_performer.saturate(new_prev_state, self.params, previous_steps)
+        params = saturated_params if saturated_params is not None else self.step_performer.saturate(new_prev_state, self.params, previous_steps)
 
         # Actually execute the data transformation
         post_state_and_execution_data = self.step_performer.execute(new_prev_state, params)
@@ -165,8 +385,7 @@ class Step:
             new_post_state, execution_data = new_prev_state, {}
         
         # Update the relevant state variables
-        self.prev_state = new_prev_state
-        self.post_state = new_post_state
+        self.restore_states(new_prev_state, new_post_state)
         self.execution_data = execution_data if execution_data is not None else {}
         self.params = params
 
@@ -183,39 +402,63 @@ class Step:
         2. This step has the same id as any step before it (like for pivot tables)
         3. This step is a formula step overwriting the step that came just before it AND they both set the entire column
         4. This step is a formula step overwriting the step that came just before it AND they both set the same indexes
+
+        NOTE: this looks at every step before this step. When collecting the skipped steps
+        for an entire list of steps, use a StepSkipIndex, which only looks at the steps 
+        that could be skipped.
         """
 
         step_indexes_to_skip = set()
 
         for step_index, step in enumerate(all_steps_before_this_step):
-            # Check (1)
-            if step.step_type == FilterStepPerformer.step_type() and self.step_type == FilterStepPerformer.step_type():
-                if step.params['sheet_index'] == self.params['sheet_index'] \
-                    and step.params['column_id'] == self.params['column_id']:
-                   step_indexes_to_skip.add(step_index) 
-            
-            # Check (2)
-            elif step.step_id == self.step_id:
+            if self.skips_earlier_step(step):
                 step_indexes_to_skip.add(step_index)
 
-        if len(all_steps_before_this_step) > 0:
-            previous_step: Step = all_steps_before_this_step[-1]
-            
-            # Check (3) and (4)
-            if self.step_type == SetColumnFormulaStepPerformer.step_type() and previous_step.step_type == SetColumnFormulaStepPerformer.step_type():
-                both_entire_column = self.params['index_labels_formula_is_applied_to']['type'] == FORMULA_ENTIRE_COLUMN_TYPE and previous_step.params['index_labels_formula_is_applied_to']['type'] == FORMULA_ENTIRE_COLUMN_TYPE
-                same_indexes = (
-                    self.params['index_labels_formula_is_applied_to']['type'] == FORMULA_SPECIFIC_INDEX_LABELS_TYPE and previous_step.params['index_labels_formula_is_applied_to']['type'] == FORMULA_SPECIFIC_INDEX_LABELS_TYPE \
-                    and self.params['index_labels_formula_is_applied_to']['index_labels'] == previous_step.params['index_labels_formula_is_applied_to']['index_labels']
-                )
-                
-                if (both_entire_column or same_indexes) \
-                    and self.params['sheet_index'] == previous_step.params['sheet_index'] \
-                    and self.params['column_id'] == previous_step.params['column_id']:
-                    step_indexes_to_skip.add(len(all_steps_before_this_step) - 1)
+        if len(all_steps_before_this_step) > 0 and self.skips_previous_step(all_steps_before_this_step[-1]):
+            step_indexes_to_skip.add(len(all_steps_before_this_step) - 1)
 
         return step_indexes_to_skip
 
+    @property
+    def filter_key(self) -> Optional[Tuple[Any, Any]]:
+        """
+        For filter steps, the sheet index and column id that are filtered, as a 
+        filter step skips the earlier filter steps with the same filter_key.
+        """
+        if self.step_type != FilterStepPerformer.step_type():
+            return None
+        return (self.params['sheet_index'], self.params['column_id'])
+
+    def skips_earlier_step(self, step: 'Step') -> bool:
+        """
+        Returns True if this step skips the given step, which comes anywhere before
+        it. See checks (1) and (2) in step_indexes_to_skip.
+        """
+        # Check (1)
+        if step.step_type == FilterStepPerformer.step_type() and self.step_type == FilterStepPerformer.step_type():
+            return step.filter_key == self.filter_key
+        
+        # Check (2)
+        return step.step_id == self.step_id
+
+    def skips_previous_step(self, previous_step: 'Step') -> bool:
+        """
+        Returns True if this step skips the given step, which comes just before it. 
+        See checks (3) and (4) in step_indexes_to_skip.
+        """
+        if self.step_type == SetColumnFormulaStepPerformer.step_type() and previous_step.step_type == SetColumnFormulaStepPerformer.step_type():
+            both_entire_column = self.params['index_labels_formula_is_applied_to']['type'] == FORMULA_ENTIRE_COLUMN_TYPE and previous_step.params['index_labels_formula_is_applied_to']['type'] == FORMULA_ENTIRE_COLUMN_TYPE
+            same_indexes = (
+                self.params['index_labels_formula_is_applied_to']['type'] == FORMULA_SPECIFIC_INDEX_LABELS_TYPE and previous_step.params['index_labels_formula_is_applied_to']['type'] == FORMULA_SPECIFIC_INDEX_LABELS_TYPE \
+                and self.params['index_labels_formula_is_applied_to']['index_labels'] == previous_step.params['index_labels_formula_is_applied_to']['index_labels']
+            )
+            
+            return (both_entire_column or same_indexes) \
+                and self.params['sheet_index'] == previous_step.params['sheet_index'] \
+                and self.params['column_id'] == previous_step.params['column_id']
+
+        return False
+
     def get_column_headers_by_ids(self, sheet_index: int, column_ids: List[ColumnID]) -> List[Any]:
         """
         Utility for getting the column headers from column ids in a step.
@@ -242,3 +485,7 @@ class Step:
             'step_type': self.step_type,
             'params': self.params
         })
+
+
+def _are_elements_identical(values: List[Any], other_values: List[Any]) -> bool:
+    return len(values) == len(other_values) and all(value is other_value for value, other_value in zip(values, other_values))
@@ -15,7 +15,7 @@ from mitosheet.code_chunks.step_performers.column_steps.set_column_formula_code_
 from mitosheet.errors import (MitoError, make_execution_error,
                               make_operator_type_error,
                               make_unsupported_function_error)
-from mitosheet.parser import get_frontend_formula, parse_formula
+from mitosheet.parser import get_formula_index_reference, get_frontend_formula, parse_formula
 from mitosheet.state import State
 from mitosheet.step_performers.step_performer import StepPerformer
 from mitosheet.step_performers.utils.utils import get_param
@@ -121,10 +121,11 @@ class SetColumnFormulaStepPerformer(StepPerformer):
             # If the user is setting the entire column, then there is only one formula for every cell in
             # the entire column. But if they are just setting specific indexes, we need to store the formulas
             # before this as well, so that we can figure out what formula is applied to each index
+            formula_index_reference = get_formula_index_reference(df.index)
             if index_labels_formula_is_applied_to['type'] == FORMULA_ENTIRE_COLUMN_TYPE:
-                post_state.column_formulas[sheet_index][column_id] = [{'frontend_formula': frontend_formula, 'location': index_labels_formula_is_applied_to, 'index': df.index.to_list()}]
+                post_state.column_formulas[sheet_index][column_id] = [{'frontend_formula': frontend_formula, 'location': index_labels_formula_is_applied_to, 'index': formula_index_reference}]
             else:
-                post_state.column_formulas[sheet_index][column_id].append({'frontend_formula': frontend_formula, 'location': index_labels_formula_is_applied_to, 'index': df.index.to_list()})
+                post_state.column_formulas[sheet_index][column_id].append({'frontend_formula': frontend_formula, 'location': index_labels_formula_is_applied_to, 'index': formula_index_reference})
 
             return post_state, execution_data
         except TypeError as e:
@@ -180,6 +181,10 @@ class SetColumnFormulaStepPerformer(StepPerformer):
     def get_modified_dataframe_indexes(cls, params: Dict[str, Any]) -> Set[int]:
         return {get_param(params, 'sheet_index')}
 
+    @classmethod
+    def get_modified_column_ids(cls, params: Dict[str, Any]) -> Optional[Dict[int, Set[ColumnID]]]:
+        return {get_param(params, 'sheet_index'): {get_param(params, 'column_id')}}
+
 
 def _get_fixed_invalid_formula(
         new_formula: str, 
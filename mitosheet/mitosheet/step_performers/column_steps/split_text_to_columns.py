@@ -38,17 +38,16 @@ class SplitTextToColumnsStepPerformer(StepPerformer):
 
         column_header = prev_state.column_ids.get_column_header_by_id(sheet_index, column_id)
             
-        # Create a new post state
-        post_state = prev_state.copy(deep_sheet_indexes=[sheet_index])
-        final_df = post_state.dfs[sheet_index]
+        # We only read from the dataframe here, so there is no need to copy it
+        final_df = prev_state.dfs[sheet_index]
         delimiter_string = '|'.join(delimiters)
             
         split_param_dict = get_split_param_dict()
 
         # Create the dataframe of new columns. We do this first, so that we know how many columns get created.
-        if is_datetime_dtype(str(post_state.dfs[sheet_index][column_header].dtype)):
+        if is_datetime_dtype(str(final_df[column_header].dtype)):
             new_columns_df = final_df[column_header].dt.strftime('%Y-%m-%d %X').str.split(delimiter_string, **split_param_dict)
-        elif is_timedelta_dtype(str(post_state.dfs[sheet_index][column_header].dtype)):
+        elif is_timedelta_dtype(str(final_df[column_header].dtype)):
             new_columns_df = final_df[column_header].apply(lambda x: str(x)).str.split(delimiter_string, **split_param_dict)
         else:
             new_columns_df = final_df[column_header].astype('str').str.split(delimiter_string, **split_param_dict)
@@ -131,12 +131,18 @@ class StepPerformer(ABC, object):
             execution_data = {}
 
         modified_dataframe_indexes = cls.get_modified_dataframe_indexes(params)
-        # If the modified indexes are -1, then only new dataframes have been created -- and in this
-        # case we just don't detect modifications
-        if modified_dataframe_indexes == {-1}:
-            modified_dataframe_indexes = set()
-
-        post_state = prev_state.copy(deep_sheet_indexes=modified_dataframe_indexes)
+        if len(modified_dataframe_indexes) == 0:
+            # If no modified indexes are returned, then any sheet might be modified, and so we
+            # cannot share any of the sheets with the previous state
+            post_state = prev_state.copy()
+        else:
+            # If the modified indexes are -1, then only new dataframes have been created -- and in this
+            # case we just don't detect modifications
+            if modified_dataframe_indexes == {-1}:
+                modified_dataframe_indexes = set()
+
+            # Otherwise, we only copy the modified sheets, and share the rest with the previous state
+            post_state = prev_state.copy_on_write(modified_dataframe_indexes)
 
         code_chunks = cls.transpile(post_state, params, execution_data)
         code = []
@@ -239,4 +245,16 @@ class StepPerformer(ABC, object):
         If it returned -1, then it modified all new dataframes (on
         the left side of the dfs array).
         """
-        pass
\ No newline at end of file
+        pass
+
+    @classmethod
+    def get_modified_column_ids(cls, params: Dict[str, Any]) -> Optional[Dict[int, Set[ColumnID]]]:
+        """
+        Returns the IDs of the columns whose data was modified by this
+        step, for each sheet index that was modified, so that values 
+        computed from the other columns can be reused.
+
+        If it returns None, then this step might have modified the data
+        in any column. 
+        """
+        return None
@@ -8,11 +8,15 @@ import json
 import random
 import string
 from copy import copy, deepcopy
+from threading import RLock
 from typing import Any, Callable, Collection, Dict, List, Optional, Set, Tuple, Union
 
 import pandas as pd
+from mitosheet.api.column_statistics_cache import ColumnStatisticsCache
+from mitosheet.cache_utils import DataframeRef, get_dataframe_ref, is_same_dataframe
 from mitosheet.api.get_parameterizable_params import get_parameterizable_params_metadata
 from mitosheet.api.get_path_contents import get_path_parts
+from mitosheet.api.get_search_matches import SearchMatchesCache
 
 from mitosheet.enterprise.mito_config import MitoConfig
 from mitosheet.enterprise.telemetry.mito_log_uploader import MitoLogUploader
@@ -33,32 +37,179 @@ from mitosheet.step_performers.import_steps.simple_import import \
     SimpleImportStepPerformer
 from mitosheet.step_performers.import_steps.snowflake_import import \
     SnowflakeImportStepPerformer
+from mitosheet.code_chunks.code_chunk import CodeChunk
+from mitosheet.code_chunks.code_chunk_utils import get_code_chunks
 from mitosheet.transpiler.transpile import transpile
 from mitosheet.transpiler.transpile_utils import get_default_code_options
-from mitosheet.types import CodeOptions, ColumnDefinintion, ColumnDefinitions, DefaultEditingMode, MitoTheme, ParamMetadata
+from mitosheet.types import CodeOptions, ColumnDefinintion, ColumnID, ColumnDefinitions, DefaultEditingMode, MitoTheme, ParamMetadata, SheetDataEncoding, StepHistoryMemoryFootprint, StepStateRetentionPolicy
 from mitosheet.updates import UPDATES
 from mitosheet.user.utils import is_enterprise, is_pro, is_running_test
-from mitosheet.utils import NpEncoder, dfs_to_array_for_json, get_default_df_formats, get_new_id, is_default_df_names
+from mitosheet.utils import SHEET_DATA_ENCODING_COLUMNAR, SHEET_DATA_ENCODING_JSON, NpEncoder, dfs_to_array_for_json, get_default_df_formats, get_new_id, is_default_df_names
+from mitosheet.pro.conditional_formatting_utils import ConditionalFormattingResultCache
 from mitosheet.step_performers.utils.user_defined_function_utils import get_user_defined_importers_for_frontend, get_user_defined_editors_for_frontend
 from mitosheet.step_performers.utils.user_defined_function_utils import validate_and_wrap_sheet_functions, validate_user_defined_editors
 
+# The steps that read in new data. We always keep the states of these steps, so that
+# rebuilding an evicted state never has to read in the data again. As the data they read
+# may have changed, we also never reuse their results when replaying steps
+IMPORT_STEP_TYPES = {
+    SimpleImportStepPerformer.step_type(),
+    ExcelImportStepPerformer.step_type(),
+    DataframeImportStepPerformer.step_type(),
+    SnowflakeImportStepPerformer.step_type(),
+    ExcelRangeImportStepPerformer.step_type(),
+    UserDefinedImportStepPerformer.step_type(),
+}
+
+
+class StepSkipIndex:
+    """
+    Keeps track of which steps in a list of steps are skipped, and is updated
+    incrementally as steps are appended to and popped from the end of the list.
+
+    A step only skips steps with the same step id, filter steps on the same
+    column, or the step right before it (see Step.step_indexes_to_skip). So,
+    rather than comparing each new step to every step before it, we look up
+    the steps it could skip by step id and filtered column.
+    """
+
+    def __init__(self, steps: Optional[List[Step]]=None):
+        self.steps: List[Step] = []
+        self._step_indexes_skipped_by_step: List[Set[int]] = []
+        self._num_steps_skipping_step_index: Dict[int, int] = {}
+        self._step_indexes_by_step_id: Dict[str, List[int]] = {}
+        self._step_indexes_by_filter_key: Dict[Tuple[Any, Any], List[int]] = {}
+        self._step_indexes_to_skip: Optional[Set[int]] = None
+
+        for step in (steps if steps is not None else []):
+            self.append(step)
+
+    @property
+    def step_indexes_to_skip(self) -> Set[int]:
+        """
+        The indexes of all the skipped steps. This set must not be modified.
+        """
+        if self._step_indexes_to_skip is None:
+            self._step_indexes_to_skip = set(self._num_steps_skipping_step_index.keys())
+        return self._step_indexes_to_skip
+
+    def get_step_indexes_to_skip(self, num_steps: Optional[int]=None) -> Set[int]:
+        """
+        Returns the indexes of the steps that are skipped in the first num_steps
+        steps, or in all of the steps if num_steps is None.
+        """
+        if num_steps is None or num_steps >= len(self.steps):
+            return self.step_indexes_to_skip
+        return self.get_step_indexes_skipped_by_steps(0, num_steps)
+
+    def get_step_indexes_skipped_by_steps(self, start_index: int, end_index: int) -> Set[int]:
+        """
+        Returns the indexes of the steps that are skipped by the steps from 
+        start_index up to (but not including) end_index.
+        """
+        step_indexes_skipped: Set[int] = set()
+        for step_indexes_skipped_by_step in self._step_indexes_skipped_by_step[start_index:end_index]:
+            step_indexes_skipped.update(step_indexes_skipped_by_step)
+        return step_indexes_skipped
+
+    def append(self, step: Step) -> None:
+        step_index = len(self.steps)
+        filter_key = step.filter_key
+
+        possibly_skipped_step_indexes = self._step_indexes_by_step_id.get(step.step_id, [])
+        if filter_key is not None:
+            possibly_skipped_step_indexes = possibly_skipped_step_indexes + self._step_indexes_by_filter_key.get(filter_key, [])
+
+        step_indexes_skipped = {
+            possibly_skipped_step_index for possibly_skipped_step_index in possibly_skipped_step_indexes 
+            if step.skips_earlier_step(self.steps[possibly_skipped_step_index])
+        }
+        if step_index > 0 and step.skips_previous_step(self.steps[-1]):
+            step_indexes_skipped.add(step_index - 1)
+
+        self.steps.append(step)
+        self._step_indexes_skipped_by_step.append(step_indexes_skipped)
+        for skipped_step_index in step_indexes_skipped:
+            self._num_steps_skipping_step_index[skipped_step_index] = self._num_steps_skipping_step_index.get(skipped_step_index, 0) + 1
+        self._step_indexes_by_step_id.setdefault(step.step_id, []).append(step_index)
+        if filter_key is not None:
+            self._step_indexes_by_filter_key.setdefault(filter_key, []).append(step_index)
+        self._step_indexes_to_skip = None
+
+    def pop(self) -> Step:
+        step = self.steps.pop()
+        step_indexes_skipped = self._step_indexes_skipped_by_step.pop()
+        for skipped_step_index in step_indexes_skipped:
+            self._num_steps_skipping_step_index[skipped_step_index] -= 1
+            if self._num_steps_skipping_step_index[skipped_step_index] == 0:
+                del self._num_steps_skipping_step_index[skipped_step_index]
+
+        _pop_last_index(self._step_indexes_by_step_id, step.step_id)
+        if step.filter_key is not None:
+            _pop_last_index(self._step_indexes_by_filter_key, step.filter_key)
+        self._step_indexes_to_skip = None
+        return step
+
+    def update(self, steps: List[Step]) -> None:
+        """
+        Updates the index to the given steps, by popping the steps that are 
+        not shared with the current steps and then appending the new ones. As
+        steps are normally only added or removed at the end, this is cheap.
+        """
+        # Make sure we never change a list that was passed to us
+        self.steps = list(self.steps)
+
+        num_shared_steps = 0
+        for step, new_step in zip(self.steps, steps):
+            if step is not new_step:
+                break
+            num_shared_steps += 1
+
+        while len(self.steps) > num_shared_steps:
+            self.pop()
+        for step in steps[num_shared_steps:]:
+            self.append(step)
+
+    def replace_steps(self, steps: List[Step]) -> None:
+        """
+        Replaces the steps in this index with steps that skip the same steps, 
+        like the copies of the steps that are created when they are executed again.
+        """
+        if len(steps) != len(self.steps):
+            raise ValueError(f'Cannot replace {len(self.steps)} steps with {len(steps)} steps')
+        self.steps = steps
+
+
+def _pop_last_index(step_indexes_by_key: Dict[Any, List[int]], key: Any) -> None:
+    step_indexes = step_indexes_by_key[key]
+    step_indexes.pop()
+    if len(step_indexes) == 0:
+        del step_indexes_by_key[key]
+
+
+def validate_state_retention_policy(state_retention_policy: Optional[StepStateRetentionPolicy]) -> None:
+    if state_retention_policy is not None and state_retention_policy['checkpoint_interval'] < 1:
+        raise ValueError(f"The checkpoint_interval must be at least 1, not {state_retention_policy['checkpoint_interval']}")
+
+
+def validate_sheet_data_encoding(sheet_data_encoding: Optional[SheetDataEncoding]) -> None:
+    if sheet_data_encoding is not None and sheet_data_encoding not in (SHEET_DATA_ENCODING_JSON, SHEET_DATA_ENCODING_COLUMNAR):
+        raise ValueError(f"The sheet_data_encoding must be '{SHEET_DATA_ENCODING_JSON}' or '{SHEET_DATA_ENCODING_COLUMNAR}', not {sheet_data_encoding}")
+
+
 def get_step_indexes_to_skip(step_list: List[Step]) -> Set[int]:
     """
     Given a list of steps, will collect all of the steps
     from this list that should be skipped.
-    """
-    step_indexes_to_skip: Set[int] = set()
-
-    for step_index, step in enumerate(step_list):
-        step_indexes_to_skip = step_indexes_to_skip.union(
-            step.step_indexes_to_skip(step_list[:step_index])
-        )
 
-    return step_indexes_to_skip
+    NOTE: this builds a new StepSkipIndex. For the steps in the StepsManager,
+    use the StepsManager.step_skip_index that is kept up to date instead.
+    """
+    return StepSkipIndex(step_list).step_indexes_to_skip
 
 
 def execute_step_list_from_index(
-    step_list: List[Step], start_index: Optional[int]=None
+    step_list: List[Step], start_index: Optional[int]=None, incremental: bool=True, step_indexes_to_skip: Optional[Set[int]]=None
 ) -> List[Step]:
     """
     Given a list of steps, and a specific index to start from, will assume that
@@ -69,7 +220,15 @@ def execute_step_list_from_index(
     means that the returned step list will only have valid prev_state/post_states
     for the steps that are not skipped.
 
-    If start_index is not given, will start from the initialize step.
+    If incremental is True, then only the steps that depend on a sheet that has 
+    changed are executed again. As states share the sheets that a step does not
+    modify (see State.copy_on_write), a sheet has changed exactly when it is no 
+    longer shared with the prev_state of the last execution of the step. So, undoing
+    a step on one sheet only re-executes the steps downstream of that sheet, and
+    reuses the post_states of the steps on all other sheets.
+
+    If start_index is not given, will start from the initialize step. If the 
+    step_indexes_to_skip are not given, they are computed from the step_list.
     """
 
     # Make sure start index is not None
@@ -77,12 +236,16 @@ def execute_step_list_from_index(
         start_index = 0
 
     # Get the steps to skip, so that we can skip them
-    step_indexes_to_skip = get_step_indexes_to_skip(step_list)
+    if step_indexes_to_skip is None:
+        step_indexes_to_skip = get_step_indexes_to_skip(step_list)
 
     # Get the steps that are valid, and the last valid step, so we can execute from there
     new_step_list = step_list[: start_index + 1]
     last_valid_step = step_list[start_index]
 
+    # The executed steps before the step we are executing, which we keep up to date as we go
+    non_skipped_steps = [step for index, step in enumerate(new_step_list) if index not in step_indexes_to_skip]
+
     for partial_index, step in enumerate(step_list[start_index + 1 :]):
         step_index = partial_index + start_index + 1
         # If we're skipping a step, add it to the new step list (since we don't
@@ -91,35 +254,48 @@ def execute_step_list_from_index(
             new_step_list.append(step)
             continue
             
-        # Create a new step with the same params
-        new_step = Step(step.step_type, step.step_id, step.params)
-
-        # Set the previous state of the new step, and then update
-        # what the last valid step is. Note that we find the actually
-        # executed steps before passing them
-        non_skipped_steps = [step for index, step in enumerate(new_step_list) if index not in step_indexes_to_skip]
-        new_step.set_prev_state_and_execute(last_valid_step.final_defined_state, non_skipped_steps)
+        new_prev_state = last_valid_step.final_defined_state
+
+        new_step = None
+        saturated_params = None
+        if incremental and step.step_type not in IMPORT_STEP_TYPES:
+            # If none of the sheets this step reads have changed, then we reuse the result 
+            # of its last execution rather than executing it again. We saturate a copy of 
+            # the params, so we can check they did not change
+            saturated_params = step.step_performer.saturate(new_prev_state, deepcopy(step.params), non_skipped_steps)
+            reusable_post_state = step.get_reusable_post_state(new_prev_state, saturated_params)
+            if reusable_post_state is not None:
+                new_step = Step(step.step_type, step.step_id, saturated_params, new_prev_state, reusable_post_state, step.execution_data)
+
+        if new_step is None:
+            # Create a new step with the same params, and execute it on the new prev state
+            new_step = Step(step.step_type, step.step_id, step.params)
+            new_step.set_prev_state_and_execute(new_prev_state, non_skipped_steps, saturated_params=saturated_params)
+
         last_valid_step = new_step
 
         new_step_list.append(new_step)
+        non_skipped_steps.append(new_step)
 
     return new_step_list
 
 
 def get_modified_sheet_indexes(
-    steps: List[Step], starting_step_index: int, ending_step_index: int
+    steps: List[Step], starting_step_index: int, ending_step_index: int, starting_step: Optional[Step]=None
 ) -> Set[int]:
     """
     Returns a best guess for which sheets have been modified starting at
-    starting_step_index and ending at (and including) ending_step_index.
+    starting_step_index and ending at (and including) ending_step_index. If
+    the starting_step is passed, it is the step that was at starting_step_index.
 
     This is a best guess for caching reasons, and so may return sheets that
     have in fact not been modified. If a sheet index has been modified, it should
     always be returned.
     """
     # If only one step has been performed, we can calculate the modified sheet indexes,
-    # otherwise we just say all of them (undo, replay might interact weird)
-    if starting_step_index == ending_step_index - 1:
+    # otherwise we just say all of them (undo, replay might interact weird). If the step
+    # at the starting index changed, the new step caused the earlier steps to be replayed
+    if starting_step_index == ending_step_index - 1 and (starting_step is None or steps[starting_step_index] is starting_step):
         step = steps[ending_step_index]
         modified_indexes = step.step_performer.get_modified_dataframe_indexes(step.params)
 
@@ -145,6 +321,32 @@ def get_modified_sheet_indexes(
     return modified_indexes
 
 
+def get_modified_column_ids(
+    steps: List[Step], starting_step: Step, ending_step_index: int
+) -> Optional[Dict[int, Set[ColumnID]]]:
+    """
+    Returns the IDs of the columns whose data was modified between the 
+    starting_step and the step at ending_step_index, for each sheet index, 
+    or None if any column might have been modified.
+
+    As with get_modified_sheet_indexes, this may return columns that have 
+    in fact not been modified, but if a column has been modified, it should
+    always be returned.
+    """
+    step = steps[ending_step_index]
+    if step is starting_step:
+        return dict()
+
+    # If only one step has been performed after the starting step, we can calculate the modified 
+    # columns, otherwise we just say all of them (undo, replay might interact weird). If the step
+    # replaces an earlier step with the same id, the columns that step modified might also change
+    if ending_step_index > 0 and steps[ending_step_index - 1] is starting_step and \
+            all(prev_step.step_id != step.step_id for prev_step in steps[:ending_step_index]):
+        return step.step_performer.get_modified_column_ids(step.params)
+
+    return None
+
+
 class StepsManager:
     """
     The StepsManager holds the list of the steps, and makes sure
@@ -191,6 +393,8 @@ class StepsManager:
             default_editing_mode: Optional[DefaultEditingMode]=None,
             theme: Optional[MitoTheme]=None,
             input_cell_execution_count: Optional[int]=None,
+            state_retention_policy: Optional[StepStateRetentionPolicy]=None,
+            sheet_data_encoding: Optional[SheetDataEncoding]=None,
         ):
         """
         When initalizing the StepsManager, we also do preprocessing
@@ -284,6 +488,13 @@ class StepsManager:
             )
         ]
 
+        # Keeps track of which of the steps_including_skipped are skipped, and
+        # is updated whenever they change, so we don't have to recompute it
+        self.step_skip_index = StepSkipIndex(self.steps_including_skipped)
+
+        # The code chunks from the last time the steps were transpiled. See get_code_chunks
+        self._code_chunks_cache: Optional[Tuple[List[Step], Tuple[int, bool], List[CodeChunk]]] = None
+
         """
         To help with redo, we store a list of a list of the steps that 
         existed in the step manager before the user clicked undo or reset,
@@ -309,7 +520,15 @@ class StepsManager:
         # We also cache some of the sheet data in a form suitable to turn
         # into json, so that we can package it and send it to the front-end
         # faster and with less work. Make sure to cache the starting values
-        # for the saved sheet data
+        # for the saved sheet data. The sheet data is sent as JSON, unless the
+        # sheet_data_encoding is set to columnar, in which case the numeric columns
+        # are sent as typed-array buffers instead
+        validate_sheet_data_encoding(sheet_data_encoding)
+        self.sheet_data_encoding = SHEET_DATA_ENCODING_JSON if sheet_data_encoding is None else sheet_data_encoding
+        self.saved_sheet_data_encoding = self.sheet_data_encoding
+        # We cache the conditional formatting results for each column, so they only
+        # need to be recomputed for the columns and formats that change
+        self.conditional_formatting_result_cache = ConditionalFormattingResultCache()
         self.saved_sheet_data: List[Dict] = dfs_to_array_for_json(
             self.curr_step.final_defined_state,
             set(range(len(args))),
@@ -321,8 +540,10 @@ class StepsManager:
             self.curr_step.column_filters,
             self.curr_step.column_ids,
             self.curr_step.df_formats,
+            columnar=self.sheet_data_encoding == SHEET_DATA_ENCODING_COLUMNAR
         )
         self.last_step_index_we_wrote_sheet_json_on = 0
+        self.last_step_we_wrote_sheet_json_on = self.curr_step
 
         # We store the number of update events that have been processed successfully,
         # which allows us to have some awareness about undos and redos in the front-end
@@ -356,6 +577,23 @@ class StepsManager:
         self.theme = theme
         self.default_apply_formula_to_column = False if default_editing_mode == 'cell' else True
 
+        # By default, every step keeps its prev and post state in memory. If a retention policy
+        # is set, then only some of the steps keep their states, and the rest are rebuilt on demand.
+        # See enforce_state_retention_policy for more details
+        validate_state_retention_policy(state_retention_policy)
+        self.state_retention_policy = state_retention_policy
+        self._state_retention_lock = RLock()
+        self._last_rebuilt_step: Optional[Step] = None
+        self._dataframe_memory_usage_cache: Dict[int, Tuple[DataframeRef, int]] = {}
+
+        # We cache the values of the sheets that are searched as lowercased strings, so that
+        # each keystroke in the search bar only has to match the search value against them
+        self.search_matches_cache = SearchMatchesCache()
+
+        # We cache the statistics of the columns that are opened in the column panel, so that 
+        # the API calls the panel makes share them, and they are only recomputed once the column changes
+        self.column_statistics_cache = ColumnStatisticsCache()
+
     @property
     def curr_step(self) -> Step:
         """
@@ -377,10 +615,23 @@ class StepsManager:
         NOTE: we only display the _first_ 1,500 rows of the dataframe
         for speed reasons. This results in way less data getting
         passed around
+
+        NOTE: if the sheet_data_encoding is columnar, the numeric and boolean
+        columns are sent as base64 encoded typed-array buffers, which avoids 
+        building a list of every value in these columns
         """
-        modified_sheet_indexes = get_modified_sheet_indexes(
-            self.steps_including_skipped, self.last_step_index_we_wrote_sheet_json_on, self.curr_step_idx
-        )
+        if self.sheet_data_encoding != self.saved_sheet_data_encoding:
+            # If the encoding changed, none of the saved sheet data can be reused
+            modified_sheet_indexes = set(range(len(self.curr_step.dfs)))
+        else:
+            modified_sheet_indexes = get_modified_sheet_indexes(
+                self.steps_including_skipped, self.last_step_index_we_wrote_sheet_json_on, self.curr_step_idx, self.last_step_we_wrote_sheet_json_on
+            )
+
+        # The cached conditional formatting results are only valid for the columns that were not modified
+        self.conditional_formatting_result_cache.remove_modified_results(get_modified_column_ids(
+            self.steps_including_skipped, self.last_step_we_wrote_sheet_json_on, self.curr_step_idx
+        ))
 
         array = dfs_to_array_for_json(
             self.curr_step.final_defined_state,
@@ -393,10 +644,14 @@ class StepsManager:
             self.curr_step.column_filters,
             self.curr_step.column_ids,
             self.curr_step.df_formats,
+            columnar=self.sheet_data_encoding == SHEET_DATA_ENCODING_COLUMNAR,
+            conditional_formatting_result_cache=self.conditional_formatting_result_cache
         )
 
         self.saved_sheet_data = array
+        self.saved_sheet_data_encoding = self.sheet_data_encoding
         self.last_step_index_we_wrote_sheet_json_on = self.curr_step_idx
+        self.last_step_we_wrote_sheet_json_on = self.curr_step
 
         return json.dumps(array, cls=NpEncoder)
 
@@ -442,7 +697,7 @@ class StepsManager:
         the skipped steps
         """
         step_summary_list = []
-        step_indexes_to_skip = get_step_indexes_to_skip(self.steps_including_skipped)
+        step_indexes_to_skip = self.get_step_indexes_to_skip()
         for index, step in enumerate(self.steps_including_skipped):
             if step.step_type == "initialize":
                 step_summary_list.append(
@@ -463,11 +718,7 @@ class StepsManager:
             
             # NOTE: we cannot and should not optimize the code chunks here, as
             # rely on getting data out of them is to label the steps correctly
-            code_chunks = step.step_performer.transpile(
-                step.prev_state, # type: ignore
-                step.params,
-                step.execution_data,
-            )
+            code_chunks = step.get_code_chunks()
 
             step_summary_list.append(
                 {
@@ -483,6 +734,26 @@ class StepsManager:
 
         return step_summary_list
     
+    def get_code_chunks(self, optimize: bool=True) -> List[CodeChunk]:
+        """
+        Returns the code chunks for the steps up to the checked out step. As the
+        code is often transpiled many times for a single edit, these are cached 
+        until the steps or the checked out step change.
+        """
+        cache_key = (self.curr_step_idx, optimize)
+        if self._code_chunks_cache is not None:
+            steps, cached_cache_key, code_chunks = self._code_chunks_cache
+            if steps is self.steps_including_skipped and cached_cache_key == cache_key:
+                return list(code_chunks)
+
+        code_chunks = get_code_chunks(
+            self.steps_including_skipped[:self.curr_step_idx + 1], 
+            optimize=optimize, 
+            step_indexes_to_skip=self.get_step_indexes_to_skip(self.curr_step_idx + 1)
+        )
+        self._code_chunks_cache = (self.steps_including_skipped, cache_key, code_chunks)
+        return list(code_chunks)
+
     def code(self) -> List[str]:
         return transpile(self, optimize=True)
     
@@ -579,11 +850,26 @@ class StepsManager:
 
         raise Exception(f"{update_event} is not an update event!")
 
+    def get_step_indexes_to_skip(self, num_steps: Optional[int]=None) -> Set[int]:
+        """
+        Returns the indexes of the skipped steps in the first num_steps of the
+        steps_including_skipped, or in all of them if num_steps is None. This set
+        must not be modified.
+        """
+        # While new steps are being executed, the skip index is already updated to
+        # them, but the steps_including_skipped are not -- so we compute them directly
+        if self.step_skip_index.steps is not self.steps_including_skipped:
+            return get_step_indexes_to_skip(self.steps_including_skipped[:num_steps])
+        return self.step_skip_index.get_step_indexes_to_skip(num_steps)
+
     def find_last_valid_index(self, new_steps: List[Step]) -> int:
         """
         Given the new_steps, this function performs some logic to figure
         out what the last valid index in the steps is (that execution can
         then start from).
+
+        NOTE: this updates the step_skip_index to the new_steps, as it needs 
+        to know which of the new_steps are skipped.
         """
 
         # Currently, we only remove steps in an undo
@@ -591,12 +877,10 @@ class StepsManager:
             # If we are removing steps, then we figure out what skipped steps
             # we are losing, and run from right before where we are no longer
             # skipped steps
-            no_longer_skipped_indexes: Set[int] = set()
-            for step_index, removed_step in enumerate(self.steps_including_skipped[len(new_steps) :]):
-                previous_steps = self.steps_including_skipped[: len(new_steps) + step_index]
-                no_longer_skipped_indexes = no_longer_skipped_indexes.union(
-                    removed_step.step_indexes_to_skip(previous_steps)
-                )
+            no_longer_skipped_indexes = self.step_skip_index.get_step_indexes_skipped_by_steps(
+                len(new_steps), len(self.steps_including_skipped)
+            )
+            self.step_skip_index.update(new_steps)
 
             last_valid_index = (
                 min(no_longer_skipped_indexes.union({len(new_steps)})) - 1
@@ -604,21 +888,19 @@ class StepsManager:
         else:
             # Otherwise, if we're adding steps, we figure out which skipped steps
             # we're adding, and run from right before the oldest new skipped step
+            self.step_skip_index.update(new_steps)
 
             # Collect anything that is newly skipped
-            newly_skipped_indexes: Set[int] = set()
-            for step_index, new_step in enumerate(new_steps[len(self.steps_including_skipped) :]):
-                previous_steps = new_steps[: len(self.steps_including_skipped) + step_index]
-                newly_skipped_indexes = newly_skipped_indexes.union(
-                    new_step.step_indexes_to_skip(previous_steps)
-                )
+            newly_skipped_indexes = self.step_skip_index.get_step_indexes_skipped_by_steps(
+                len(self.steps_including_skipped), len(new_steps)
+            )
 
             # The last valid index is the minimum of the newly skipped things - 1
             # or the last valid step (if nothing is skipped)
             last_valid_index = min(newly_skipped_indexes.union({len(self.steps_including_skipped)})) - 1
 
         # Make sure that this step isn't itself skipped, and decrement until it is not
-        all_skipped_indexes = get_step_indexes_to_skip(new_steps)
+        all_skipped_indexes = self.step_skip_index.step_indexes_to_skip
         while last_valid_index in all_skipped_indexes:
             last_valid_index -= 1
 
@@ -762,15 +1044,196 @@ class StepsManager:
         in the new_steps array. Otherwise, the step manager can calculate
         the last valid index without help.
         """
-        if last_valid_index is None:
-            last_valid_index = self.find_last_valid_index(new_steps)
+        old_steps = self.steps_including_skipped
+        try:
+            if last_valid_index is None:
+                last_valid_index = self.find_last_valid_index(new_steps)
+            else:
+                self.step_skip_index.update(new_steps)
 
-        final_steps = execute_step_list_from_index(
-            new_steps, start_index=last_valid_index
-        )
+            final_steps = execute_step_list_from_index(
+                new_steps, start_index=last_valid_index, step_indexes_to_skip=self.step_skip_index.step_indexes_to_skip
+            )
+        except:
+            # If the new steps fail, the steps do not change, so neither does the skip index
+            self.step_skip_index.update(old_steps)
+            self.step_skip_index.replace_steps(old_steps)
+            raise
+
+        self.step_skip_index.replace_steps(final_steps)
         self.steps_including_skipped = final_steps
         self.curr_step_idx = len(self.steps_including_skipped) - 1
 
+        self.enforce_state_retention_policy()
+
+    def set_state_retention_policy(self, state_retention_policy: Optional[StepStateRetentionPolicy]) -> None:
+        """
+        Sets the policy for which step states are kept in memory, and applies
+        it right away. Passing None keeps the states of every step.
+        """
+        validate_state_retention_policy(state_retention_policy)
+        self.state_retention_policy = state_retention_policy
+        self.enforce_state_retention_policy()
+
+    def _get_protected_step_indexes(self, step_indexes_to_skip: Set[int]) -> Set[int]:
+        """
+        Returns the indexes of the steps whose states are never evicted: the initialize step,
+        any import step, the current and final step, and the step that was last rebuilt (as
+        it is likely being used right now).
+        """
+        protected_step_indexes = {0, self.curr_step_idx, len(self.steps_including_skipped) - 1}
+        for step_index, step in enumerate(self.steps_including_skipped):
+            if step.step_type in IMPORT_STEP_TYPES and step_index not in step_indexes_to_skip:
+                protected_step_indexes.add(step_index)
+            if step is self._last_rebuilt_step:
+                protected_step_indexes.add(step_index)
+        return protected_step_indexes
+
+    def _get_checkpoint_step_indexes(self, step_indexes_to_skip: Set[int]) -> List[int]:
+        """
+        Returns the indexes of the executed steps that keep their states under the
+        current retention policy, in order.
+        """
+        if self.state_retention_policy is None:
+            return [index for index in range(len(self.steps_including_skipped)) if index not in step_indexes_to_skip]
+
+        checkpoint_interval = self.state_retention_policy['checkpoint_interval']
+        protected_step_indexes = self._get_protected_step_indexes(step_indexes_to_skip)
+        executed_step_indexes = [index for index in range(len(self.steps_including_skipped)) if index not in step_indexes_to_skip]
+        return [
+            step_index for executed_index, step_index in enumerate(executed_step_indexes)
+            if executed_index % checkpoint_interval == 0 or step_index in protected_step_indexes
+        ]
+
+    def enforce_state_retention_policy(self) -> None:
+        """
+        Evicts the states of the steps that should not keep them under the current retention 
+        policy. Evicted states are rebuilt by replaying from the closest earlier step that kept
+        its states, whenever they are next accessed (e.g. when checking out a step, undoing, 
+        or transpiling).
+
+        Skipped steps are never executed again, so their states are always evicted. If the
+        policy has a byte budget, then the oldest checkpoints are also evicted until the
+        step history fits in the budget, or there are no more checkpoints to evict.
+        """
+        if self.state_retention_policy is None:
+            return
+
+        with self._state_retention_lock:
+            step_indexes_to_skip = self.get_step_indexes_to_skip()
+            checkpoint_step_indexes = self._get_checkpoint_step_indexes(step_indexes_to_skip)
+
+            retained_step_indexes = set(checkpoint_step_indexes)
+            for step_index, step in enumerate(self.steps_including_skipped):
+                if step_index not in retained_step_indexes:
+                    self._evict_step_states(step)
+
+            max_step_history_bytes = self.state_retention_policy.get('max_step_history_bytes')
+            if max_step_history_bytes is None:
+                return
+
+            protected_step_indexes = self._get_protected_step_indexes(step_indexes_to_skip)
+            evictable_step_indexes = [index for index in checkpoint_step_indexes if index not in protected_step_indexes]
+            for step_index in evictable_step_indexes:
+                if self.get_step_history_memory_footprint()['total_bytes'] <= max_step_history_bytes:
+                    break
+                self._evict_step_states(self.steps_including_skipped[step_index])
+
+    def _evict_step_states(self, step: Step) -> None:
+        if not step.states_evicted and len(step.get_retained_states()) > 0:
+            step.evict_states(self._rebuild_evicted_step_states, self._state_retention_lock)
+            # The cached code chunks refer to the evicted states, so we drop them too
+            self._code_chunks_cache = None
+
+    def _rebuild_evicted_step_states(self, step: Step) -> None:
+        """
+        Rebuilds the states of a step whose states were evicted, by finding the closest 
+        earlier executed step that still has its states, and replaying the executed steps 
+        from there. Only the rebuilt step keeps its states; the intermediate steps stay
+        evicted, so that rebuilding does not grow the step history.
+        """
+        with self._state_retention_lock:
+            step_index = next((index for index, s in enumerate(self.steps_including_skipped) if s is step), None)
+            if step_index is None:
+                raise ValueError(f'Cannot rebuild the states of step {step.step_id}, as it is not in the current analysis')
+
+            step_indexes_to_skip = self.get_step_indexes_to_skip()
+
+            start_index = step_index - 1
+            while start_index > 0 and (start_index in step_indexes_to_skip or self.steps_including_skipped[start_index].states_evicted):
+                start_index -= 1
+
+            prev_state = self.steps_including_skipped[start_index].final_defined_state
+            for replay_index in range(start_index + 1, step_index):
+                if replay_index not in step_indexes_to_skip:
+                    prev_state = self.steps_including_skipped[replay_index].execute_on_state(prev_state)
+
+            try:
+                post_state = step.execute_on_state(prev_state)
+            except:
+                # A skipped step may no longer be valid on top of the steps before it, in which
+                # case it is treated as a no-op, as it never is executed again anyways
+                if step_index not in step_indexes_to_skip:
+                    raise
+                post_state = prev_state
+
+            step.restore_states(prev_state, post_state)
+
+            # Keep only the most recently rebuilt step, so that walking over all the steps (e.g.
+            # to transpile them) replays each step about once, while keeping memory bounded
+            self._last_rebuilt_step = step
+            self.enforce_state_retention_policy()
+
+    def _get_dataframe_memory_usage(self, df: pd.DataFrame) -> int:
+        """
+        Returns the number of bytes that a dataframe uses, which is cached for as long
+        as the dataframe is alive.
+        """
+        cached_ref_and_bytes = self._dataframe_memory_usage_cache.get(id(df))
+        if cached_ref_and_bytes is not None and is_same_dataframe(cached_ref_and_bytes[0], df):
+            return cached_ref_and_bytes[1]
+
+        num_bytes = int(df.memory_usage(index=True, deep=True).sum())
+        self._dataframe_memory_usage_cache[id(df)] = (get_dataframe_ref(df), num_bytes)
+        return num_bytes
+
+    def get_step_history_memory_footprint(self) -> StepHistoryMemoryFootprint:
+        """
+        Returns the approximate memory used by the dataframes that are kept in the step 
+        history. Dataframes that are shared between states are only counted once.
+        """
+        with self._state_retention_lock:
+            dataframes: Dict[int, pd.DataFrame] = {}
+            num_steps_with_states = 0
+            num_steps_with_evicted_states = 0
+            for step in self.steps_including_skipped:
+                retained_states = step.get_retained_states()
+                if len(retained_states) > 0:
+                    num_steps_with_states += 1
+                if step.states_evicted:
+                    num_steps_with_evicted_states += 1
+                for state in retained_states:
+                    for df in state.dfs:
+                        dataframes[id(df)] = df
+
+            # Clean up the cache for dataframes that no longer exist
+            self._dataframe_memory_usage_cache = {
+                df_id: ref_and_bytes for df_id, ref_and_bytes in self._dataframe_memory_usage_cache.items() if ref_and_bytes[0]() is not None
+            }
+
+            step_indexes_to_skip = self.get_step_indexes_to_skip()
+
+            return {
+                'total_bytes': sum(self._get_dataframe_memory_usage(df) for df in dataframes.values()),
+                'num_steps': len(self.steps_including_skipped),
+                'num_steps_with_states': num_steps_with_states,
+                'num_steps_with_evicted_states': num_steps_with_evicted_states,
+                'checkpoint_step_indexes': [
+                    index for index in self._get_checkpoint_step_indexes(step_indexes_to_skip) 
+                    if not self.steps_including_skipped[index].states_evicted
+                ],
+            }
+
     def execute_steps_data(self, new_steps_data: Optional[List[Dict[str, Any]]] = None) -> None:
         """
         Given steps data (e.g. from a saved analysis), will turn
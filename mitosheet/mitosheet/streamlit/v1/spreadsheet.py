@@ -13,7 +13,7 @@ import pandas as pd
 
 from mitosheet.mito_backend import MitoBackend
 from mitosheet.selection_utils import get_selected_element
-from mitosheet.types import CodeOptions, ColumnDefinitions, ConditionalFormat, DefaultEditingMode, ParamMetadata, ParamType
+from mitosheet.types import CodeOptions, ColumnDefinitions, ConditionalFormat, DefaultEditingMode, ParamMetadata, ParamType, SheetDataEncoding
 from mitosheet.user.utils import is_pro
 from mitosheet.utils import get_new_id
 
@@ -273,6 +273,7 @@ try:
             _column_definitions: Optional[List[ColumnDefinitions]]=None,
             _default_editing_mode: Optional[DefaultEditingMode]=None,
             import_folder: Optional[str]=None,
+            sheet_data_encoding: Optional[SheetDataEncoding]=None,
             df_names: Optional[List[str]]=None,
             session_id: Optional[str]=None,
             key: Optional[str]=None # So it caches on key
@@ -285,6 +286,7 @@ try:
             code_options=_code_options,
             column_definitions = _column_definitions,
             default_editing_mode=_default_editing_mode,
+            sheet_data_encoding=sheet_data_encoding,
         )
 
         # Make a send function that stores the responses in a list
@@ -327,6 +329,7 @@ try:
             code_options: Optional[CodeOptions]=None,
             column_definitions: Optional[List[ColumnDefinitions]]=None,
             default_editing_mode: Optional[DefaultEditingMode]=None,
+            sheet_data_encoding: Optional[SheetDataEncoding]=None,
             return_type: str='default',
             height: Optional[str]=None,
             key=None
@@ -354,6 +357,10 @@ try:
         df_names: List[str]
             A list of names for the dataframes passed in. If None, the dataframes
             will be named df0, df1, etc.
+        sheet_data_encoding: 'json' or 'columnar'
+            How the sheet data is sent to the frontend. If 'columnar', the numeric
+            and boolean columns are sent as typed-array buffers, which is faster
+            for large dataframes. Defaults to 'json'.
         key: str or None
             An key that uniquely identifies this component. This must be passed
             for now, or the component will not work. Not sure why.
@@ -376,6 +383,7 @@ try:
             _column_definitions=column_definitions,
             _default_editing_mode=default_editing_mode,
             import_folder=import_folder,
+            sheet_data_encoding=sheet_data_encoding,
             session_id=session_id,
             df_names=df_names, 
             key=key
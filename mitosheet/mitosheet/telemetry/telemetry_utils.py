@@ -21,6 +21,7 @@ from typing import Any, Dict, Optional
 import requests
 
 from unittest.mock import patch
+from mitosheet.enterprise.telemetry.mito_analytics_sender import get_mito_analytics_sender
 from mitosheet.enterprise.telemetry.mito_log_uploader import MitoLogUploader
 from mitosheet.errors import MitoError, get_recent_traceback_as_list
 from mitosheet.telemetry.anonymization_utils import anonymize_object, get_final_private_params_for_single_kv
@@ -460,13 +461,11 @@ def log(
 
     analytics_url = steps_manager.mito_config.analytics_url if steps_manager is not None else None
     if analytics_url is not None:
-        requests.post(
-            analytics_url,
-            json={
-                'user_id': get_user_field(UJ_STATIC_USER_ID),
-                'log_event': log_event
-            }
-        )
+        # The event is sent in the background, so that a slow analytics url does not slow down the mitosheet
+        get_mito_analytics_sender(analytics_url).send({
+            'user_id': get_user_field(UJ_STATIC_USER_ID),
+            'log_event': log_event
+        })
 
     mito_log_uploader = steps_manager.mito_log_uploader if steps_manager is not None else None
     if mito_log_uploader is not None:
@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Contains tests for the API, which handles API calls on a pool of threads.
+"""
+from threading import Event
+from time import perf_counter, sleep
+from typing import Any, Dict, List
+
+import pandas as pd
+import pytest
+
+import mitosheet.api.api as api_module
+from mitosheet.api.api import API
+from mitosheet.api.api_call_cancellation import raise_if_api_call_cancelled
+from mitosheet.tests.test_utils import create_mito_wrapper
+
+
+class FakeMitoBackend():
+
+    def __init__(self) -> None:
+        self.responses: List[Dict[str, Any]] = []
+        self.received_response = Event()
+
+    def mito_send(self, message: Dict[str, Any]) -> None:
+        self.responses.append(message)
+        self.received_response.set()
+
+    def get_response_data(self, id: str) -> Any:
+        return next(response['data'] for response in self.responses if response['id'] == id)
+
+    def wait_for_responses(self, num_responses: int, timeout: float=10) -> None:
+        end_time = perf_counter() + timeout
+        while len(self.responses) < num_responses:
+            assert perf_counter() < end_time, f'Only got {len(self.responses)} of {num_responses} responses'
+            self.received_response.wait(0.01)
+
+
+def get_api_and_backend():
+    test_wrapper = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3]}))
+    mito_backend = FakeMitoBackend()
+    return API(test_wrapper.mito_backend.steps_manager, mito_backend), mito_backend
+
+
+def get_event(id: str, type: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    return {'event': 'api_call', 'id': id, 'type': type, 'params': params}
+
+
+class BlockedExcelExport():
+
+    def __init__(self) -> None:
+        self.started = Event()
+        self.unblocked = Event()
+
+    def wait_till_started(self) -> None:
+        assert self.started.wait(10), 'The excel export was never started'
+
+    def unblock(self) -> None:
+        self.unblocked.set()
+
+
+@pytest.fixture
+def blocked_excel_export(monkeypatch):
+    """
+    Replaces the excel export with one that does not finish till it is unblocked.
+    """
+    blocked_excel_export = BlockedExcelExport()
+
+    def get_dataframe_as_excel(params, steps_manager):
+        blocked_excel_export.started.set()
+        blocked_excel_export.unblocked.wait(10)
+        return 'excel'
+
+    monkeypatch.setattr(api_module, 'get_dataframe_as_excel', get_dataframe_as_excel)
+    yield blocked_excel_export
+    blocked_excel_export.unblock()
+
+
+def test_slow_api_call_does_not_block_other_api_calls(blocked_excel_export):
+    api, mito_backend = get_api_and_backend()
+
+    api.process_new_api_call(get_event('excel', 'get_dataframe_as_excel', {}))
+    api.process_new_api_call(get_event('describe', 'get_column_describe', {'sheet_index': 0, 'column_id': 'A'}))
+    mito_backend.wait_for_responses(1)
+
+    assert mito_backend.responses[0]['id'] == 'describe'
+    assert mito_backend.get_response_data('describe')['sum'] == '6'
+
+    blocked_excel_export.unblock()
+    mito_backend.wait_for_responses(2)
+    assert mito_backend.get_response_data('excel') == 'excel'
+
+
+def test_api_records_queue_wait_and_run_time(blocked_excel_export):
+    api, mito_backend = get_api_and_backend()
+
+    api.process_new_api_call(get_event('excel', 'get_dataframe_as_excel', {}))
+    blocked_excel_export.wait_till_started()
+    sleep(.1)
+    blocked_excel_export.unblock()
+    mito_backend.wait_for_responses(1)
+
+    api_call = api.finished_api_calls[0]
+    assert api_call.event['id'] == 'excel'
+    assert api_call.queue_wait_seconds is not None and api_call.queue_wait_seconds >= 0
+    assert api_call.run_seconds is not None and api_call.run_seconds >= .1
+
+
+def test_queued_api_calls_are_handled_by_priority(monkeypatch, blocked_excel_export):
+    monkeypatch.setattr(api_module, 'MAX_API_WORKERS', 1)
+    api, mito_backend = get_api_and_backend()
+
+    api.process_new_api_call(get_event('excel', 'get_dataframe_as_excel', {}))
+    blocked_excel_export.wait_till_started()
+    api.process_new_api_call(get_event('csv', 'get_dataframe_as_csv', {'sheet_index': 0}))
+    api.process_new_api_call(get_event('describe', 'get_column_describe', {'sheet_index': 0, 'column_id': 'A'}))
+    blocked_excel_export.unblock()
+    mito_backend.wait_for_responses(3)
+
+    assert [response['id'] for response in mito_backend.responses] == ['excel', 'describe', 'csv']
+
+
+def test_full_queue_drops_lowest_priority_api_call(monkeypatch, blocked_excel_export):
+    monkeypatch.setattr(api_module, 'MAX_API_WORKERS', 1)
+    api, mito_backend = get_api_and_backend()
+
+    api.process_new_api_call(get_event('excel', 'get_dataframe_as_excel', {}))
+    blocked_excel_export.wait_till_started()
+    api.process_new_api_call(get_event('describe_1', 'get_column_describe', {'sheet_index': 0, 'column_id': 'A'}))
+    api.process_new_api_call(get_event('csv', 'get_dataframe_as_csv', {'sheet_index': 0}))
+    api.process_new_api_call(get_event('describe_2', 'get_column_describe', {'sheet_index': 0, 'column_id': 'A'}))
+    api.process_new_api_call(get_event('describe_3', 'get_column_describe', {'sheet_index': 0, 'column_id': 'A'}))
+
+    assert mito_backend.responses == [{'event': 'api_response', 'id': 'csv', 'data': None}]
+
+    blocked_excel_export.unblock()
+    mito_backend.wait_for_responses(5)
+    assert [response['id'] for response in mito_backend.responses] == ['csv', 'excel', 'describe_1', 'describe_2', 'describe_3']
+
+
+def test_queued_search_is_dropped_when_superseded(monkeypatch, blocked_excel_export):
+    monkeypatch.setattr(api_module, 'MAX_API_WORKERS', 1)
+    api, mito_backend = get_api_and_backend()
+
+    api.process_new_api_call(get_event('excel', 'get_dataframe_as_excel', {}))
+    blocked_excel_export.wait_till_started()
+    api.process_new_api_call(get_event('search_1', 'get_search_matches', {'sheet_index': 0, 'search_value': '1'}))
+    api.process_new_api_call(get_event('search_2', 'get_search_matches', {'sheet_index': 0, 'search_value': '2'}))
+
+    assert mito_backend.responses == [{'event': 'api_response', 'id': 'search_1', 'data': None}]
+
+    blocked_excel_export.unblock()
+    mito_backend.wait_for_responses(3)
+    assert mito_backend.get_response_data('search_2')['total_number_matches'] == 1
+
+
+def test_running_search_is_cancelled_when_superseded(monkeypatch):
+    search_started = Event()
+    original_get_search_matches = api_module.get_search_matches
+
+    def get_search_matches(params, steps_manager):
+        if params['search_value'] == '1':
+            search_started.set()
+            # Search forever, till this search is cancelled
+            while True:
+                raise_if_api_call_cancelled()
+                sleep(.01)
+        return original_get_search_matches(params, steps_manager)
+
+    monkeypatch.setattr(api_module, 'get_search_matches', get_search_matches)
+    api, mito_backend = get_api_and_backend()
+
+    api.process_new_api_call(get_event('search_1', 'get_search_matches', {'sheet_index': 0, 'search_value': '1'}))
+    assert search_started.wait(10)
+    api.process_new_api_call(get_event('search_2', 'get_search_matches', {'sheet_index': 0, 'search_value': '2'}))
+    mito_backend.wait_for_responses(2)
+
+    assert mito_backend.get_response_data('search_1') is None
+    assert mito_backend.get_response_data('search_2')['total_number_matches'] == 1
+
+
+def test_searches_of_different_sheets_do_not_supersede_each_other(monkeypatch, blocked_excel_export):
+    monkeypatch.setattr(api_module, 'MAX_API_WORKERS', 1)
+    test_wrapper = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3]}), pd.DataFrame({'B': [2, 3, 4]}))
+    mito_backend = FakeMitoBackend()
+    api = API(test_wrapper.mito_backend.steps_manager, mito_backend)
+
+    api.process_new_api_call(get_event('excel', 'get_dataframe_as_excel', {}))
+    blocked_excel_export.wait_till_started()
+    api.process_new_api_call(get_event('search_1', 'get_search_matches', {'sheet_index': 0, 'search_value': '2'}))
+    api.process_new_api_call(get_event('search_2', 'get_search_matches', {'sheet_index': 1, 'search_value': '2'}))
+    blocked_excel_export.unblock()
+    mito_backend.wait_for_responses(3)
+
+    assert mito_backend.get_response_data('search_1')['total_number_matches'] == 1
+    assert mito_backend.get_response_data('search_2')['total_number_matches'] == 1
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Contains tests for the column statistics cache, which is shared by the
+API calls that the column panel makes.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+from time import sleep
+
+import pandas as pd
+
+from mitosheet.api.get_column_describe import get_column_describe
+from mitosheet.api.get_column_summary_graph import get_column_summary_graph
+from mitosheet.api.get_unique_value_counts import MAX_UNIQUE_VALUES, get_unique_value_counts
+from mitosheet.tests.test_utils import create_mito_wrapper
+
+
+def test_column_panel_api_calls_share_column_statistics():
+    test_wrapper = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 2, None], 'B': ['a', 'b', 'b', 'b']}))
+    steps_manager = test_wrapper.mito_backend.steps_manager
+
+    describe = get_column_describe({'sheet_index': 0, 'column_id': 'A'}, steps_manager)
+    assert describe['count'] == '3.0'
+    assert describe['count: NaN'] == '1'
+    assert describe['sum'] == '5.0'
+
+    unique_value_counts = get_unique_value_counts({'sheet_index': 0, 'column_id': 'A', 'search_string': '', 'sort': 'Descending Occurence'}, steps_manager)
+    assert unique_value_counts['isAllData']
+    assert len(unique_value_counts['uniqueValueRowDataArray']) == 3
+
+    column_statistics = steps_manager.column_statistics_cache.get_column_statistics(0, 'A', steps_manager.dfs[0], steps_manager.dfs[0]['A'])
+    value_counts = column_statistics.get_value_counts()
+
+    get_column_summary_graph({'sheet_index': 0, 'column_id': 'A', 'height': '400px', 'width': '400px', 'include_plotlyjs': False}, steps_manager)
+    get_column_describe({'sheet_index': 0, 'column_id': 'A'}, steps_manager)
+    assert steps_manager.column_statistics_cache.get_column_statistics(0, 'A', steps_manager.dfs[0], steps_manager.dfs[0]['A']).get_value_counts() is value_counts
+
+
+def test_column_statistics_are_recomputed_once_the_column_changes():
+    test_wrapper = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3], 'B': ['a', 'b', 'c']}))
+    steps_manager = test_wrapper.mito_backend.steps_manager
+
+    assert get_column_describe({'sheet_index': 0, 'column_id': 'A'}, steps_manager)['sum'] == '6'
+    get_column_describe({'sheet_index': 0, 'column_id': 'B'}, steps_manager)
+    column_statistics_b = steps_manager.column_statistics_cache.get_column_statistics(0, 'B', steps_manager.dfs[0], steps_manager.dfs[0]['B'])
+
+    test_wrapper.set_cell_value(0, 'A', 0, 10)
+
+    assert get_column_describe({'sheet_index': 0, 'column_id': 'A'}, steps_manager)['sum'] == '15'
+    assert steps_manager.column_statistics_cache.get_column_statistics(0, 'B', steps_manager.dfs[0], steps_manager.dfs[0]['B']) is column_statistics_b
+
+
+def test_unique_value_counts_searches_the_sorted_values():
+    test_wrapper = create_mito_wrapper(pd.DataFrame({'A': [f'value_{i}' for i in range(MAX_UNIQUE_VALUES * 2)] + ['value_19']}))
+    steps_manager = test_wrapper.mito_backend.steps_manager
+
+    unique_value_counts = get_unique_value_counts({'sheet_index': 0, 'column_id': 'A', 'search_string': 'VALUE_19', 'sort': 'Descending Occurence'}, steps_manager)
+    assert unique_value_counts['isAllData']
+    assert len(unique_value_counts['uniqueValueRowDataArray']) == 1 + 10 + 100
+    assert unique_value_counts['uniqueValueRowDataArray'][0][0] == 'value_19'
+
+    unique_value_counts = get_unique_value_counts({'sheet_index': 0, 'column_id': 'A', 'search_string': '', 'sort': 'Descending Occurence'}, steps_manager)
+    assert not unique_value_counts['isAllData']
+    assert len(unique_value_counts['uniqueValueRowDataArray']) == MAX_UNIQUE_VALUES
+
+
+def test_column_panel_api_calls_on_different_threads_share_column_statistics(monkeypatch):
+    test_wrapper = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 2, None]}))
+    steps_manager = test_wrapper.mito_backend.steps_manager
+
+    # Make computing the value counts slow, so that the threads all try to compute them at once
+    value_counts_calls = []
+    original_value_counts = pd.Series.value_counts
+    def value_counts(self, dropna=True):
+        value_counts_calls.append(None)
+        sleep(.1)
+        return original_value_counts(self, dropna=dropna)
+    monkeypatch.setattr(pd.Series, 'value_counts', value_counts)
+
+    num_threads = 8
+    barrier = Barrier(num_threads)
+    def get_column_statistics_value_counts(_):
+        barrier.wait()
+        column_statistics = steps_manager.column_statistics_cache.get_column_statistics(0, 'A', steps_manager.dfs[0], steps_manager.dfs[0]['A'])
+        return column_statistics, column_statistics.get_value_counts()
+
+    with ThreadPoolExecutor(num_threads) as executor:
+        results = list(executor.map(get_column_statistics_value_counts, range(num_threads)))
+
+    assert all(column_statistics is results[0][0] for column_statistics, _ in results)
+    assert all(value_counts is results[0][1] for _, value_counts in results)
+    assert len(value_counts_calls) == 1
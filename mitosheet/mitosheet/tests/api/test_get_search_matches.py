@@ -6,11 +6,15 @@
 """
 Contains tests for the add_formatting_to_excel_sheet function.
 """
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+from time import sleep
 
 import pandas as pd
 import pytest
 
 from mitosheet.tests.test_utils import create_mito_wrapper, create_mito_wrapper_with_data
+import mitosheet.api.get_search_matches as get_search_matches_module
 from mitosheet.api.get_search_matches import get_search_matches
 from mitosheet.tests.decorators import pandas_post_1_only
 
@@ -214,4 +218,55 @@ def test_get_number_matches_multiple_dataframes(dfs,sheet_index,search_value,exp
 
     for i, match in enumerate(matches['matches']):
         assert match['rowIndex'] == expected_matches[i][0]
-        assert match['colIndex'] == expected_matches[i][1]
\ No newline at end of file
+        assert match['colIndex'] == expected_matches[i][1]
+
+def test_get_search_matches_counts_all_rows_but_only_finds_shown_cells():
+    test_wrapper = create_mito_wrapper(pd.DataFrame({'A': ['abc', None, 'ABC'] * 1000, 'B': [1.5, float('nan'), 2.5] * 1000}))
+
+    matches = get_search_matches({'sheet_index': 0, 'search_value': 'aBc'}, test_wrapper.mito_backend.steps_manager)
+    assert matches['total_number_matches'] == 2000
+    assert matches['matches'][:2] == [{'rowIndex': 0, 'colIndex': 0}, {'rowIndex': 2, 'colIndex': 0}]
+    assert len(matches['matches']) == 1000
+
+    # Missing values are not counted, but are found as cells, as they are displayed as nan
+    matches = get_search_matches({'sheet_index': 0, 'search_value': 'nan'}, test_wrapper.mito_backend.steps_manager)
+    assert matches['total_number_matches'] == 0
+    assert matches['matches'][:2] == [{'rowIndex': 1, 'colIndex': 1}, {'rowIndex': 4, 'colIndex': 1}]
+
+
+def test_get_search_matches_only_rebuilds_edited_columns():
+    test_wrapper = create_mito_wrapper(pd.DataFrame({'A': ['abc', 'def'], 'B': ['abc', 'xyz']}))
+    steps_manager = test_wrapper.mito_backend.steps_manager
+
+    assert get_search_matches({'sheet_index': 0, 'search_value': 'abc'}, steps_manager)['total_number_matches'] == 2
+    column_search_views = steps_manager.search_matches_cache.get_column_search_views(0, steps_manager.dfs[0])
+
+    test_wrapper.set_cell_value(0, 'B', 1, 'abcd')
+
+    assert get_search_matches({'sheet_index': 0, 'search_value': 'abc'}, steps_manager)['total_number_matches'] == 3
+    new_column_search_views = steps_manager.search_matches_cache.get_column_search_views(0, steps_manager.dfs[0])
+    assert new_column_search_views[0] is column_search_views[0]
+    assert new_column_search_views[1] is not column_search_views[1]
+
+
+def test_searches_on_different_threads_share_column_search_views(monkeypatch):
+    test_wrapper = create_mito_wrapper(pd.DataFrame({'A': ['abc', 'def'], 'B': ['abc', 'xyz']}))
+    steps_manager = test_wrapper.mito_backend.steps_manager
+
+    # Make building the views slow, so that the threads all try to build them at once
+    original_get_lowercase_strings = get_search_matches_module._get_lowercase_strings
+    def get_lowercase_strings(values):
+        sleep(.05)
+        return original_get_lowercase_strings(values)
+    monkeypatch.setattr(get_search_matches_module, '_get_lowercase_strings', get_lowercase_strings)
+
+    num_threads = 8
+    barrier = Barrier(num_threads)
+    def get_column_search_views(_):
+        barrier.wait()
+        return steps_manager.search_matches_cache.get_column_search_views(0, steps_manager.dfs[0])
+
+    with ThreadPoolExecutor(num_threads) as executor:
+        all_column_search_views = list(executor.map(get_column_search_views, range(num_threads)))
+
+    assert all(column_search_views is all_column_search_views[0] for column_search_views in all_column_search_views)
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Benchmarks searching the unique values of a column in the column panel with
+the cached column statistics against recomputing the value counts each time.
+"""
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mitosheet.api.get_unique_value_counts import MAX_UNIQUE_VALUES, get_unique_value_counts
+from mitosheet.tests.test_utils import create_mito_wrapper
+
+NUM_ROWS = 1_000_000
+NUM_UNIQUE_VALUES = 100_000
+
+
+def search_recomputed_value_counts(series: pd.Series, search_string: str) -> pd.DataFrame:
+    unique_value_counts_df = pd.DataFrame({
+        'values': series.value_counts(normalize=True, dropna=False).index,
+        'percents': series.value_counts(normalize=True, dropna=False),
+        'counts': series.value_counts(dropna=False)
+    })
+    new_unique_value_counts_df = unique_value_counts_df.copy(deep=True)
+    new_unique_value_counts_df['values_strings'] = new_unique_value_counts_df['values'].astype('str')
+    new_unique_value_counts_df = new_unique_value_counts_df.sort_values(by='counts', ascending=False, na_position='first')
+    new_unique_value_counts_df = new_unique_value_counts_df[new_unique_value_counts_df['values_strings'].str.contains(search_string, na=False, case=False)]
+    return unique_value_counts_df.loc[new_unique_value_counts_df.head(MAX_UNIQUE_VALUES).index]
+
+
+@pytest.mark.benchmark
+def test_searching_unique_values_is_faster_than_recomputing_value_counts():
+    rng = np.random.default_rng(0)
+    series = pd.Series(rng.integers(0, NUM_UNIQUE_VALUES, NUM_ROWS)).astype(str)
+    test_wrapper = create_mito_wrapper(pd.DataFrame({'A': series}))
+    steps_manager = test_wrapper.mito_backend.steps_manager
+
+    # Type the search value one keystroke at a time
+    search_strings = ['1', '12', '123', '1234']
+
+    start_time = perf_counter()
+    for search_string in search_strings:
+        search_recomputed_value_counts(series, search_string)
+    recompute_seconds = perf_counter() - start_time
+
+    start_time = perf_counter()
+    for search_string in search_strings:
+        get_unique_value_counts({'sheet_index': 0, 'column_id': 'A', 'search_string': search_string, 'sort': 'Descending Occurence'}, steps_manager)
+    cached_seconds = perf_counter() - start_time
+
+    print(f'\nSearching {NUM_UNIQUE_VALUES} unique values of {NUM_ROWS} rows {len(search_strings)} times recomputing the value counts: {recompute_seconds:.3f}s, with cached column statistics: {cached_seconds:.3f}s')
+
+    assert cached_seconds * 2 < recompute_seconds
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Benchmarks recomputing the conditional formatting results of a sheet after
+one column is edited, with and without the conditional formatting result cache.
+"""
+from time import perf_counter
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mitosheet.pro.conditional_formatting_utils import (
+    ConditionalFormattingResultCache, get_conditonal_formatting_result)
+from mitosheet.state import State
+from mitosheet.types import FC_NUMBER_HIGHEST
+
+NUM_ROWS = 1_000_000
+NUM_COLUMNS = 20
+
+
+def get_conditionally_formatted_df(num_rows: int) -> Tuple[pd.DataFrame, List[Dict[str, Any]]]:
+    df = pd.DataFrame({f'C{i}': np.random.default_rng(i).random(num_rows) for i in range(NUM_COLUMNS)})
+    conditional_formats = [
+        {
+            'format_uuid': f'format{i}',
+            'columnIDs': [f'C{i}'],
+            'filters': [{'condition': FC_NUMBER_HIGHEST, 'value': 10}],
+            'color': 'red',
+            'backgroundColor': 'blue'
+        }
+        for i in range(NUM_COLUMNS)
+    ]
+    return df, conditional_formats
+
+
+def edit_last_column(df: pd.DataFrame, cache: ConditionalFormattingResultCache) -> pd.DataFrame:
+    edited_df = df.copy()
+    edited_df[f'C{NUM_COLUMNS - 1}'] = edited_df[f'C{NUM_COLUMNS - 1}'] * 2
+    cache.remove_modified_results({0: {f'C{NUM_COLUMNS - 1}'}})
+    return edited_df
+
+
+def test_conditional_formatting_cache_matches_full_result():
+    df, conditional_formats = get_conditionally_formatted_df(1_000)
+    state = State([df], 3)
+    cache = ConditionalFormattingResultCache()
+    get_conditonal_formatting_result(state, 0, df, conditional_formats, conditional_formatting_result_cache=cache)
+    cached_results = {key: result for key, (_, result) in cache.results.items()}
+
+    edited_df = edit_last_column(df, cache)
+    full_result = get_conditonal_formatting_result(state, 0, edited_df, conditional_formats)
+    cached_result = get_conditonal_formatting_result(state, 0, edited_df, conditional_formats, conditional_formatting_result_cache=cache)
+
+    assert cached_result == full_result
+    # Only the result for the edited column is recomputed
+    recomputed_keys = [key for key, (_, result) in cache.results.items() if result is not cached_results[key]]
+    assert len(recomputed_keys) == 1
+
+
+@pytest.mark.benchmark
+def test_conditional_formatting_cache_only_recomputes_edited_column():
+    df, conditional_formats = get_conditionally_formatted_df(NUM_ROWS)
+    state = State([df], 3)
+    cache = ConditionalFormattingResultCache()
+    get_conditonal_formatting_result(state, 0, df, conditional_formats, conditional_formatting_result_cache=cache)
+
+    edited_df = edit_last_column(df, cache)
+
+    start_time = perf_counter()
+    full_result = get_conditonal_formatting_result(state, 0, edited_df, conditional_formats)
+    full_seconds = perf_counter() - start_time
+
+    start_time = perf_counter()
+    cached_result = get_conditonal_formatting_result(state, 0, edited_df, conditional_formats, conditional_formatting_result_cache=cache)
+    cached_seconds = perf_counter() - start_time
+
+    print(f'\nConditional formatting results for {NUM_COLUMNS} columns of {NUM_ROWS} rows: {full_seconds:.3f}s')
+    print(f'Cached conditional formatting results after editing one column: {cached_seconds:.3f}s')
+
+    assert cached_result == full_result
+    assert cached_seconds < full_seconds / 2
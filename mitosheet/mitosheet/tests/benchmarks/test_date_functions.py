@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Benchmarks the date functions on a large column, and benchmarks the month
+start and end functions against rolling each date individually.
+"""
+from time import perf_counter
+
+import pandas as pd
+import pytest
+
+from mitosheet.public.v3.sheet_functions.date_functions import (
+    DATE_FUNCTIONS, ENDOFBUSINESSMONTH, ENDOFMONTH, STARTOFBUSINESSMONTH,
+    STARTOFMONTH, to_end, to_start)
+
+NUM_ROWS = 10_000_000
+
+# Rolling each date individually is so slow that we time it on fewer rows
+# and scale it up to the full column
+ROLL_EACH_DATE_NUM_ROWS = 10_000
+
+
+MONTH_FUNCTIONS_AND_ROLL_DATE = [
+    (ENDOFBUSINESSMONTH, lambda t: to_end(t, pd.tseries.offsets.BMonthEnd(n=0))),
+    (ENDOFMONTH, lambda t: to_end(t, pd.tseries.offsets.MonthEnd(n=0))),
+    (STARTOFBUSINESSMONTH, lambda t: to_start(t, pd.tseries.offsets.BMonthBegin(n=1))),
+    (STARTOFMONTH, lambda t: to_start(t, pd.tseries.offsets.MonthBegin(n=1))),
+]
+
+
+def get_datetimes(num_rows: int, freq: str) -> pd.Series:
+    datetimes = pd.Series(pd.date_range('2000-01-01', periods=num_rows, freq=freq))
+    # Some dates are missing
+    return datetimes.where(datetimes.dt.minute != 0)
+
+
+@pytest.fixture(scope='module')
+def datetimes() -> pd.Series:
+    return get_datetimes(NUM_ROWS, 'min')
+
+
+@pytest.mark.parametrize("func, roll_date", MONTH_FUNCTIONS_AND_ROLL_DATE)
+def test_month_functions_match_rolling_each_date(func, roll_date):
+    # Every seven hours for most of a year, so that the dates fall on weekends and on the first and last days of months
+    some_datetimes = get_datetimes(ROLL_EACH_DATE_NUM_ROWS // 10, '7h')
+
+    assert func(some_datetimes).equals(some_datetimes.apply(roll_date))
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("function_name", sorted(name for name in DATE_FUNCTIONS.keys() if name != 'TODAY'))
+def test_date_function_runtime(datetimes, function_name):
+    start_time = perf_counter()
+    result = DATE_FUNCTIONS[function_name](datetimes)
+    seconds = perf_counter() - start_time
+
+    print(f'\n{function_name} on {NUM_ROWS} rows: {seconds:.3f}s')
+
+    assert len(result) == NUM_ROWS
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("func, roll_date", MONTH_FUNCTIONS_AND_ROLL_DATE)
+def test_month_functions_are_faster_than_rolling_each_date(datetimes, func, roll_date):
+    some_datetimes = datetimes.iloc[::NUM_ROWS // ROLL_EACH_DATE_NUM_ROWS]
+
+    start_time = perf_counter()
+    rolled_datetimes = some_datetimes.apply(roll_date)
+    roll_each_date_seconds = (perf_counter() - start_time) * (NUM_ROWS / len(some_datetimes))
+
+    start_time = perf_counter()
+    result = func(datetimes)
+    seconds = perf_counter() - start_time
+
+    print(f'\n{func.__name__} on {NUM_ROWS} rows rolling each date: ~{roll_each_date_seconds:.3f}s, all at once: {seconds:.3f}s')
+
+    assert result[some_datetimes.index].equals(rolled_datetimes)
+    assert seconds * 50 < roll_each_date_seconds
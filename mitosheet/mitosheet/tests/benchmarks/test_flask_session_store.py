@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Benchmarks processing an event with the Flask integration for a long analysis,
+which replayed every step of the analysis on each request before live backends
+were kept in a session store.
+"""
+from pathlib import Path
+from time import perf_counter
+from typing import Optional
+
+import pandas as pd
+import pytest
+
+from mitosheet.mito_flask.v1.session_store import MitoSessionStore
+from mitosheet.tests.decorators import requires_flask
+from mitosheet.tests.mito_flask.test_session_store import (get_add_column_event, get_simple_import_event,
+                                                           process_event_to_backend_state)
+
+NUM_STEPS = 50
+NUM_EVENTS = 5
+
+
+def get_seconds_per_event(file_name: str, session_store: Optional[MitoSessionStore]) -> float:
+    # Build the analysis with live backends, so that only the timed events replay it
+    build_session_store = session_store if session_store is not None else MitoSessionStore()
+    backend_state = process_event_to_backend_state(None, get_simple_import_event(file_name), build_session_store)
+    for step_index in range(NUM_STEPS):
+        backend_state = process_event_to_backend_state(backend_state, get_add_column_event(f'C{step_index}'), build_session_store)
+
+    start_time = perf_counter()
+    for event_index in range(NUM_EVENTS):
+        backend_state = process_event_to_backend_state(backend_state, get_add_column_event(f'D{event_index}'), session_store)
+    return (perf_counter() - start_time) / NUM_EVENTS
+
+
+@pytest.mark.benchmark
+@requires_flask
+def test_live_backends_are_faster_than_replay(tmp_path: Path) -> None:
+    file_name = str(tmp_path / 'test.csv')
+    pd.DataFrame({'A': list(range(10_000)), 'B': list(range(10_000))}).to_csv(file_name, index=False)
+
+    replay_seconds_per_event = get_seconds_per_event(file_name, None)
+    live_seconds_per_event = get_seconds_per_event(file_name, MitoSessionStore())
+
+    print(f'\nSeconds per event with {NUM_STEPS} steps, replaying: {replay_seconds_per_event:.4f}, live: {live_seconds_per_event:.4f}')
+
+    assert live_seconds_per_event * 2 < replay_seconds_per_event
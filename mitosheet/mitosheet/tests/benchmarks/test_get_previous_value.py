@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Benchmarks GETPREVIOUSVALUE and GETNEXTVALUE against carrying the last 
+value forward one row at a time.
+"""
+from time import perf_counter
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mitosheet.public.v3.sheet_functions.misc_functions import GETNEXTVALUE, GETPREVIOUSVALUE
+
+NUM_ROWS = 200_000
+
+
+def get_previous_value_row_by_row(series: pd.Series, condition: pd.Series, default_value: Any) -> pd.Series:
+    result = []
+    last_occurrence = default_value
+    for index, value in condition.items():
+        if value:
+            last_occurrence = series[index]
+        result.append(last_occurrence)
+    return pd.Series(result, index=series.index)
+
+
+def get_series(dtype: str, num_rows: int) -> pd.Series:
+    if dtype == 'float':
+        return pd.Series(np.random.default_rng(0).random(num_rows))
+    if dtype == 'datetime':
+        return pd.Series(pd.date_range('2000-01-01', periods=num_rows, freq='min'))
+    # Object series are built from a list, so their dtype is inferred like it was row by row
+    return pd.Series(np.random.default_rng(0).choice(['a', 'b', 'c'], num_rows).astype(object))
+
+
+def get_condition(num_rows: int) -> pd.Series:
+    return pd.Series(np.random.default_rng(1).random(num_rows) > 0.9)
+
+
+@pytest.mark.parametrize("dtype, default_value", [
+    ('float', -1),
+    ('datetime', pd.NaT),
+    ('object', ''),
+])
+def test_get_previous_value_matches_row_by_row(dtype, default_value):
+    series = get_series(dtype, 1_000)
+    condition = get_condition(1_000)
+
+    pd.testing.assert_series_equal(GETPREVIOUSVALUE(series, condition), get_previous_value_row_by_row(series, condition, default_value))
+    pd.testing.assert_series_equal(GETNEXTVALUE(series, condition), get_previous_value_row_by_row(series[::-1], condition[::-1], default_value)[::-1])
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("dtype, default_value, min_speedup", [
+    ('float', -1, 10),
+    ('datetime', pd.NaT, 10),
+    ('object', '', 2),
+])
+def test_get_previous_value_is_faster_than_row_by_row(dtype, default_value, min_speedup):
+    series = get_series(dtype, NUM_ROWS)
+    condition = get_condition(NUM_ROWS)
+
+    start_time = perf_counter()
+    row_by_row_result = get_previous_value_row_by_row(series, condition, default_value)
+    row_by_row_seconds = perf_counter() - start_time
+
+    start_time = perf_counter()
+    result = GETPREVIOUSVALUE(series, condition)
+    seconds = perf_counter() - start_time
+
+    start_time = perf_counter()
+    next_result = GETNEXTVALUE(series, condition)
+    next_seconds = perf_counter() - start_time
+
+    print(f'\nGETPREVIOUSVALUE on {series.dtype}: {row_by_row_seconds:.3f}s row by row, {seconds:.3f}s all at once. GETNEXTVALUE: {next_seconds:.3f}s')
+
+    pd.testing.assert_series_equal(result, row_by_row_result)
+    pd.testing.assert_series_equal(next_result, get_previous_value_row_by_row(series[::-1], condition[::-1], default_value)[::-1])
+    assert seconds * min_speedup < row_by_row_seconds
+    assert next_seconds * min_speedup < row_by_row_seconds
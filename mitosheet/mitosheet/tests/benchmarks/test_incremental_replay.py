@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Benchmarks replaying an analysis over many sheets after a step on
+one sheet changes, with and without incremental replay.
+"""
+from time import perf_counter
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mitosheet.mito_backend import get_mito_backend
+from mitosheet.step import Step
+from mitosheet.steps_manager import execute_step_list_from_index
+from mitosheet.utils import get_new_id
+
+NUM_SHEETS = 10
+NUM_ROWS = 5_000
+NUM_FORMULAS_PER_SHEET = 3
+
+
+def get_filter_params(value: int) -> Dict[str, Any]:
+    return {
+        'sheet_index': 0,
+        'column_id': 'A',
+        'operator': 'And',
+        'filters': [{'condition': 'greater', 'value': value}],
+        'public_interface_version': 3
+    }
+
+
+def get_steps_data() -> List[Dict[str, Any]]:
+    """
+    Returns the steps data for an analysis that filters the first sheet, and then
+    adds formulas to and pivots all the other sheets.
+    """
+    steps_data: List[Dict[str, Any]] = [{'step_type': 'filter_column', 'params': get_filter_params(10)}]
+    for sheet_index in range(1, NUM_SHEETS):
+        for formula_index in range(NUM_FORMULAS_PER_SHEET):
+            column_header = f'D{formula_index}'
+            steps_data.append({
+                'step_type': 'add_column',
+                'params': {
+                    'sheet_index': sheet_index,
+                    'column_header': column_header,
+                    'column_header_index': -1,
+                    'public_interface_version': 3
+                }
+            })
+            steps_data.append({
+                'step_type': 'set_column_formula',
+                'params': {
+                    'sheet_index': sheet_index,
+                    'column_id': column_header,
+                    'formula_label': 0,
+                    'index_labels_formula_is_applied_to': {'type': 'entire_column'},
+                    'new_formula': f'=IF(A > B, CONCAT(C, "-", A), C) + "{formula_index}"',
+                    'public_interface_version': 3
+                }
+            })
+        steps_data.append({
+            'step_type': 'pivot',
+            'params': {
+                'sheet_index': sheet_index,
+                'pivot_rows_column_ids_with_transforms': [{'column_id': 'C', 'transformation': 'no-op'}],
+                'pivot_columns_column_ids_with_transforms': [],
+                'values_column_ids_map': {'A': ['sum'], 'B': ['mean']},
+                'pivot_filters': [],
+                'flatten_column_headers': True,
+                'public_interface_version': 3
+            }
+        })
+    return steps_data
+
+
+@pytest.mark.benchmark
+def test_incremental_replay_is_faster_than_full_replay():
+    dfs = [
+        pd.DataFrame({
+            'A': np.arange(NUM_ROWS),
+            'B': np.arange(NUM_ROWS)[::-1],
+            'C': [f'key{i % 100}' for i in range(NUM_ROWS)]
+        })
+        for _ in range(NUM_SHEETS)
+    ]
+    mito_backend = get_mito_backend(*dfs)
+    mito_backend.steps_manager.execute_steps_data(get_steps_data())
+    steps = mito_backend.steps_manager.steps_including_skipped
+
+    # Replacing the filter on the first sheet skips the old filter, and so replays every step
+    new_steps = steps + [Step('filter_column', get_new_id(), get_filter_params(20))]
+
+    start_time = perf_counter()
+    full_steps = execute_step_list_from_index(new_steps, start_index=0, incremental=False)
+    full_replay_time = perf_counter() - start_time
+
+    start_time = perf_counter()
+    incremental_steps = execute_step_list_from_index(new_steps, start_index=0)
+    incremental_replay_time = perf_counter() - start_time
+
+    print(f'\nFull replay of {len(new_steps)} steps: {full_replay_time:.3f}s')
+    print(f'Incremental replay of {len(new_steps)} steps: {incremental_replay_time:.3f}s')
+
+    assert len(incremental_steps[-1].dfs) == 2 * NUM_SHEETS - 1
+    for incremental_df, full_df in zip(incremental_steps[-1].dfs, full_steps[-1].dfs):
+        assert incremental_df.equals(full_df)
+
+    # Only the filter on the first sheet should actually be executed again
+    assert incremental_replay_time < full_replay_time / 2
@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Benchmarks parsing formulas on sheets with few and with many columns, as 
+happens when the user types a formula.
+"""
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mitosheet.parser import parse_formula
+
+NUM_FORMULAS = 50
+
+
+def get_seconds_per_parse(num_columns: int) -> float:
+    df = pd.DataFrame(np.zeros((10, num_columns)), columns=[f'column_{i}' for i in range(num_columns)])
+    dfs = [df, df.copy()]
+
+    start_time = perf_counter()
+    for formula_index in range(NUM_FORMULAS):
+        # Each formula is different, so none of the parse results are reused
+        formula = f'=IF(column_12 > column_{num_columns - 1}, column_5 + {formula_index}, VLOOKUP(column_1, df2!column_1:column_3, 2))'
+        parse_formula(formula, 'column_0', 0, {'type': 'entire_column'}, dfs, ['df1', 'df2'], 0)
+    return (perf_counter() - start_time) / NUM_FORMULAS
+
+
+@pytest.mark.benchmark
+def test_parsing_formula_on_many_columns_is_fast():
+    few_columns_seconds_per_parse = get_seconds_per_parse(30)
+    many_columns_seconds_per_parse = get_seconds_per_parse(3_000)
+
+    print(f'\nSeconds per parse with 30 columns: {few_columns_seconds_per_parse:.5f}')
+    print(f'Seconds per parse with 3000 columns: {many_columns_seconds_per_parse:.5f}')
+
+    # Previously, each column header was searched for separately, taking ~0.15s per parse with 3,000 columns
+    assert many_columns_seconds_per_parse < 0.02
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Benchmarks computing the aggregation of every window of a rolling range at
+once against calling the aggregation function on each window.
+"""
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mitosheet.public.v3.rolling_range import RollingRange
+
+NUM_ROWS = 5_000
+
+AGGREGATIONS_AND_FUNCS = [
+    ('sum', lambda df: df.sum().sum()),
+    ('count', lambda df: df.count().sum()),
+    ('max', lambda df: df.max().max()),
+    ('std', lambda df: df.stack().std()),
+]
+
+
+def get_rolling_range(num_rows: int) -> RollingRange:
+    rng = np.random.default_rng(0)
+    numbers = rng.random(num_rows)
+    # A10 = SUM(B0:B19), with some missing values
+    return RollingRange(pd.DataFrame({'B': np.where(numbers > 0.1, numbers, np.nan)}), 20, -10)
+
+
+@pytest.mark.parametrize("aggregation, func", AGGREGATIONS_AND_FUNCS)
+def test_aggregating_all_windows_matches_applying_to_each_window(aggregation, func):
+    rolling_range = get_rolling_range(100)
+
+    pd.testing.assert_series_equal(rolling_range.aggregate(aggregation, func), rolling_range.apply(func))
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("aggregation, func", AGGREGATIONS_AND_FUNCS)
+def test_aggregating_all_windows_is_faster_than_applying_to_each_window(aggregation, func):
+    rolling_range = get_rolling_range(NUM_ROWS)
+
+    start_time = perf_counter()
+    applied_series = rolling_range.apply(func)
+    apply_seconds = perf_counter() - start_time
+
+    start_time = perf_counter()
+    aggregated_series = rolling_range.aggregate(aggregation, func)
+    aggregate_seconds = perf_counter() - start_time
+
+    print(f'\n{aggregation} of {NUM_ROWS} windows by applying to each window: {apply_seconds:.3f}s, all at once: {aggregate_seconds:.3f}s')
+
+    pd.testing.assert_series_equal(aggregated_series, applied_series)
+    assert aggregate_seconds * 50 < apply_seconds
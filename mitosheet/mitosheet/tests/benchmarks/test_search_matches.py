@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Benchmarks searching a large sheet with the cached column search views against
+counting the values of every cell and searching each shown cell with a regex.
+"""
+import re
+from time import perf_counter
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mitosheet.api.get_search_matches import get_search_matches
+from mitosheet.steps_manager import StepsManager
+from mitosheet.tests.test_utils import create_mito_wrapper
+
+NUM_ROWS = 1_000_000
+NUM_COLUMNS = 20
+
+
+def search_each_cell(df: pd.DataFrame, search_value: str) -> Dict[str, Any]:
+    search_regex = re.compile(re.escape(search_value), re.IGNORECASE)
+    total_number_matches = int(df.stack().value_counts().filter(regex=search_regex, axis=0).sum())
+    column_matches = [{'rowIndex': -1, 'colIndex': j} for j, column in enumerate(df.columns) if re.search(search_regex, str(column)) is not None]
+    cell_matches = [{'rowIndex': i, 'colIndex': j} for i in range(min(1500, len(df.index))) for j in range(len(df.columns)) if re.search(search_regex, str(df.iat[i, j])) is not None]
+    return {'total_number_matches': total_number_matches + len(column_matches), 'matches': column_matches + cell_matches}
+
+
+def get_steps_manager(num_rows: int) -> StepsManager:
+    rng = np.random.default_rng(0)
+    columns: Dict[str, Any] = {}
+    for i in range(NUM_COLUMNS):
+        if i % 2 == 0:
+            columns[f'strings_{i}'] = rng.choice(['apple pie', 'Banana', 'cherry', 'John Smith', 'Jane Doe'], num_rows)
+        else:
+            columns[f'ints_{i}'] = rng.integers(0, 10_000, num_rows)
+    return create_mito_wrapper(pd.DataFrame(columns)).mito_backend.steps_manager
+
+
+def test_searching_matches_searching_each_cell():
+    # More rows than the matches are returned for
+    steps_manager = get_steps_manager(2_000)
+
+    for search_value in ['j', 'jo', 'john ', 'smith', '1', '12']:
+        matches = get_search_matches({'sheet_index': 0, 'search_value': search_value}, steps_manager)
+        assert matches == search_each_cell(steps_manager.dfs[0], search_value)
+
+
+@pytest.mark.benchmark
+def test_searching_is_faster_than_searching_each_cell():
+    steps_manager = get_steps_manager(NUM_ROWS)
+
+    # Type the search value one keystroke at a time
+    search_values = ['j', 'jo', 'joh', 'john', 'john ']
+
+    start_time = perf_counter()
+    expected_matches = [search_each_cell(steps_manager.dfs[0], search_value) for search_value in search_values]
+    search_each_cell_seconds = perf_counter() - start_time
+
+    start_time = perf_counter()
+    first_matches = get_search_matches({'sheet_index': 0, 'search_value': search_values[0]}, steps_manager)
+    first_search_seconds = perf_counter() - start_time
+
+    start_time = perf_counter()
+    matches = [get_search_matches({'sheet_index': 0, 'search_value': search_value}, steps_manager) for search_value in search_values[1:]]
+    search_seconds = perf_counter() - start_time
+
+    print(f'\nSearching {NUM_ROWS} x {NUM_COLUMNS} cells {len(search_values)} times by searching each cell: {search_each_cell_seconds:.3f}s, with cached search views: {first_search_seconds:.3f}s and then {search_seconds:.3f}s')
+
+    assert [first_matches] + matches == expected_matches
+    assert (first_search_seconds + search_seconds) * 5 < search_each_cell_seconds
+    assert search_seconds * 100 < search_each_cell_seconds
@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Benchmarks writing the sheet data for a 1,500 x 1,500 dataframe, with the
+JSON encoding and with the columnar encoding.
+"""
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mitosheet.mito_backend import get_mito_backend
+from mitosheet.steps_manager import StepsManager
+from mitosheet.utils import (MAX_COLUMNS, MAX_ROWS, SHEET_DATA_ENCODING_COLUMNAR,
+                             SHEET_DATA_ENCODING_JSON)
+
+
+def get_seconds_to_write_sheet_data(steps_manager: StepsManager, encoding: str) -> float:
+    steps_manager.sheet_data_encoding = encoding
+    start_time = perf_counter()
+    steps_manager.sheet_data_json
+    return perf_counter() - start_time
+
+
+@pytest.mark.benchmark
+def test_columnar_sheet_data_is_faster_than_json():
+    df = pd.DataFrame(
+        np.random.default_rng(0).random((MAX_ROWS, MAX_COLUMNS)), 
+        columns=[f'C{column_index}' for column_index in range(MAX_COLUMNS)]
+    )
+    steps_manager = get_mito_backend(df).steps_manager
+
+    json_seconds = get_seconds_to_write_sheet_data(steps_manager, SHEET_DATA_ENCODING_JSON)
+    columnar_seconds = get_seconds_to_write_sheet_data(steps_manager, SHEET_DATA_ENCODING_COLUMNAR)
+
+    print(f'\nJSON sheet data for {MAX_ROWS} x {MAX_COLUMNS}: {json_seconds:.3f}s')
+    print(f'Columnar sheet data for {MAX_ROWS} x {MAX_COLUMNS}: {columnar_seconds:.3f}s')
+
+    assert columnar_seconds < json_seconds / 2
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Benchmarks the overhead that the casting and error handling decorators add 
+to each call of a sheet function, for scalar and series inputs.
+"""
+import inspect
+from time import perf_counter
+from typing import Any, Callable, Tuple
+
+import pandas as pd
+import pytest
+
+from mitosheet.public.v3.sheet_functions import FUNCTIONS
+
+NUM_CALLS = 2_000
+
+
+def get_seconds_per_call(sheet_function: Callable, args: Tuple[Any, ...]) -> float:
+    start_time = perf_counter()
+    for _ in range(NUM_CALLS):
+        sheet_function(*args)
+    return (perf_counter() - start_time) / NUM_CALLS
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("function_name, args", [
+    ('LOG', (100.0, 10)),
+    ('POWER', (2.0, 3)),
+    ('ROUND', (1.234, 2)),
+    ('LOG', (pd.Series([100.0, 1000.0]), 10)),
+    ('POWER', (pd.Series([2.0, 3.0]), 3)),
+    ('ROUND', (pd.Series([1.234, 2.345]), 2)),
+    ('CORR', (pd.Series([1.0, 2.0, 3.0]), pd.Series([1.0, 3.0, 2.0]))),
+])
+def test_sheet_function_call_overhead(function_name, args):
+    sheet_function = FUNCTIONS[function_name]
+
+    decorated_seconds = get_seconds_per_call(sheet_function, args)
+    undecorated_seconds = get_seconds_per_call(inspect.unwrap(sheet_function), args)
+    overhead_seconds = decorated_seconds - undecorated_seconds
+
+    # The decorators used to inspect the signature of the sheet function once per decorator on each call
+    num_decorators = len(sheet_function.fused_sheet_function[1]) + 1
+    signature_seconds = get_seconds_per_call(lambda: inspect.signature(sheet_function), ()) * num_decorators
+
+    print(f'\n{function_name} on {type(args[0]).__name__}: {overhead_seconds * 1e6:.1f}us overhead per call, inspecting signatures takes {signature_seconds * 1e6:.1f}us')
+
+    if not isinstance(args[0], pd.Series):
+        assert overhead_seconds < signature_seconds
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Benchmarks every v3 sheet function on large columns, and benchmarks casting
+the arguments of sheet functions all at once against casting each element.
+"""
+from time import perf_counter
+from typing import Any, Callable, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mitosheet.public.v3.sheet_functions import FUNCTIONS
+from mitosheet.public.v3.types.utils import ELEMENT_CONVERSION_FUNCTIONS, get_arg_cast_to_type
+
+NUM_ROWS = 1_000_000
+
+
+def get_columns(num_rows: int) -> Dict[str, Any]:
+    rng = np.random.default_rng(0)
+    numbers = pd.Series(rng.random(num_rows) * 10_000)
+    datetimes = pd.Series(pd.date_range('2000-01-01', periods=num_rows, freq='min'))
+    return {
+        'numbers': numbers,
+        'other_numbers': pd.Series(rng.random(num_rows) * 10_000),
+        'numbers_with_nan': numbers.where(numbers > 5_000),
+        'ints': pd.Series(rng.integers(0, 100, num_rows)),
+        'currency_strings': pd.Series([f'${number:,.2f}' for number in numbers]),
+        'strings': pd.Series(rng.choice(['apple pie', ' Banana ', 'cherry\x01', 'John Smith'], num_rows)),
+        'bools': numbers > 5_000,
+        'datetimes': datetimes,
+        'datetime_strings': datetimes.dt.strftime('%Y-%m-%d %H:%M:%S'),
+        'lookup_table': pd.DataFrame({'key': np.arange(100), 'value': np.arange(100) * 2}),
+    }
+
+
+# The arguments to call each sheet function with, given the columns above
+FUNCTION_ARGS: Dict[str, Callable[[Dict[str, Any]], Tuple[Any, ...]]] = {
+    'ABS': lambda c: (c['numbers'],),
+    'AND': lambda c: (c['bools'], ~c['bools']),
+    'AVG': lambda c: (c['numbers'], c['other_numbers']),
+    'BOOL': lambda c: (c['ints'],),
+    'CLEAN': lambda c: (c['strings'],),
+    'CONCAT': lambda c: (c['strings'], c['numbers']),
+    'CORR': lambda c: (c['numbers'], c['other_numbers']),
+    'DATEVALUE': lambda c: (c['datetime_strings'],),
+    'DAY': lambda c: (c['datetimes'],),
+    'ENDOFBUSINESSMONTH': lambda c: (c['datetimes'],),
+    'ENDOFMONTH': lambda c: (c['datetimes'],),
+    'EXP': lambda c: (c['numbers'] / 10_000,),
+    'FILLNAN': lambda c: (c['numbers_with_nan'], 0),
+    'FIND': lambda c: (c['strings'], 'an'),
+    'FLOAT': lambda c: (c['currency_strings'],),
+    'GETNEXTVALUE': lambda c: (c['numbers'], c['bools']),
+    'GETPREVIOUSVALUE': lambda c: (c['numbers'], c['bools']),
+    'HOUR': lambda c: (c['datetimes'],),
+    'IF': lambda c: (c['bools'], c['numbers'], c['other_numbers']),
+    'IFS': lambda c: (c['bools'], c['numbers'], ~c['bools'], c['other_numbers']),
+    'INT': lambda c: (c['numbers'],),
+    'KURT': lambda c: (c['numbers'],),
+    'LEFT': lambda c: (c['strings'], 2),
+    'LEN': lambda c: (c['strings'],),
+    'LOG': lambda c: (c['numbers'],),
+    'LOWER': lambda c: (c['strings'],),
+    'MAX': lambda c: (c['numbers'], c['other_numbers']),
+    'MID': lambda c: (c['strings'], 2, 3),
+    'MIN': lambda c: (c['numbers'], c['other_numbers']),
+    'MINUTE': lambda c: (c['datetimes'],),
+    'MONTH': lambda c: (c['datetimes'],),
+    'MONTHNAME': lambda c: (c['datetimes'],),
+    'MULTIPLY': lambda c: (c['numbers'], c['other_numbers']),
+    'OR': lambda c: (c['bools'], ~c['bools']),
+    'POWER': lambda c: (c['numbers'], 2),
+    'PROPER': lambda c: (c['strings'],),
+    'QUARTER': lambda c: (c['datetimes'],),
+    'RIGHT': lambda c: (c['strings'], 2),
+    'ROUND': lambda c: (c['numbers'], 2),
+    'SECOND': lambda c: (c['datetimes'],),
+    'SKEW': lambda c: (c['numbers'],),
+    'STARTOFBUSINESSMONTH': lambda c: (c['datetimes'],),
+    'STARTOFMONTH': lambda c: (c['datetimes'],),
+    'STDEV': lambda c: (c['numbers'],),
+    'STRIPTIMETODAYS': lambda c: (c['datetimes'],),
+    'STRIPTIMETOHOURS': lambda c: (c['datetimes'],),
+    'STRIPTIMETOMINUTES': lambda c: (c['datetimes'],),
+    'STRIPTIMETOMONTHS': lambda c: (c['datetimes'],),
+    'STRIPTIMETOYEARS': lambda c: (c['datetimes'],),
+    'SUBSTITUTE': lambda c: (c['strings'], 'a', 'o'),
+    'SUM': lambda c: (c['numbers'], c['other_numbers']),
+    'SUMPRODUCT': lambda c: (c['numbers'], c['other_numbers']),
+    'TEXT': lambda c: (c['numbers'],),
+    'TODAY': lambda c: (),
+    'TRIM': lambda c: (c['strings'],),
+    'TYPE': lambda c: (c['numbers'],),
+    'UPPER': lambda c: (c['strings'],),
+    'VALUE': lambda c: (c['currency_strings'],),
+    'VAR': lambda c: (c['numbers'],),
+    'VLOOKUP': lambda c: (c['ints'], c['lookup_table'], 2),
+    'WEEK': lambda c: (c['datetimes'],),
+    'WEEKDAY': lambda c: (c['datetimes'],),
+    'YEAR': lambda c: (c['datetimes'],),
+}
+
+
+@pytest.fixture(scope='module')
+def columns() -> Dict[str, Any]:
+    return get_columns(NUM_ROWS)
+
+
+def test_every_sheet_function_is_benchmarked():
+    assert set(FUNCTION_ARGS.keys()) == set(FUNCTIONS.keys())
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("function_name", sorted(FUNCTION_ARGS.keys()))
+def test_sheet_function_runtime(columns, function_name):
+    args = FUNCTION_ARGS[function_name](columns)
+
+    start_time = perf_counter()
+    result = FUNCTIONS[function_name](*args)
+    seconds = perf_counter() - start_time
+
+    print(f'\n{function_name} on {NUM_ROWS} rows: {seconds:.3f}s')
+
+    if isinstance(result, pd.Series):
+        assert len(result) == NUM_ROWS
+
+
+@pytest.mark.parametrize("target_primitive_type_name, column_name", [
+    ('number', 'numbers'),
+    ('number', 'ints'),
+    ('number', 'currency_strings'),
+    ('float', 'bools'),
+    ('int', 'numbers'),
+    ('bool', 'numbers'),
+    ('str', 'numbers'),
+    ('str', 'strings'),
+])
+def test_casting_series_matches_casting_each_element(target_primitive_type_name, column_name):
+    series = get_columns(1_000)[column_name]
+
+    cast_series = get_arg_cast_to_type(target_primitive_type_name, series)
+
+    pd.testing.assert_series_equal(cast_series, series.apply(ELEMENT_CONVERSION_FUNCTIONS[target_primitive_type_name]))
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("target_primitive_type_name, column_name, min_speedup", [
+    ('number', 'numbers', 10),
+    ('number', 'ints', 10),
+    ('number', 'currency_strings', 2),
+    ('float', 'bools', 10),
+    ('int', 'numbers', 10),
+    ('bool', 'numbers', 10),
+    ('str', 'numbers', 1),
+    ('str', 'strings', 1),
+])
+def test_casting_series_is_faster_than_casting_each_element(columns, target_primitive_type_name, column_name, min_speedup):
+    series = columns[column_name]
+
+    start_time = perf_counter()
+    element_cast_series = series.apply(ELEMENT_CONVERSION_FUNCTIONS[target_primitive_type_name])
+    element_cast_seconds = perf_counter() - start_time
+
+    start_time = perf_counter()
+    cast_series = get_arg_cast_to_type(target_primitive_type_name, series)
+    series_cast_seconds = perf_counter() - start_time
+
+    print(f'\nCasting {column_name} to {target_primitive_type_name} element-wise: {element_cast_seconds:.3f}s, all at once: {series_cast_seconds:.3f}s')
+
+    pd.testing.assert_series_equal(cast_series, element_cast_series)
+    assert series_cast_seconds * min_speedup < element_cast_seconds
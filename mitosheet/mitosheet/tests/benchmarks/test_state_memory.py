@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Benchmarks the memory that the steps manager retains for each step
+in an analysis, by replaying a long analysis over many sheets.
+"""
+import gc
+import tracemalloc
+from typing import Any, Dict, List
+
+import pandas as pd
+import pytest
+
+from mitosheet.mito_backend import get_mito_backend
+
+NUM_STEPS = 500
+NUM_EDITED_SHEETS = 4
+
+
+def get_steps_data(num_steps: int) -> List[Dict[str, Any]]:
+    """
+    Returns the steps data for an analysis that alternates between adding a column
+    and setting a formula on it, spread over the first few sheets.
+    """
+    steps_data = []
+    for step_index in range(num_steps):
+        sheet_index = (step_index // 2) % NUM_EDITED_SHEETS
+        column_header = f'C{step_index // 2}'
+        if step_index % 2 == 0:
+            steps_data.append({
+                'step_type': 'add_column',
+                'params': {
+                    'sheet_index': sheet_index,
+                    'column_header': column_header,
+                    'column_header_index': -1,
+                    'public_interface_version': 3
+                }
+            })
+        else:
+            steps_data.append({
+                'step_type': 'set_column_formula',
+                'params': {
+                    'sheet_index': sheet_index,
+                    'column_id': column_header,
+                    'formula_label': 0,
+                    'index_labels_formula_is_applied_to': {'type': 'entire_column'},
+                    'new_formula': '=A + 1',
+                    'public_interface_version': 3
+                }
+            })
+    return steps_data
+
+
+def get_bytes_retained_per_step(num_sheets: int, num_steps: int=NUM_STEPS) -> float:
+    dfs = [
+        pd.DataFrame({'A': [1, 2, 3], 'B': ['a', 'b', 'c'], 'C': [1.0, 2.0, 3.0]}) 
+        for _ in range(num_sheets)
+    ]
+    mito_backend = get_mito_backend(*dfs)
+    steps_data = get_steps_data(num_steps)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        bytes_before, _ = tracemalloc.get_traced_memory()
+        mito_backend.steps_manager.execute_steps_data(steps_data)
+        gc.collect()
+        bytes_after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert len(mito_backend.steps_manager.steps_including_skipped) == num_steps + 1
+    return (bytes_after - bytes_before) / num_steps
+
+
+@pytest.mark.benchmark
+def test_bytes_retained_per_step_do_not_grow_with_untouched_sheets():
+    few_sheets_bytes_per_step = get_bytes_retained_per_step(NUM_EDITED_SHEETS)
+    many_sheets_bytes_per_step = get_bytes_retained_per_step(10 * NUM_EDITED_SHEETS)
+
+    print(f'\nBytes retained per step with {NUM_EDITED_SHEETS} sheets: {few_sheets_bytes_per_step:,.0f}')
+    print(f'Bytes retained per step with {10 * NUM_EDITED_SHEETS} sheets: {many_sheets_bytes_per_step:,.0f}')
+
+    # Sheets that a step does not modify are shared with the previous step, so adding
+    # many untouched sheets should only add the cost of a few references per step
+    assert many_sheets_bytes_per_step < 1.5 * few_sheets_bytes_per_step
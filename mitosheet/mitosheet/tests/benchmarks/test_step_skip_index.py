@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Benchmarks the overhead of keeping track of the skipped steps for
+each edit, as the number of steps in the analysis grows.
+"""
+import gc
+from time import perf_counter
+from typing import Any, Dict, List
+
+import pandas as pd
+import pytest
+
+from mitosheet.mito_backend import get_mito_backend
+from mitosheet.step import Step
+from mitosheet.steps_manager import StepsManager
+from mitosheet.utils import get_new_id
+
+NUM_SHEETS = 4
+NUM_COLUMNS = 10
+NUM_EDITS = 50
+
+
+def get_steps_data(num_steps: int) -> List[Dict[str, Any]]:
+    """
+    Returns the steps data for an analysis that sets formulas on a fixed set of 
+    columns, so that the size of the data does not change with the number of steps.
+    """
+    return [
+        {
+            'step_type': 'set_column_formula',
+            'params': {
+                'sheet_index': step_index % NUM_SHEETS,
+                'column_id': f'C{(step_index // NUM_SHEETS) % NUM_COLUMNS}',
+                'formula_label': 0,
+                'index_labels_formula_is_applied_to': {'type': 'entire_column'},
+                'new_formula': f'=A + {step_index}',
+                'public_interface_version': 3
+            }
+        }
+        for step_index in range(num_steps)
+    ]
+
+
+def get_seconds_per_edit(num_steps: int) -> float:
+    dfs = [
+        pd.DataFrame({'A': [1, 2, 3], **{f'C{column_index}': [0, 0, 0] for column_index in range(NUM_COLUMNS)}}) 
+        for _ in range(NUM_SHEETS)
+    ]
+    mito_backend = get_mito_backend(*dfs)
+    steps_manager = mito_backend.steps_manager
+    steps_manager.execute_steps_data(get_steps_data(num_steps))
+
+    # Collect garbage before timing, and not during it, so objects left over
+    # from earlier tests do not make one of the runs slower than the other
+    gc.collect()
+    gc.disable()
+    try:
+        return time_edits(steps_manager)
+    finally:
+        gc.enable()
+
+
+def time_edits(steps_manager: StepsManager) -> float:
+    start_time = perf_counter()
+    for _ in range(NUM_EDITS):
+        # Setting a formula on the last column skips the last step, so this both
+        # looks up the skipped steps and replays the analysis from the step before
+        new_step = Step('set_column_formula', get_new_id(), {
+            'sheet_index': steps_manager.steps_including_skipped[-1].params['sheet_index'],
+            'column_id': steps_manager.steps_including_skipped[-1].params['column_id'],
+            'formula_label': 0,
+            'index_labels_formula_is_applied_to': {'type': 'entire_column'},
+            'new_formula': '=A + 2',
+            'public_interface_version': 3
+        })
+        steps_manager.execute_and_update_steps(steps_manager.steps_including_skipped + [new_step])
+        steps_manager.get_step_indexes_to_skip()
+        steps_manager.execute_undo()
+
+    return (perf_counter() - start_time) / NUM_EDITS
+
+
+@pytest.mark.benchmark
+def test_skipped_step_overhead_per_edit_stays_flat():
+    few_steps_seconds_per_edit = get_seconds_per_edit(100)
+    many_steps_seconds_per_edit = get_seconds_per_edit(1000)
+
+    print(f'\nSeconds per edit with 100 steps: {few_steps_seconds_per_edit:.4f}')
+    print(f'Seconds per edit with 1000 steps: {many_steps_seconds_per_edit:.4f}')
+
+    # Finding the skipped steps should not compare every step to every step before it
+    assert many_steps_seconds_per_edit < 3 * few_steps_seconds_per_edit
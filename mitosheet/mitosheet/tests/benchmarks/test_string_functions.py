@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Benchmarks the string functions with scalar arguments against calling them
+with those arguments as series, which goes row by row.
+"""
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mitosheet.public.v3.sheet_functions.string_functions import (
+    CLEAN, FIND, LEFT, MID, RIGHT, SUBSTITUTE)
+
+NUM_ROWS = 1_000_000
+
+STRING_FUNCTION_ARGS = [
+    (FIND, ['an']),
+    (LEFT, [2]),
+    (MID, [2, 3]),
+    (RIGHT, [2]),
+    (SUBSTITUTE, ['a', 'o', 1]),
+]
+
+
+def get_strings(num_rows: int) -> pd.Series:
+    rng = np.random.default_rng(0)
+    return pd.Series(rng.choice(['apple pie', ' Banana ', 'cherry\x01', 'John Smith'], num_rows))
+
+
+def clean_each_character(strings: pd.Series) -> pd.Series:
+    return strings.apply(lambda x: ''.join([i if 32 <= ord(i) < 126 else '' for i in x]))
+
+
+@pytest.fixture(scope='module')
+def strings() -> pd.Series:
+    return get_strings(NUM_ROWS)
+
+
+@pytest.mark.parametrize("func, args", STRING_FUNCTION_ARGS)
+def test_scalar_args_match_series_args(func, args):
+    some_strings = get_strings(100)
+    series_args = [pd.Series(arg, index=some_strings.index) for arg in args]
+
+    pd.testing.assert_series_equal(func(some_strings, *args), func(some_strings, *series_args))
+
+
+def test_clean_matches_checking_each_character():
+    some_strings = get_strings(100)
+
+    pd.testing.assert_series_equal(CLEAN(some_strings), clean_each_character(some_strings))
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("func, args", STRING_FUNCTION_ARGS)
+def test_scalar_args_are_faster_than_series_args(strings, func, args):
+    series_args = [pd.Series(arg, index=strings.index) for arg in args]
+
+    start_time = perf_counter()
+    series_args_result = func(strings, *series_args)
+    series_args_seconds = perf_counter() - start_time
+
+    start_time = perf_counter()
+    scalar_args_result = func(strings, *args)
+    scalar_args_seconds = perf_counter() - start_time
+
+    print(f'\n{func.__name__} on {NUM_ROWS} rows with series args: {series_args_seconds:.3f}s, with scalar args: {scalar_args_seconds:.3f}s')
+
+    pd.testing.assert_series_equal(scalar_args_result, series_args_result)
+    assert scalar_args_seconds * 1.5 < series_args_seconds
+
+
+@pytest.mark.benchmark
+def test_clean_is_faster_than_checking_each_character(strings):
+    start_time = perf_counter()
+    character_result = clean_each_character(strings)
+    character_seconds = perf_counter() - start_time
+
+    start_time = perf_counter()
+    result = CLEAN(strings)
+    clean_seconds = perf_counter() - start_time
+
+    print(f'\nCLEAN on {NUM_ROWS} rows checking each character: {character_seconds:.3f}s, with CLEAN: {clean_seconds:.3f}s')
+
+    pd.testing.assert_series_equal(result, character_result)
+    assert clean_seconds * 2 < character_seconds
+
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Benchmarks the number of times the user.json file is read for each edit
+event, which was once for every user field that the edit event got.
+"""
+import builtins
+import os
+from time import perf_counter
+
+import pandas as pd
+
+import mitosheet.user.db as db
+from mitosheet.tests.test_utils import create_mito_wrapper
+from mitosheet.user.db import USER_JSON_PATH
+
+NUM_EDIT_EVENTS = 20
+
+
+def test_edit_events_do_not_read_user_json(monkeypatch):
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3]}))
+    mito.add_column(0, 'B')
+
+    user_json_reads = []
+    user_field_gets = []
+    original_open = builtins.open
+    original_read_user_json_object = db._read_user_json_object
+
+    def open(file, *args, **kwargs):
+        if isinstance(file, (str, os.PathLike)) and os.fspath(file) == USER_JSON_PATH:
+            user_json_reads.append(file)
+        return original_open(file, *args, **kwargs)
+
+    def read_user_json_object():
+        user_field_gets.append(None)
+        return original_read_user_json_object()
+
+    monkeypatch.setattr(builtins, 'open', open)
+    monkeypatch.setattr(db, '_read_user_json_object', read_user_json_object)
+
+    start_time = perf_counter()
+    for i in range(NUM_EDIT_EVENTS):
+        mito.add_column(0, f'C{i}')
+    edit_seconds = perf_counter() - start_time
+
+    print(f'\n{NUM_EDIT_EVENTS} edit events got user fields {len(user_field_gets)} times, which read user.json {len(user_json_reads)} times, in {edit_seconds:.3f}s')
+
+    # Before the user.json was cached, each get of a user field read the file
+    assert len(user_field_gets) >= NUM_EDIT_EVENTS
+    assert len(user_json_reads) == 0
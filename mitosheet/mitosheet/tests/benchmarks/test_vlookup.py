@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Benchmarks VLOOKUP with many lookup values against a large range, both when 
+building the lookup index for the range and when reusing the cached one.
+"""
+from time import perf_counter
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mitosheet.public.v3.sheet_functions.misc_functions import VLOOKUP
+
+NUM_LOOKUPS = 5_000_000
+NUM_RANGE_ROWS = 1_000_000
+
+
+def get_lookup_values_and_where(key_type: str, num_lookups: int, num_range_rows: int) -> Tuple[pd.Series, pd.DataFrame]:
+    rng = np.random.default_rng(0)
+    keys = rng.permutation(num_range_rows)
+    lookup_keys = rng.integers(0, int(num_range_rows * 1.1), num_lookups)
+    if key_type == 'str':
+        keys = np.array([f'Key{key}' for key in keys], dtype=object)
+        lookup_keys = np.array([f'KEY{key}' for key in lookup_keys], dtype=object)
+    return pd.Series(lookup_keys), pd.DataFrame({'key': keys, 'value': np.arange(num_range_rows)})
+
+
+def get_expected_result(key_type: str, lookup_value: pd.Series, where: pd.DataFrame) -> pd.Series:
+    return pd.merge(
+        pd.DataFrame({'key': lookup_value.str.lower() if key_type == 'str' else lookup_value}),
+        where.assign(key=where['key'].str.lower() if key_type == 'str' else where['key']),
+        on='key', 
+        how='left'
+    )['value']
+
+
+@pytest.mark.parametrize("key_type", ['int', 'str'])
+def test_vlookup_with_cached_lookup_index_matches_merge(key_type):
+    lookup_value, where = get_lookup_values_and_where(key_type, 5_000, 1_000)
+
+    result = VLOOKUP(lookup_value, where, 2)
+    cached_result = VLOOKUP(lookup_value, where, 2)
+
+    pd.testing.assert_series_equal(result, get_expected_result(key_type, lookup_value, where), check_names=False)
+    pd.testing.assert_series_equal(cached_result, result)
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("key_type", ['int', 'str'])
+def test_vlookup_many_values_in_large_range(key_type):
+    # Lowercasing strings is slow, so we look up fewer of them
+    num_lookups = NUM_LOOKUPS // 10 if key_type == 'str' else NUM_LOOKUPS
+    lookup_value, where = get_lookup_values_and_where(key_type, num_lookups, NUM_RANGE_ROWS)
+
+    start_time = perf_counter()
+    result = VLOOKUP(lookup_value, where, 2)
+    first_seconds = perf_counter() - start_time
+
+    start_time = perf_counter()
+    cached_result = VLOOKUP(lookup_value, where, 2)
+    cached_seconds = perf_counter() - start_time
+
+    print(f'\nVLOOKUP of {num_lookups} {key_type} values in {NUM_RANGE_ROWS} rows: {first_seconds:.3f}s, with a cached lookup index: {cached_seconds:.3f}s')
+
+    pd.testing.assert_series_equal(result, get_expected_result(key_type, lookup_value, where), check_names=False)
+    pd.testing.assert_series_equal(cached_result, result)
+    # Building the lookup index mostly takes time when we have to lowercase strings
+    if key_type == 'str':
+        assert cached_seconds < first_seconds
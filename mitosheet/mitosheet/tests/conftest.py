@@ -7,8 +7,29 @@ import pytest
 import os
 
 from mitosheet.saved_analyses import _get_all_analysis_filenames, _delete_analyses
+from mitosheet.saved_analyses.saved_analysis_writer import flush_saved_analysis_writers
 
 
+def pytest_addoption(parser):
+    parser.addoption(
+        "--run-benchmarks", action="store_true", default=False, 
+        help="run the tests marked as benchmarks, which are slow and compare how long things take"
+    )
+
+def pytest_collection_modifyitems(config, items):
+    """
+    The benchmarks take minutes to run, and their timings depend on the machine they run on,
+    so they are skipped unless they are asked for with --run-benchmarks. The checks that the
+    optimized code gets the same results as the code it replaced run either way.
+    """
+    if config.getoption("--run-benchmarks"):
+        return
+
+    skip_benchmark = pytest.mark.skip(reason="benchmarks only run with --run-benchmarks")
+    for item in items:
+        if item.get_closest_marker("benchmark") is not None:
+            item.add_marker(skip_benchmark)
+
 @pytest.fixture(scope="session", autouse=True)
 def cleanup_files():
     """
@@ -31,4 +52,14 @@ def cleanup_files():
     # Find all the new analysis file names (generated by tests)
     new_analysis_filenames = curr_analysis_filenames.difference(old_analysis_filenames)
     # Delete them
-    _delete_analyses(new_analysis_filenames)
\ No newline at end of file
+    _delete_analyses(new_analysis_filenames)
+
+@pytest.fixture(autouse=True)
+def flush_saved_analyses():
+    """
+    Analyses are written in the background after each edit, so we finish writing
+    them at the end of each test, as the kernel does when it shuts down. Otherwise,
+    they might be written while a later test is running.
+    """
+    yield
+    flush_saved_analysis_writers()
@@ -0,0 +1,167 @@
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+import pytest
+
+import mitosheet.mito_flask.v1.process_event as process_event_module
+from mitosheet.mito_backend import MitoBackend
+from mitosheet.mito_flask.v1.process_event import process_mito_event
+from mitosheet.mito_flask.v1.session_store import MitoSessionStore, SessionStore, get_session_token
+from mitosheet.tests.decorators import requires_flask
+from mitosheet.tests.test_utils import create_mito_wrapper
+from mitosheet.utils import get_new_id
+
+
+def get_add_column_event(column_header: str) -> Dict[str, Any]:
+    return {
+        'event': 'edit_event',
+        'id': get_new_id(),
+        'type': 'add_column_edit',
+        'step_id': get_new_id(),
+        'params': {
+            'sheet_index': 0,
+            'column_header': column_header,
+            'column_header_index': -1
+        }
+    }
+
+
+def get_simple_import_event(file_name: str) -> Dict[str, Any]:
+    return {
+        'event': 'edit_event',
+        'id': get_new_id(),
+        'type': 'simple_import_edit',
+        'step_id': get_new_id(),
+        'params': {
+            'file_names': [file_name],
+            'delimeters': None,
+            'encodings': None,
+            'decimals': None,
+            'skiprows': None,
+            'error_bad_lines': None,
+        }
+    }
+
+
+def process_event_to_backend_state(
+        backend_state: Optional[str], 
+        mito_event: Optional[Dict[str, Any]], 
+        session_store: Optional[SessionStore]
+    ) -> str:
+    from flask import Flask
+    with Flask(__name__).app_context():
+        response = process_mito_event(backend_state, mito_event, session_store)
+    return json.loads(response.get_json()['state'])['backend_state']
+
+
+@pytest.fixture
+def replayed_backend_states(monkeypatch: pytest.MonkeyPatch) -> List[str]:
+    """
+    Records the backend states that are rebuilt by replaying them.
+    """
+    replayed_backend_states: List[str] = []
+    original_read_backend_state_string_to_mito_backend = process_event_module.read_backend_state_string_to_mito_backend
+
+    def read_backend_state_string_to_mito_backend(backend_state_string: str) -> MitoBackend:
+        replayed_backend_states.append(backend_state_string)
+        return original_read_backend_state_string_to_mito_backend(backend_state_string)
+
+    monkeypatch.setattr(process_event_module, 'read_backend_state_string_to_mito_backend', read_backend_state_string_to_mito_backend)
+    return replayed_backend_states
+
+
+@requires_flask
+def test_process_events_uses_live_backends(tmp_path: Path, replayed_backend_states: List[str]) -> None:
+    file_name = str(tmp_path / 'test.csv')
+    pd.DataFrame({'A': [1, 2, 3], 'B': [4, 5, 6]}).to_csv(file_name, index=False)
+    session_store = MitoSessionStore()
+
+    backend_state = process_event_to_backend_state(None, None, session_store)
+    backend_state = process_event_to_backend_state(backend_state, get_simple_import_event(file_name), session_store)
+    for column_header in ['C', 'D', 'E']:
+        backend_state = process_event_to_backend_state(backend_state, get_add_column_event(column_header), session_store)
+
+    assert replayed_backend_states == []
+    assert len(session_store) == 1
+    mito_backend = session_store.checkout(get_session_token(backend_state))
+    assert mito_backend is not None
+    assert list(mito_backend.steps_manager.dfs[0].columns) == ['A', 'B', 'C', 'D', 'E']
+
+
+@requires_flask
+def test_process_events_replays_on_cache_miss(tmp_path: Path, replayed_backend_states: List[str]) -> None:
+    file_name = str(tmp_path / 'test.csv')
+    pd.DataFrame({'A': [1, 2, 3], 'B': [4, 5, 6]}).to_csv(file_name, index=False)
+    session_store = MitoSessionStore()
+
+    backend_state = process_event_to_backend_state(None, get_simple_import_event(file_name), session_store)
+    # Another request with the same state does not get the backend the first request is using
+    mito_backend = session_store.checkout(get_session_token(backend_state))
+    add_column_event = get_add_column_event('C')
+    new_backend_state = process_event_to_backend_state(backend_state, add_column_event, session_store)
+
+    assert replayed_backend_states == [backend_state]
+    assert new_backend_state == process_event_to_backend_state(backend_state, add_column_event, None)
+    assert mito_backend is not None and list(mito_backend.steps_manager.dfs[0].columns) == ['A', 'B']
+
+
+class DictSessionStore():
+    """
+    A session store that keeps every backend, to check that any SessionStore can be used.
+    """
+
+    def __init__(self) -> None:
+        self.sessions: Dict[str, MitoBackend] = {}
+
+    def checkout(self, session_token: str) -> Optional[MitoBackend]:
+        return self.sessions.pop(session_token, None)
+
+    def checkin(self, session_token: str, mito_backend: MitoBackend) -> None:
+        self.sessions[session_token] = mito_backend
+
+
+@requires_flask
+def test_process_events_uses_any_session_store(tmp_path: Path, replayed_backend_states: List[str]) -> None:
+    file_name = str(tmp_path / 'test.csv')
+    pd.DataFrame({'A': [1, 2, 3], 'B': [4, 5, 6]}).to_csv(file_name, index=False)
+    session_store = DictSessionStore()
+
+    backend_state = process_event_to_backend_state(None, get_simple_import_event(file_name), session_store)
+    backend_state = process_event_to_backend_state(backend_state, get_add_column_event('C'), session_store)
+
+    assert replayed_backend_states == []
+    assert list(session_store.sessions[get_session_token(backend_state)].steps_manager.dfs[0].columns) == ['A', 'B', 'C']
+
+
+def test_session_store_evicts_least_recently_used_sessions() -> None:
+    session_store = MitoSessionStore(max_sessions=2)
+    mito_backends = [MitoBackend() for _ in range(3)]
+
+    session_store.checkin('0', mito_backends[0])
+    session_store.checkin('1', mito_backends[1])
+    assert session_store.checkout('0') is mito_backends[0]
+    session_store.checkin('0', mito_backends[0])
+    session_store.checkin('2', mito_backends[2])
+
+    assert session_store.checkout('1') is None
+    assert session_store.checkout('0') is mito_backends[0]
+    assert session_store.checkout('2') is mito_backends[2]
+    assert session_store.total_bytes == 0
+
+
+def test_session_store_evicts_sessions_over_memory_cap() -> None:
+    df = pd.DataFrame({'A': list(range(1000))})
+    num_bytes = create_mito_wrapper(df).mito_backend.steps_manager.get_step_history_memory_footprint()['total_bytes']
+    session_store = MitoSessionStore(max_bytes=int(num_bytes * 1.5))
+
+    session_store.checkin('0', create_mito_wrapper(df.copy()).mito_backend)
+    session_store.checkin('1', create_mito_wrapper(df.copy()).mito_backend)
+    assert session_store.checkout('0') is None
+    assert session_store.checkout('1') is not None
+
+    # A session that does not fit on its own is not kept at all
+    session_store.checkin('2', create_mito_wrapper(pd.concat([df, df, df])).mito_backend)
+    assert len(session_store) == 0
+    assert session_store.total_bytes == 0
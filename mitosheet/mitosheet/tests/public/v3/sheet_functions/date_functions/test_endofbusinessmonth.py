@@ -10,7 +10,7 @@ Contains tests for the ENDOFBUSINESSMONTH function.
 import pytest
 import pandas as pd
 
-from mitosheet.public.v3.sheet_functions.date_functions import ENDOFBUSINESSMONTH
+from mitosheet.public.v3.sheet_functions.date_functions import ENDOFBUSINESSMONTH, to_end
 
 ENDOFBUSINESSMONTH_TESTS = [
     # Just constant tests
@@ -31,3 +31,12 @@ def test_endofbusinessmonth(_argv, expected):
         assert result.equals(expected)
     else: 
         assert result == expected
+
+
+def test_endofbusinessmonth_series_is_the_same_as_each_date():
+    dates = pd.Series(pd.date_range('2021-12-01', '2023-03-05', freq='D'))
+    dates = pd.concat([dates, dates + pd.Timedelta(hours=12, minutes=45, seconds=23), pd.Series([pd.NaT])], ignore_index=True)
+    dates.index = dates.index * 2
+
+    expected = dates.apply(lambda t: to_end(t, pd.tseries.offsets.BMonthEnd(n=0)))
+    assert ENDOFBUSINESSMONTH(dates).equals(expected)
@@ -54,4 +54,11 @@ def test_monthname_works_in_sheet():
     mito = create_mito_wrapper_with_data(['2000-1-2'])
     mito.set_formula('=MONTHNAME(A)', 0, 'B', add_column=True)
     print(mito.get_value(0, 'B', 1))
-    assert mito.get_value(0, 'B', 1) == 'Jan'
\ No newline at end of file
+    assert mito.get_value(0, 'B', 1) == 'Jan'
+
+def test_monthname_series_is_the_same_as_formatting_each_date():
+    dates = pd.Series(pd.date_range('2021-12-01', '2023-03-05', freq='D'))
+    dates = pd.concat([dates, pd.Series([pd.NaT])], ignore_index=True)
+    dates.index = dates.index * 2
+
+    assert MONTHNAME(dates).equals(dates.dt.strftime('%b'))
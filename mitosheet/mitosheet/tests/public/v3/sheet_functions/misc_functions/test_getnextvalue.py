@@ -5,6 +5,7 @@
 # Distributed under the terms of the GPL License.
 
 import pytest
+import numpy as np
 import pandas as pd
 
 from mitosheet.public.v3.sheet_functions.misc_functions import GETNEXTVALUE
@@ -38,6 +39,14 @@ GETNEXTVALUE_TESTS = [
         [pd.Series(pd.to_datetime(['1/2/23', '1/2/23', '1/2/23'], format='%m/%d/%y')), pd.Series([False, True, True])],  
         pd.Series(pd.to_datetime(['1/2/23', '1/2/23', '1/2/23'], format='%m/%d/%y'))
     ),
+    (
+        [pd.Series([1, 2, 3], index=[5, 5, 6]), pd.Series([True, True, False], index=[5, 5, 6])],
+        pd.Series([1, 2, -1], index=[5, 5, 6])
+    ),
+    (
+        [pd.Series(['a', 'b', 'c'], index=['x', 'y', 'x']), pd.Series([False, True, False], index=['x', 'y', 'x'])],
+        pd.Series(['b', 'b', ''], index=['x', 'y', 'x'])
+    ),
 ]
 @pytest.mark.parametrize("_argv, expected", GETNEXTVALUE_TESTS)
 def test_getnextvalue_function(_argv, expected):
@@ -8,6 +8,7 @@ Contains tests for the FILLNAN function.
 """
 
 import pytest
+import numpy as np
 import pandas as pd
 
 from mitosheet.public.v3.sheet_functions.misc_functions import GETPREVIOUSVALUE
@@ -41,6 +42,26 @@ GETPREVIOUSVALUE_VALID_TESTS = [
         [pd.Series(pd.to_datetime(['1/2/23', '1/2/23', '1/2/23'], format='%m/%d/%y')), pd.Series([False, True, True])],  
         pd.Series(pd.to_datetime([pd.NaT, '1/2/23', '1/2/23'], format='%m/%d/%y'))
     ),
+    (
+        [pd.Series([1.5, 2.5, 3.5]), pd.Series([False, False, False])],
+        pd.Series([-1, -1, -1])
+    ),
+    (
+        [pd.Series([1, 2, 3, 4]), pd.Series([True, np.nan, None, False])],
+        pd.Series([1, 2, 2, 2])
+    ),
+    (
+        [pd.Series([1, 2, 3]), True],
+        pd.Series([1, 2, 3])
+    ),
+    (
+        [pd.Series([1, 2, 3], index=[5, 5, 6]), pd.Series([True, True, False], index=[5, 5, 6])],
+        pd.Series([1, 2, 2], index=[5, 5, 6])
+    ),
+    (
+        [pd.Series(['a', 'b', 'c'], index=['x', 'y', 'x']), pd.Series([False, True, False], index=['x', 'y', 'x'])],
+        pd.Series(['', 'b', 'b'], index=['x', 'y', 'x'])
+    ),
 ]
 @pytest.mark.parametrize("_argv, expected", GETPREVIOUSVALUE_VALID_TESTS)
 def test_bool_direct(_argv, expected):
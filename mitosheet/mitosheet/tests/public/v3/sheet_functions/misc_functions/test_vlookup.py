@@ -7,10 +7,14 @@
 Contains tests for the TYPE function.
 """
 
+import gc
+import weakref
+
+import numpy as np
 import pytest
 import pandas as pd
 
-from mitosheet.public.v3.sheet_functions.misc_functions import VLOOKUP
+from mitosheet.public.v3.sheet_functions.misc_functions import VLOOKUP, get_lookup_index
 
 from mitosheet.errors import MitoError
 from mitosheet.tests.test_utils import create_mito_wrapper
@@ -270,3 +274,34 @@ def test_vlookup_with_datetime():
         })
     )
 
+
+
+def test_vlookup_reuses_lookup_index_for_same_range():
+    where = pd.DataFrame({'A': ['a', 'B', 'c'], 'B': [1, 2, 3]})
+
+    lookup_index = get_lookup_index(where, True)
+    assert get_lookup_index(where, True) is lookup_index
+    assert get_lookup_index(where, False) is not lookup_index
+    assert get_lookup_index(where.copy(), True) is not lookup_index
+
+    pd.testing.assert_series_equal(VLOOKUP(pd.Series(['b', 'C']), where, 2), pd.Series([2, 3]))
+
+
+def test_vlookup_rebuilds_lookup_index_when_range_changes():
+    where = pd.DataFrame({'A': [1, 2, 3], 'B': ['a', 'b', 'c']})
+    pd.testing.assert_series_equal(VLOOKUP(pd.Series([3, 1]), where, 2), pd.Series(['c', 'a']))
+
+    # Each step creates a new dataframe for the sheets it changes, rather than editing them in place
+    where = where.copy()
+    where.loc[0, 'A'] = 3
+    pd.testing.assert_series_equal(VLOOKUP(pd.Series([3, 1]), where, 2), pd.Series(['a', np.nan]))
+
+
+def test_vlookup_lookup_index_cache_does_not_keep_range_alive():
+    where = pd.DataFrame({'A': [1, 2, 3], 'B': ['a', 'b', 'c']})
+    where_ref = weakref.ref(where)
+    VLOOKUP(pd.Series([3, 1]), where, 2)
+
+    del where
+    gc.collect()
+    assert where_ref() is None
@@ -50,6 +50,7 @@ CLEAN_VALID_TESTS: Any = [
 
     # Constants and series
     ([pd.Series(['ABC', '123', np.nan])], pd.Series(['ABC', '123', ''])),
+    ([pd.Series(['A\nB~C', 'ABC\xDF', 'ABC', '\x7f'])], pd.Series(['ABC', 'ABC', 'ABC', ''])),
     ([pd.Series([1.0, None, None])], pd.Series(['1.0', '', ''])),
     ([pd.Series([np.nan, np.nan, np.nan])], pd.Series(['', '', ''])),
     ([pd.Series([10000, 10.0, True, datetime(1997, 12, 22), timedelta(days=1), np.nan])], pd.Series(['10000', '10.0', 'True', '1997-12-22 00:00:00', '1 day, 0:00:00', ''])),
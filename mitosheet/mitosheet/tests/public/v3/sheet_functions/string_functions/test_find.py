@@ -27,6 +27,8 @@ FIND_VALID_TESTS: Any = [
 
     # Constants and series
     (['a', pd.Series(['a', 'b', 'c'])], pd.Series([1, 0, 0])),
+    ([pd.Series(['xxa', np.nan, 'abc', '']), 'a'], pd.Series([3, 0, 1, 0])),
+    ([pd.Series(['xxa', np.nan, 'abc', '']), ''], pd.Series([1, 1, 1, 1])),
     ([pd.Series(['xxa', 'xbx', 'cxx', 'd']), pd.Series(['a', 'b', 'c', 'f'])], pd.Series([3, 2, 1, 0])),
     ([pd.Series([np.nan, 'xbx', 'cxx', 'd']), pd.Series(['a', 'b', 'c', 'f'])], pd.Series([0, 2, 1, 0])),
     ([pd.Series([np.nan, 'xbx', 'cxx', 'd']), pd.Series(['a', 'b', 'c', 'f'])], pd.Series([0, 2, 1, 0])),
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Checks the string functions give the same values and dtypes on string dtype
+columns as they do on object columns, as string dtype columns are cast to object
+columns. Missing values in string dtype columns are treated like NaN in object columns.
+"""
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mitosheet.public.v3.sheet_functions.string_functions import (
+    CLEAN, CONCAT, FIND, LEFT, LEN, LOWER, MID, PROPER, RIGHT, SUBSTITUTE, TEXT, TRIM, UPPER)
+
+STRINGS = ['abc', 'A\nB~C\x7f', 'héllo wörld', '', np.nan, 'banana']
+
+STRING_DTYPE_TESTS: Any = [
+    (CLEAN, []),
+    (CONCAT, ['x']),
+    (LEN, []),
+    (LOWER, []),
+    (PROPER, []),
+    (TEXT, []),
+    (TRIM, []),
+    (UPPER, []),
+    (FIND, ['an']),
+    (FIND, ['ö']),
+    (LEFT, []),
+    (LEFT, [3]),
+    (LEFT, [-1]),
+    (RIGHT, [0]),
+    (RIGHT, [3]),
+    (RIGHT, [-1]),
+    (MID, [2, 3]),
+    (MID, [-1, 3]),
+    (SUBSTITUTE, ['a', 'o']),
+    (SUBSTITUTE, ['a', 'o', 1]),
+    (SUBSTITUTE, ['a', 'o', 0]),
+    (SUBSTITUTE, ['', '-']),
+]
+
+
+@pytest.mark.parametrize("func, args", STRING_DTYPE_TESTS)
+def test_string_dtype_gives_same_values(func, args):
+    expected = func(pd.Series(STRINGS), *args)
+    result = func(pd.Series(STRINGS, dtype='string'), *args)
+    assert result.tolist() == expected.tolist()
+    assert result.dtype == expected.dtype
+    assert result.index.equals(expected.index)
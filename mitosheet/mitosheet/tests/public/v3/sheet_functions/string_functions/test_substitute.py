@@ -33,6 +33,9 @@ SUBSTITUTE_VALID_TESTS: Any = [
     (['aaa', pd.Series(['a', 'a', 'a']), pd.Series(['d', 'e', 'f']), pd.Series([1, 2, 0])], pd.Series(['daa', 'eea', 'aaa'])),
     ([pd.Series([np.nan, 'bba', np.nan]), pd.Series(['a', 'b', 'd']), pd.Series(['d', 'e', 'f']), pd.Series([1, 2, 0])], pd.Series(['', 'eea', ''])),
     (['aaa', pd.Series(['a', 'a', 'a']), pd.Series([np.nan, np.nan, np.nan]), None], pd.Series(['', '', ''])),
+    ([pd.Series(['aaa', np.nan, 'bab']), 'a', 'c', None], pd.Series(['ccc', '', 'bcb'])),
+    ([pd.Series(['aaa', np.nan, 'bab']), 'a', 'c', 2], pd.Series(['cca', '', 'bcb'])),
+    ([pd.Series(['aaa', np.nan, 'bab']), 'a', 'c', 0], pd.Series(['aaa', '', 'bab'])),
     #(['aaa', pd.Series(['a', 'a', 'a']), pd.Series(['d', 'e', 'f']), pd.Series([np.nan, np.nan, np.nan])], pd.Series(['ddd', 'eee', 'fff'])), TODO: Fix this. We can't cast a nan to an int
 ]
 
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Contains tests for the v3 sheet function decorators.
+"""
+import inspect
+from typing import Union
+
+import pandas as pd
+import pytest
+
+from mitosheet.errors import MitoError
+from mitosheet.public.v3.errors import handle_sheet_function_errors
+from mitosheet.public.v3.sheet_functions import FUNCTIONS
+from mitosheet.public.v3.types.decorators import cast_values_in_all_args_to_type, cast_values_in_arg_to_type
+
+
+@cast_values_in_arg_to_type('arg', 'number')
+@cast_values_in_arg_to_type('other_arg', 'str')
+@handle_sheet_function_errors
+def SHEET_FUNCTION(arg: Union[pd.Series, int, float], other_arg: Union[pd.Series, str]) -> Union[pd.Series, str]:
+    if not isinstance(arg, pd.Series) and arg < 0:
+        raise Exception()
+    return arg.astype(str) + other_arg if isinstance(arg, pd.Series) else f'{arg}{other_arg}'
+
+
+def test_casts_each_arg():
+    assert SHEET_FUNCTION('$1.5', 2) == '1.52'
+    pd.testing.assert_series_equal(SHEET_FUNCTION(pd.Series(['1', '2']), 3), pd.Series(['1.03', '2.03']))
+
+
+def test_checks_arg_types_after_casting():
+    with pytest.raises(MitoError) as e:
+        SHEET_FUNCTION(pd.DataFrame({'A': [1]}), 'a')
+    assert e.value.type_ == 'invalid_arg_error'
+
+
+def test_handles_errors_in_sheet_function():
+    with pytest.raises(MitoError) as e:
+        SHEET_FUNCTION(-1, 'a')
+    assert e.value.type_ == 'function_error'
+
+
+def test_casts_in_decorator_order():
+    @cast_values_in_all_args_to_type('number')
+    @cast_values_in_all_args_to_type('str')
+    def CONCAT_NUMBERS(*argv):
+        return ''.join(argv)
+
+    assert CONCAT_NUMBERS(True, '2.0') == '12.0'
+
+
+def test_fuses_decorators_into_a_single_wrapper():
+    original_sheet_function, arg_casts, parameter_types = SHEET_FUNCTION.fused_sheet_function
+    assert original_sheet_function is inspect.unwrap(SHEET_FUNCTION)
+    assert arg_casts == [(0, 'number', []), (1, 'str', [])]
+    assert [name for name, _ in parameter_types] == ['arg', 'other_arg']
+    assert SHEET_FUNCTION.__name__ == 'SHEET_FUNCTION'
+    assert list(inspect.signature(SHEET_FUNCTION).parameters.keys()) == ['arg', 'other_arg']
+
+
+def test_does_not_inspect_signature_on_each_call(monkeypatch):
+    def signature(*args, **kwargs):
+        raise Exception('Inspected signature')
+
+    monkeypatch.setattr(inspect, 'signature', signature)
+    assert FUNCTIONS['ROUND'](1.234, 2) == 1.23
+    assert FUNCTIONS['LOG'](100, 10) == 2
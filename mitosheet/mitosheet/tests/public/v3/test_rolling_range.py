@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mitosheet.public.v3.rolling_range import RollingRange
+
+AGGREGATION_FUNCTIONS = {
+    'sum': lambda df: df.sum().sum(),
+    'count': lambda df: df.count().sum(),
+    'min': lambda df: df.min().min(),
+    'max': lambda df: df.max().max(),
+    'prod': lambda df: df.prod().prod(),
+    'all': lambda df: df.all().all(),
+    'any': lambda df: df.any().any(),
+    'std': lambda df: df.stack().std(),
+    'var': lambda df: df.stack().var(),
+}
+
+rng = np.random.default_rng(0)
+NUM_ROWS = 20
+FLOATS = rng.normal(size=NUM_ROWS)
+
+OBJS = [
+    pd.DataFrame({'B': rng.integers(-10, 10, NUM_ROWS)}),
+    pd.DataFrame({'B': rng.integers(-10, 10, NUM_ROWS), 'C': rng.integers(-10, 10, NUM_ROWS)}),
+    pd.DataFrame({'B': FLOATS}),
+    pd.DataFrame({'B': np.where(FLOATS > 0, FLOATS, np.nan)}),
+    pd.DataFrame({'B': np.where(FLOATS > 0, FLOATS, np.nan), 'C': rng.integers(1, 3, NUM_ROWS)}),
+    pd.DataFrame({'B': np.full(NUM_ROWS, np.nan)}),
+    pd.DataFrame({'B': FLOATS > 0}),
+    pd.DataFrame({'B': FLOATS > 0, 'C': FLOATS > 1}),
+    pd.DataFrame({'B': FLOATS}, index=[f'label_{i}' for i in range(NUM_ROWS)]),
+    # These are not supported, so we check we fall back to applying the function to each window
+    pd.DataFrame({'B': np.where(FLOATS > 1, np.inf, FLOATS)}),
+    pd.DataFrame({'B': pd.date_range('2000-01-01', periods=NUM_ROWS)}),
+    pd.DataFrame({'B': [1, None, 'abc', 2.0] * (NUM_ROWS // 4)}),
+]
+
+WINDOWS_AND_OFFSETS = [
+    (1, 0), # A0 = B0
+    (2, 0), # A0 = B0:B1
+    (2, -1), # A1 = B0:B1
+    (3, -1), # A1 = B0:B2
+    (5, -2), # A5 = B3:B7
+    (4, 3), # A0 = B3:B6
+    (30, 0), # A0 = B0:B29, which runs off the end
+    (30, -10), # A10 = B0:B29
+    (3, 25), # A0 = B25:B27, which is empty
+    (2, -5), # A5 = B0:B1, where the windows for the first rows wrap around
+    (1, -30), # A30 = B0, where all the windows are empty
+]
+
+
+@pytest.mark.parametrize("aggregation", sorted(AGGREGATION_FUNCTIONS.keys()))
+@pytest.mark.parametrize("obj", OBJS)
+@pytest.mark.parametrize("window, offset", WINDOWS_AND_OFFSETS)
+def test_aggregate_is_the_same_as_apply(aggregation, obj, window, offset):
+    rolling_range = RollingRange(obj, window, offset)
+    func = AGGREGATION_FUNCTIONS[aggregation]
+
+    try:
+        expected = rolling_range.apply(func)
+    except Exception:
+        # If the function errors on a window, then so should aggregate
+        with pytest.raises(Exception):
+            rolling_range.aggregate(aggregation, func)
+        return
+
+    pd.testing.assert_series_equal(rolling_range.aggregate(aggregation, func), expected)
+
+
+@pytest.mark.parametrize("default_value", [0, 1, 'abc'])
+def test_aggregate_uses_default_value_for_empty_windows(default_value):
+    rolling_range = RollingRange(pd.DataFrame({'B': [1, 2, 3]}), 2, 1)
+    func = AGGREGATION_FUNCTIONS['sum']
+    pd.testing.assert_series_equal(
+        rolling_range.aggregate('sum', func, default_value),
+        rolling_range.apply(func, default_value)
+    )
+
+
+def test_aggregate_falls_back_to_apply_for_unknown_aggregation():
+    rolling_range = RollingRange(pd.DataFrame({'B': ['a', 'b', 'c']}), 2, 0)
+    pd.testing.assert_series_equal(
+        rolling_range.aggregate('concat', lambda df: df.sum().sum(), ''),
+        pd.Series(['ab', 'bc', 'c'])
+    )
+
+
+def test_aggregate_integer_sum_is_exact():
+    rolling_range = RollingRange(pd.DataFrame({'B': [2 ** 62, 1, -(2 ** 62), 3]}), 2, 0)
+    pd.testing.assert_series_equal(
+        rolling_range.aggregate('sum', AGGREGATION_FUNCTIONS['sum']),
+        pd.Series([2 ** 62 + 1, 1 - 2 ** 62, 3 - 2 ** 62, 3])
+    )
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Contains tests for the saved analysis writer, which writes the saved
+analysis in the background.
+"""
+import json
+import os
+import random
+from time import sleep
+from typing import Any, Dict, List, Tuple
+
+import pandas as pd
+import pytest
+
+import mitosheet.saved_analyses.saved_analysis_writer as saved_analysis_writer_module
+from mitosheet.saved_analyses import SAVED_ANALYSIS_FOLDER, SavedAnalysisWriter, write_save_analysis_file
+from mitosheet.saved_analyses.save_utils import read_analysis
+from mitosheet.tests.test_utils import create_mito_wrapper
+
+
+def test_edits_write_analysis_in_background():
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3]}))
+    mito.add_column(0, 'B')
+    mito.set_formula('=A + 1', 0, 'B', add_column=False)
+
+    assert mito.mito_backend.saved_analysis_writer.flush(timeout=10)
+
+    saved_analysis = read_analysis(mito.mito_backend.analysis_name)
+    assert saved_analysis is not None
+    assert [step['step_type'] for step in saved_analysis['steps_data']] == ['add_column', 'set_column_formula']
+
+
+@pytest.fixture
+def written_analyses(monkeypatch: pytest.MonkeyPatch) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Records the analyses that the saved analysis writers write, instead of writing them.
+    """
+    written_analyses: List[Tuple[str, Dict[str, Any]]] = []
+
+    def write_saved_analysis_string(analysis_name: str, saved_analysis_string: str) -> None:
+        written_analyses.append((analysis_name, json.loads(saved_analysis_string)))
+
+    monkeypatch.setattr(saved_analysis_writer_module, 'write_saved_analysis_string', write_saved_analysis_string)
+    return written_analyses
+
+
+def test_burst_of_writes_is_written_once(written_analyses: List[Tuple[str, Dict[str, Any]]]) -> None:
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3]}))
+    saved_analysis_writer = SavedAnalysisWriter(mito.mito_backend.steps_manager, write_delay_seconds=.2)
+
+    for _ in range(10):
+        saved_analysis_writer.request_write()
+
+    sleep(1)
+    assert [analysis_name for analysis_name, _ in written_analyses] == [mito.mito_backend.analysis_name]
+    assert saved_analysis_writer.thread is None
+
+    saved_analysis_writer.request_write()
+    assert saved_analysis_writer.flush(timeout=10)
+    assert len(written_analyses) == 2
+
+
+def test_flush_writes_without_waiting_for_delay(written_analyses: List[Tuple[str, Dict[str, Any]]]) -> None:
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3]}))
+    saved_analysis_writer = SavedAnalysisWriter(mito.mito_backend.steps_manager, write_delay_seconds=60)
+
+    assert saved_analysis_writer.flush(timeout=10)
+    assert written_analyses == []
+
+    saved_analysis_writer.request_write()
+    assert saved_analysis_writer.flush(timeout=10)
+    assert [analysis_name for analysis_name, _ in written_analyses] == [mito.mito_backend.analysis_name]
+
+
+def test_analysis_is_built_when_write_is_requested(written_analyses: List[Tuple[str, Dict[str, Any]]]) -> None:
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3]}))
+    saved_analysis_writer = SavedAnalysisWriter(mito.mito_backend.steps_manager, write_delay_seconds=60)
+    mito.add_column(0, 'B')
+    saved_analysis_writer.request_write()
+
+    # The background thread does not read the steps manager, so later edits do not race with it
+    mito.add_column(0, 'C')
+    assert saved_analysis_writer.flush(timeout=10)
+
+    assert len(written_analyses) == 1
+    assert [step['params']['column_header'] for step in written_analyses[0][1]['steps_data']] == ['B']
+
+
+def test_failed_write_does_not_overwrite_saved_analysis(monkeypatch):
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3]}))
+    analysis_name = f'UUID-test-failed-write-{random.randint(0, 2**32)}'
+    mito.add_column(0, 'B')
+    write_save_analysis_file(mito.mito_backend.steps_manager, analysis_name)
+
+    mito.add_column(0, 'C')
+    assert mito.mito_backend.saved_analysis_writer.flush(timeout=10)
+    analysis_files = set(os.listdir(SAVED_ANALYSIS_FOLDER))
+
+    def replace(src, dst):
+        raise OSError()
+
+    monkeypatch.setattr(os, 'replace', replace)
+    with pytest.raises(OSError):
+        write_save_analysis_file(mito.mito_backend.steps_manager, analysis_name)
+    monkeypatch.undo()
+
+    saved_analysis = read_analysis(analysis_name)
+    assert saved_analysis is not None
+    assert len(saved_analysis['steps_data']) == 1
+    assert set(os.listdir(SAVED_ANALYSIS_FOLDER)) == analysis_files
+    os.remove(os.path.join(SAVED_ANALYSIS_FOLDER, f'{analysis_name}.json'))
@@ -6,6 +6,8 @@
 """
 Contains tests for set column formula edit events
 """
+import pickle
+
 import pandas as pd
 import pytest
 
@@ -724,4 +726,39 @@ def test_set_formula_wrong_column_order_wrong_index_order():
     mito.add_column(0, 'D')
     mito.set_formula('=SUM(C1:A0)', 0, 'D')
 
-    assert mito.dfs[0].equals(pd.DataFrame({'A': [1, 2, 3], 'B': [1, 2, 3], 'C': [1, 2, 3], 'D': [9, 15, 9]}))
\ No newline at end of file
+    assert mito.dfs[0].equals(pd.DataFrame({'A': [1, 2, 3], 'B': [1, 2, 3], 'C': [1, 2, 3], 'D': [9, 15, 9]}))
+
+def test_set_formula_stores_range_index_as_range():
+    df = pd.DataFrame({'A': range(1_000_000)})
+    mito = create_mito_wrapper(df)
+    mito.add_column(0, 'B')
+    mito.set_formula('=A', 0, 'B')
+
+    column_formulas = mito.curr_step.column_formulas
+    assert column_formulas[0]['B'][0]['index'] == {'type': 'range', 'start': 0, 'stop': 1_000_000, 'step': 1}
+
+    # Storing the range, rather than every index label, saves almost all of the memory of the formula
+    compact_size = len(pickle.dumps(column_formulas))
+    full_size = len(pickle.dumps(df.index.to_list()))
+    assert compact_size < 1_000
+    assert compact_size * 1000 < full_size
+
+def test_set_formula_stores_evenly_spaced_int_index_as_range():
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3]}, index=[10, 8, 6]))
+    mito.add_column(0, 'B')
+    mito.set_formula('=A', 0, 'B', formula_label=10)
+
+    assert mito.curr_step.column_formulas[0]['B'][0]['index'] == {'type': 'range', 'start': 10, 'stop': 4, 'step': -2}
+    assert mito.dfs[0]['B'].tolist() == [1, 2, 3]
+
+@pytest.mark.parametrize("index", [
+    [2, 1, 5],
+    ['a', 'b', 'c'],
+    pd.to_datetime(['2020-01-01', '2020-01-02', '2020-01-03']),
+])
+def test_set_formula_stores_other_indexes_as_list(index):
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3]}, index=index))
+    mito.add_column(0, 'B')
+    mito.set_formula('=A', 0, 'B')
+
+    assert mito.curr_step.column_formulas[0]['B'][0]['index'] == pd.Index(index).to_list()
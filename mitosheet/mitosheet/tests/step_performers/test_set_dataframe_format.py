@@ -7,6 +7,7 @@
 Contains tests for Set Dataframe Format
 """
 
+import json
 from typing import Any, Dict, List, Optional
 import pandas as pd
 import pytest
@@ -232,3 +233,38 @@ def test_rename_then_duplicate_then_format():
 
     assert len(mito.dfs) == 2
     assert mito.dfs[0].equals(mito.dfs[1])
+
+
+def test_conditional_formatting_results_only_recomputed_for_changed_columns():
+    df = pd.DataFrame({'A': [1, 2, 3], 'B': [1, 2, 3]})
+    mito = create_mito_wrapper(df)
+    mito.set_dataframe_format(0, get_dataframe_format(conditional_formats=[{
+        'format_uuid': '1234',
+        'columnIDs': ['A', 'B'],
+        'filters': [{'condition': FC_NUMBER_GREATER, 'value': 1}],
+        'color': 'red',
+        'backgroundColor': 'blue',
+    }]))
+    sheet_data = json.loads(mito.mito_backend.steps_manager.sheet_data_json)[0]
+    assert list(sheet_data['conditionalFormattingResult']['results']['A'].keys()) == ['1', '2']
+
+    cache = mito.mito_backend.steps_manager.conditional_formatting_result_cache
+    result_a = cache.results[(0, '1234', 'A')][1]
+    result_b = cache.results[(0, '1234', 'B')][1]
+
+    mito.set_formula('=A * 10', 0, 'B', add_column=False)
+    sheet_data = json.loads(mito.mito_backend.steps_manager.sheet_data_json)[0]
+    assert list(sheet_data['conditionalFormattingResult']['results']['B'].keys()) == ['0', '1', '2']
+
+    # Only the result for the edited column is recomputed
+    assert cache.results[(0, '1234', 'A')][1] is result_a
+    assert cache.results[(0, '1234', 'B')][1] is not result_b
+
+    mito.undo()
+    sheet_data = json.loads(mito.mito_backend.steps_manager.sheet_data_json)[0]
+    assert list(sheet_data['conditionalFormattingResult']['results']['B'].keys()) == ['1', '2']
+
+    # Removing the conditional format removes its results from the cache
+    mito.set_dataframe_format(0, get_dataframe_format())
+    mito.mito_backend.steps_manager.sheet_data_json
+    assert cache.results == {}
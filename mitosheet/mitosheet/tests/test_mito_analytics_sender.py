@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Contains tests to make sure that the analytics events are sent to
+the analytics url in the background.
+"""
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from typing import List
+
+import pytest
+
+from pytest_httpserver import HTTPServer
+from werkzeug.wrappers import Request, Response
+
+import mitosheet.enterprise.telemetry.mito_analytics_sender as mito_analytics_sender_module
+from mitosheet.enterprise.mito_config import MITO_CONFIG_ANALYTICS_URL, MITO_CONFIG_VERSION
+from mitosheet.enterprise.telemetry.mito_analytics_sender import MitoAnalyticsSender, get_mito_analytics_sender
+from mitosheet.tests.test_mito_config import delete_all_mito_config_environment_variables
+from mitosheet.tests.test_utils import create_mito_wrapper_with_data
+
+
+def get_sent_log_events(httpserver: HTTPServer) -> List[str]:
+    return [json.loads(request.get_data())['log_event'] for request, _ in httpserver.log]
+
+
+def test_edits_send_analytics_events(httpserver: HTTPServer) -> None:
+    httpserver.expect_request("/analytics").respond_with_data('')
+    url = httpserver.url_for("/analytics")
+    os.environ[MITO_CONFIG_VERSION] = "2"
+    os.environ[MITO_CONFIG_ANALYTICS_URL] = url
+
+    mito = create_mito_wrapper_with_data([123])
+    mito.add_column(0, 'B')
+
+    assert get_mito_analytics_sender(url).flush(timeout=10)
+    assert 'add_column_edit' in get_sent_log_events(httpserver)
+
+    delete_all_mito_config_environment_variables()
+
+
+def test_slow_analytics_url_does_not_slow_down_edits(httpserver: HTTPServer) -> None:
+    def respond_slowly(request: Request) -> Response:
+        time.sleep(1)
+        return Response('')
+
+    httpserver.expect_request("/slow_analytics").respond_with_handler(respond_slowly)
+    url = httpserver.url_for("/slow_analytics")
+    os.environ[MITO_CONFIG_VERSION] = "2"
+    os.environ[MITO_CONFIG_ANALYTICS_URL] = url
+
+    mito = create_mito_wrapper_with_data([123])
+    start_time = time.perf_counter()
+    mito.add_column(0, 'B')
+    mito.add_column(0, 'C')
+    assert time.perf_counter() - start_time < 1
+
+    assert get_mito_analytics_sender(url).flush(timeout=30)
+    assert get_sent_log_events(httpserver).count('add_column_edit') == 2
+
+    delete_all_mito_config_environment_variables()
+
+
+def test_full_queue_drops_oldest_events(httpserver: HTTPServer, monkeypatch: pytest.MonkeyPatch) -> None:
+    unblock_server = threading.Event()
+    def respond_once_unblocked(request: Request) -> Response:
+        unblock_server.wait(10)
+        return Response('')
+
+    httpserver.expect_request("/blocked_analytics").respond_with_handler(respond_once_unblocked)
+    monkeypatch.setattr(mito_analytics_sender_module, 'MAX_QUEUED_ANALYTICS_EVENTS', 3)
+    mito_analytics_sender = MitoAnalyticsSender(httpserver.url_for("/blocked_analytics"))
+
+    mito_analytics_sender.send({'log_event': 'event_0'})
+    # Wait for the first event to be taken from the queue to be sent
+    with mito_analytics_sender.condition:
+        assert mito_analytics_sender.condition.wait_for(lambda: mito_analytics_sender.sending, 10)
+    for i in range(1, 6):
+        mito_analytics_sender.send({'log_event': f'event_{i}'})
+    unblock_server.set()
+
+    assert mito_analytics_sender.flush(timeout=10)
+    assert mito_analytics_sender.num_dropped_events == 2
+    assert get_sent_log_events(httpserver) == ['event_0', 'event_3', 'event_4', 'event_5']
+
+
+def test_failed_requests_are_not_raised() -> None:
+    # Nothing is listening on this port
+    mito_analytics_sender = MitoAnalyticsSender('http://localhost:1/analytics')
+    mito_analytics_sender.send({'log_event': 'event_0'})
+    assert mito_analytics_sender.flush(timeout=10)
+
+
+def test_queued_events_are_sent_on_exit(httpserver: HTTPServer) -> None:
+    def respond_slowly(request: Request) -> Response:
+        time.sleep(.5)
+        return Response('')
+
+    httpserver.expect_request("/exit_analytics").respond_with_handler(respond_slowly)
+    script = (
+        'from mitosheet.enterprise.telemetry.mito_analytics_sender import get_mito_analytics_sender\n'
+        f'mito_analytics_sender = get_mito_analytics_sender({httpserver.url_for("/exit_analytics")!r})\n'
+        'for i in range(3):\n'
+        '    mito_analytics_sender.send({"log_event": f"event_{i}"})\n'
+    )
+    subprocess.run([sys.executable, '-c', script], check=True, timeout=60)
+
+    assert get_sent_log_events(httpserver) == ['event_0', 'event_1', 'event_2']
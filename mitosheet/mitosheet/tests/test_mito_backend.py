@@ -201,4 +201,19 @@ def test_create_backend_default_apply_formula_to_column():
     mito_backend = MitoBackend()
     assert mito_backend.steps_manager.default_apply_formula_to_column == True
 
-    
\ No newline at end of file
+    
+
+
+def test_shared_state_sheet_data_is_only_rebuilt_when_the_sheet_changes():
+    mito = create_mito_wrapper_with_data([1, 2, 3])
+    mito_backend = mito.mito_backend
+    sheet_data_json = mito_backend.get_shared_state_variables()['sheet_data_json']
+    assert mito_backend.get_shared_state_variables()['sheet_data_json'] is sheet_data_json
+
+    mito.add_column(0, 'B')
+    edited_sheet_data_json = mito_backend.get_shared_state_variables()['sheet_data_json']
+    assert edited_sheet_data_json == mito_backend.steps_manager.sheet_data_json
+    assert '"B"' in edited_sheet_data_json and '"B"' not in sheet_data_json
+
+    mito.undo()
+    assert mito_backend.get_shared_state_variables()['sheet_data_json'] == sheet_data_json
@@ -4,7 +4,8 @@ import os
 import pandas as pd
 import pytest
 
-from mitosheet.mito_backend import get_mito_frontend_code
+import mitosheet.mito_backend as mito_backend_module
+from mitosheet.mito_backend import get_frontend_bundle, get_mito_frontend_code
 from mitosheet.steps_manager import StepsManager
 from mitosheet.tests.test_utils import create_mito_wrapper
 
@@ -48,4 +49,83 @@ def test_mito_frontend_is_valid_code(tmp_path, string):
     # we want to make sure that there are no failures in parsing, that it runs up to the 
     # ReferenceError: document is not defined 
     assert 'SyntaxError' not in err.decode('utf-8') 
-    assert 'ReferenceError' in err.decode('utf-8') 
\ No newline at end of file
+    assert 'ReferenceError' in err.decode('utf-8') 
+
+@pytest.mark.parametrize('string', STRINGS_TO_TEST)
+def test_mito_frontend_without_bundle_is_valid_code(tmp_path, string):
+    df = pd.DataFrame({'A': [string]})
+    mito = create_mito_wrapper(df)
+    file = tmp_path / 'out.js'
+    with open(file, 'w+') as f:
+        f.write(get_mito_frontend_code('a', 'a', 'a', mito.mito_backend, include_frontend_bundle=False))
+
+    p = subprocess.Popen(['node', file,], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    (_, err) = p.communicate()
+    p.wait()
+
+    # It runs up to the ReferenceError: window is not defined 
+    assert 'SyntaxError' not in err.decode('utf-8') 
+    assert 'ReferenceError' in err.decode('utf-8')
+
+
+def test_mito_frontend_code_size():
+    df = pd.DataFrame({
+        'ints': list(range(1000)),
+        'floats': [i / 7 for i in range(1000)],
+        'strings': [f'value {i}' for i in range(1000)],
+    })
+    mito = create_mito_wrapper(df)
+    steps_manager = mito.mito_backend.steps_manager
+    payload_size = len(steps_manager.sheet_data_json.encode('utf8')) + len(steps_manager.analysis_data_json.encode('utf8')) + len(mito.mito_backend.get_user_profile_json().encode('utf8'))
+
+    code = get_mito_frontend_code('a', 'a', 'a', mito.mito_backend)
+    code_without_bundle = get_mito_frontend_code('a', 'a', 'a', mito.mito_backend, include_frontend_bundle=False)
+    frontend_bundle = get_frontend_bundle()
+
+    # The size of the payload when each byte is written out as a number in a list
+    payload_as_numbers_size = sum(len(str(list(json.encode('utf8')))) for json in [steps_manager.sheet_data_json, steps_manager.analysis_data_json, mito.mito_backend.get_user_profile_json()])
+
+    # The payload is base64 encoded, which is 4/3 of its size, rather than written out as a list of numbers
+    assert len(code) - len(frontend_bundle) < payload_size * 1.4
+    assert (len(code) - len(frontend_bundle)) * 2 < payload_as_numbers_size
+    assert frontend_bundle in code
+    assert frontend_bundle not in code_without_bundle
+    assert len(code_without_bundle) < payload_size * 1.4 + 3000
+
+
+@pytest.mark.parametrize('backend_sends_bundle, expected_output', [
+    (True, 'rendered'),
+    (False, 'Could not load Mito. Please rerun this cell to render the Mito spreadsheet.'),
+])
+def test_mito_frontend_without_bundle_asks_to_rerun_if_bundle_is_not_sent(tmp_path, monkeypatch, backend_sends_bundle, expected_output):
+    monkeypatch.setattr(mito_backend_module, 'FRONTEND_BUNDLE_TIMEOUT_MS', 10)
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1]}))
+
+    # A page where the comm to the backend is created, but only replies with the bundle if backend_sends_bundle
+    page_js_code = """
+    const output = {innerText: ''};
+    global.document = {
+        getElementById: () => output,
+        createElement: () => ({}),
+        head: {appendChild: (script) => eval(script.textContent)}
+    };
+    global.window = {commands: {execute: async () => {
+        const comm = {open: () => {
+            if (BACKEND_SENDS_BUNDLE) {
+                comm.onMsg({content: {data: {frontend_bundle: "global.MitoFrontend = {renderMitosheet: () => { output.innerText = 'rendered' }}"}}});
+            }
+        }};
+        return comm;
+    }}};
+    setTimeout(() => console.log(output.innerText), 500);
+    """.replace('BACKEND_SENDS_BUNDLE', 'true' if backend_sends_bundle else 'false')
+
+    file = tmp_path / 'out.js'
+    with open(file, 'w+') as f:
+        f.write(page_js_code + get_mito_frontend_code('a', 'a', 'a', mito.mito_backend, include_frontend_bundle=False))
+
+    p = subprocess.Popen(['node', file,], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    (out, _) = p.communicate()
+    p.wait()
+
+    assert out.decode('utf-8').strip() == expected_output
@@ -4,13 +4,18 @@
 # Copyright (c) Saga Inc.
 # Distributed under the terms of the GPL License.
 from distutils.version import LooseVersion
+import re
+from collections import OrderedDict
+from threading import Thread
 from typing import Any, Dict, List
 import warnings
 import pytest
 import pandas as pd
 
+from mitosheet.column_headers import get_column_header_display
 from mitosheet.errors import MitoError
-from mitosheet.parser import get_backend_formula_from_frontend_formula, parse_formula, safe_contains, get_frontend_formula
+import mitosheet.parser as parser_module
+from mitosheet.parser import MAX_COLUMN_HEADER_MATCHERS_CACHED, ColumnHeaderMatcher, get_backend_formula_from_frontend_formula, get_column_header_matcher, parse_formula, safe_contains, get_frontend_formula
 from mitosheet.types import FORMULA_ENTIRE_COLUMN_TYPE, FORMULA_SPECIFIC_INDEX_LABELS_TYPE
 from mitosheet.tests.decorators import pandas_post_1_2_only
 
@@ -1448,4 +1453,71 @@ def test_get_frontend_formula_reconstucts_properly(formula,column_header,formula
 @pytest.mark.parametrize("formula,column_header,formula_label,dfs,df_names,sheet_index,python_code,functions,columns", VLOOKUP_TESTS)
 def test_get_cross_sheet_frontend_formula_reconstucts_properly(formula,column_header,formula_label,dfs,df_names,sheet_index,python_code,functions,columns):
     frontend_formula = get_frontend_formula(formula, formula_label, dfs, df_names, sheet_index)
-    assert get_backend_formula_from_frontend_formula(frontend_formula, formula_label, dfs[sheet_index]) == formula
\ No newline at end of file
+    assert get_backend_formula_from_frontend_formula(frontend_formula, formula_label, dfs[sheet_index]) == formula
+
+COLUMN_HEADER_MATCHER_TESTS = [
+    ('=A + AA + AAA', ['A', 'AA', 'AAA']),
+    ('=AAAA', ['A', 'AA']),
+    ('=ABC + BC', ['AB', 'BC', 'C']),
+    ('=1 + true + 10', [1, '1', True, 10]),
+    ('=A - B', ['']),
+    ('=column_1 + column_12', [f'column_{i}' for i in range(100)]),
+]
+
+@pytest.mark.parametrize('formula,column_headers', COLUMN_HEADER_MATCHER_TESTS)
+def test_column_header_matcher_finds_same_matches_as_regex(formula, column_headers):
+    expected_matches = [
+        (column_header, get_column_header_display(column_header), [(match.start(), match.end()) for match in re.finditer(re.escape(get_column_header_display(column_header)), formula)])
+        for column_header in sorted(column_headers, key=lambda ch: len(str(ch)), reverse=True)
+    ]
+    expected_matches = [match for match in expected_matches if len(match[2]) > 0]
+
+    assert ColumnHeaderMatcher(column_headers).get_matches(formula) == expected_matches
+
+
+def test_parse_formula_results_are_not_reused_when_sheet_changes():
+    df = pd.DataFrame({'A': [1, 2, 3], 'B': [1, 2, 3]})
+    formula_args = ('=A0', 'B', 1, {'type': FORMULA_ENTIRE_COLUMN_TYPE})
+
+    assert parse_formula(*formula_args, [df], ['df'], 0)[0] == "df['B'] = df['A'].shift(1, fill_value=0)"
+    assert parse_formula(*formula_args, [df], ['df'], 0)[0] == "df['B'] = df['A'].shift(1, fill_value=0)"
+
+    # Changing the dtype of the column changes the shift
+    df['A'] = df['A'].astype(str)
+    assert parse_formula(*formula_args, [df], ['df'], 0)[0] == "df['B'] = df['A'].shift(1)"
+
+    # Changing the index changes the row offset
+    df.index = [1, 0, 2]
+    assert parse_formula(*formula_args, [df], ['df'], 0)[0] == "df['B'] = df['A'].shift(-1)"
+
+    # Renaming the column means it is no longer found
+    df.columns = ['C', 'B']
+    assert parse_formula(*formula_args, [df], ['df'], 0)[0] == "df['B'] = A0"
+
+    # The returned sets are not shared between calls
+    parse_formula(*formula_args, [df], ['df'], 0)[1].add('SUM')
+    assert parse_formula(*formula_args, [df], ['df'], 0)[1] == set()
+
+
+def test_column_header_matchers_are_not_evicted_while_they_are_read(monkeypatch):
+    fill_cache_threads: List[Thread] = []
+
+    def fill_cache() -> None:
+        for i in range(MAX_COLUMN_HEADER_MATCHERS_CACHED + 1):
+            get_column_header_matcher([f'D{i}'])
+
+    class ColumnHeaderMatchers(OrderedDict):
+        def move_to_end(self, key: Any, last: bool=True) -> None:
+            super().move_to_end(key, last)
+            # Another thread fills the cache while this thread reads the cached matcher
+            fill_cache_thread = Thread(target=fill_cache)
+            fill_cache_threads.append(fill_cache_thread)
+            fill_cache_thread.start()
+            fill_cache_thread.join(timeout=.5)
+
+    monkeypatch.setattr(parser_module, '_column_header_matchers', ColumnHeaderMatchers())
+    column_header_matcher = get_column_header_matcher(['A'])
+
+    assert get_column_header_matcher(['A']) is column_header_matcher
+    for fill_cache_thread in fill_cache_threads:
+        fill_cache_thread.join()
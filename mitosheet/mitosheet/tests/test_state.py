@@ -29,3 +29,38 @@ def test_state_can_add_df_to_middle():
     
     assert state.df_sources == [DATAFRAME_SOURCE_IMPORTED]
 
+
+def test_state_copy_on_write_shares_unmodified_sheets():
+    df1 = pd.DataFrame({'A': [1]})
+    df2 = pd.DataFrame({'B': [2]})
+    state = State([df1, df2], 3)
+    new_state = state.copy_on_write({1})
+
+    assert new_state.dfs[0] is state.dfs[0]
+    assert new_state.column_formulas[0] is state.column_formulas[0]
+    assert new_state.column_filters[0] is state.column_filters[0]
+    assert new_state.df_formats[0] is state.df_formats[0]
+    assert new_state.column_ids.column_id_to_column_header[0] is state.column_ids.column_id_to_column_header[0]
+
+    assert new_state.dfs[1] is not state.dfs[1]
+    assert new_state.column_formulas[1] is not state.column_formulas[1]
+    assert new_state.column_filters[1] is not state.column_filters[1]
+    assert new_state.df_formats[1] is not state.df_formats[1]
+    assert new_state.column_ids.column_id_to_column_header[1] is not state.column_ids.column_id_to_column_header[1]
+
+def test_state_copy_on_write_does_not_change_previous_state():
+    df1 = pd.DataFrame({'A': [1]})
+    df2 = pd.DataFrame({'B': [2]})
+    state = State([df1, df2], 3)
+    new_state = state.copy_on_write({1})
+
+    new_state.add_columns_to_state(1, ['C'])
+    new_state.dfs[1]['C'] = 3
+    new_state.add_df_to_state(pd.DataFrame({'D': [4]}), DATAFRAME_SOURCE_IMPORTED)
+
+    assert len(state.dfs) == 2
+    assert state.df_names == ['df1', 'df2']
+    assert list(state.dfs[1].columns) == ['B']
+    assert state.column_ids.get_column_ids(1) == ['B']
+    assert list(state.column_formulas[1].keys()) == ['B']
+    assert list(state.column_filters[1].keys()) == ['B']
@@ -3,15 +3,23 @@
 
 # Copyright (c) Saga Inc.
 # Distributed under the terms of the GPL License.
+import base64
+import json
+from threading import Thread
+from time import sleep
+
+import numpy as np
 import pandas as pd
 import pytest
 from mitosheet.enterprise.mito_config import MitoConfig
-from mitosheet.types import FORMULA_ENTIRE_COLUMN_TYPE
+from mitosheet.types import FC_NUMBER_GREATER, FORMULA_ENTIRE_COLUMN_TYPE
 
-from mitosheet.utils import get_new_id
+from mitosheet.utils import SHEET_DATA_ENCODING_COLUMNAR, SHEET_DATA_ENCODING_JSON, get_new_id
 from mitosheet.errors import MitoError
-from mitosheet.steps_manager import StepsManager
-from mitosheet.tests.test_utils import create_mito_wrapper_with_data
+from mitosheet.mito_backend import MitoBackend
+from mitosheet.step import Step
+from mitosheet.steps_manager import StepSkipIndex, StepsManager, execute_step_list_from_index
+from mitosheet.tests.test_utils import create_mito_wrapper, create_mito_wrapper_with_data
 from mitosheet.column_headers import get_column_header_id
 
 
@@ -104,3 +112,290 @@ def test_failed_overwrite_rolls_back_to_previous_state():
     assert mito.dfs[0].equals(pd.DataFrame(data={'A': [1, 2, 3], 'B': [0, 0, 0]}))
 
 
+
+
+def _make_analysis_with_many_steps(state_retention_policy=None):
+    mito = create_mito_wrapper_with_data([1, 2, 3])
+    if state_retention_policy is not None:
+        mito.mito_backend.steps_manager.set_state_retention_policy(state_retention_policy)
+    for i in range(10):
+        mito.add_column(0, f'B{i}')
+        mito.set_formula(f'=A + {i}', 0, f'B{i}', add_column=False)
+    return mito
+
+
+def test_state_retention_policy_evicts_non_checkpoint_states():
+    mito = _make_analysis_with_many_steps({'checkpoint_interval': 5, 'max_step_history_bytes': None})
+    steps_manager = mito.mito_backend.steps_manager
+
+    footprint = steps_manager.get_step_history_memory_footprint()
+    assert footprint['num_steps'] == 21
+    assert footprint['num_steps_with_evicted_states'] > 0
+    assert footprint['num_steps_with_states'] < footprint['num_steps']
+    assert 0 in footprint['checkpoint_step_indexes']
+    assert 20 in footprint['checkpoint_step_indexes']
+
+    # The current state is never evicted
+    assert not steps_manager.curr_step.states_evicted
+    assert mito.dfs[0].equals(pd.DataFrame({'A': [1, 2, 3], **{f'B{i}': [1 + i, 2 + i, 3 + i] for i in range(10)}}))
+
+
+def test_state_retention_policy_rebuilds_evicted_states_on_checkout():
+    mito_with_policy = _make_analysis_with_many_steps({'checkpoint_interval': 4, 'max_step_history_bytes': None})
+    mito_without_policy = _make_analysis_with_many_steps()
+
+    for step_index in [3, 7, 12, 1, 18]:
+        mito_with_policy.checkout_step_by_idx(step_index)
+        mito_without_policy.checkout_step_by_idx(step_index)
+        assert mito_with_policy.dfs[0].equals(mito_without_policy.dfs[0])
+        assert mito_with_policy.mito_backend.steps_manager.curr_step.column_formulas == mito_without_policy.mito_backend.steps_manager.curr_step.column_formulas
+
+
+def test_state_retention_policy_undo_and_transpile_match():
+    mito_with_policy = _make_analysis_with_many_steps({'checkpoint_interval': 3, 'max_step_history_bytes': None})
+    mito_without_policy = _make_analysis_with_many_steps()
+
+    assert mito_with_policy.transpiled_code == mito_without_policy.transpiled_code
+
+    for _ in range(5):
+        mito_with_policy.undo()
+        mito_without_policy.undo()
+        assert mito_with_policy.dfs[0].equals(mito_without_policy.dfs[0])
+
+    assert mito_with_policy.transpiled_code == mito_without_policy.transpiled_code
+
+
+def test_state_retention_policy_byte_budget_evicts_checkpoints():
+    mito = _make_analysis_with_many_steps({'checkpoint_interval': 1, 'max_step_history_bytes': None})
+    steps_manager = mito.mito_backend.steps_manager
+    unbounded_footprint = steps_manager.get_step_history_memory_footprint()
+
+    steps_manager.set_state_retention_policy({'checkpoint_interval': 1, 'max_step_history_bytes': 1})
+    bounded_footprint = steps_manager.get_step_history_memory_footprint()
+
+    assert bounded_footprint['total_bytes'] < unbounded_footprint['total_bytes']
+    assert len(bounded_footprint['checkpoint_step_indexes']) < len(unbounded_footprint['checkpoint_step_indexes'])
+    # The protected steps are kept, even though the budget is exceeded
+    assert 0 in bounded_footprint['checkpoint_step_indexes']
+    assert 20 in bounded_footprint['checkpoint_step_indexes']
+
+    mito.checkout_step_by_idx(10)
+    assert list(mito.dfs[0].columns) == ['A'] + [f'B{i}' for i in range(5)]
+
+
+def test_state_retention_policy_invalid_checkpoint_interval():
+    mito = create_mito_wrapper_with_data([1, 2, 3])
+    with pytest.raises(ValueError):
+        mito.mito_backend.steps_manager.set_state_retention_policy({'checkpoint_interval': 0, 'max_step_history_bytes': None})
+    with pytest.raises(ValueError):
+        MitoBackend(pd.DataFrame({'A': [1, 2, 3]}), state_retention_policy={'checkpoint_interval': 0, 'max_step_history_bytes': None})
+
+
+def test_state_retention_policy_rebuilt_states_are_not_evicted_before_they_are_read():
+    mito = _make_analysis_with_many_steps()
+    steps_manager = mito.mito_backend.steps_manager
+    rebuild_evicted_step_states = steps_manager._rebuild_evicted_step_states
+
+    def rebuild_and_evict_on_another_thread(step: Step) -> None:
+        rebuild_evicted_step_states(step)
+        # Another thread evicts the states again right after they are rebuilt, which it 
+        # can only do once they have been read
+        Thread(target=steps_manager._evict_step_states, args=(step,)).start()
+        sleep(.1)
+
+    steps_manager._rebuild_evicted_step_states = rebuild_and_evict_on_another_thread # type: ignore
+    steps_manager.set_state_retention_policy({'checkpoint_interval': 5, 'max_step_history_bytes': None})
+
+    step = steps_manager.steps_including_skipped[3]
+    assert step.states_evicted
+    assert step.prev_state is not None
+
+
+def test_incremental_replay_reuses_steps_on_unchanged_sheets():
+    mito = create_mito_wrapper_with_data([1, 2, 3], [4, 5, 6])
+    mito.filter(0, 'A', 'And', FC_NUMBER_GREATER, 1)
+    mito.add_column(1, 'B')
+    mito.set_formula('=A + 1', 1, 'B', add_column=False)
+    sheet_two_df = mito.dfs[1]
+
+    # Replacing the filter replays all the steps after the first filter
+    mito.filter(0, 'A', 'And', FC_NUMBER_GREATER, 2)
+    assert mito.dfs[0].equals(pd.DataFrame({'A': [3]}, index=[2]))
+    assert mito.dfs[1] is sheet_two_df
+
+    mito.undo()
+    assert mito.dfs[0].equals(pd.DataFrame({'A': [2, 3]}, index=[1, 2]))
+    assert mito.dfs[1] is sheet_two_df
+    assert mito.dfs[1].equals(pd.DataFrame({'A': [4, 5, 6], 'B': [5, 6, 7]}))
+
+
+def test_incremental_replay_reexecutes_steps_reading_changed_sheets():
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3]}), pd.DataFrame({'B': [1, 2, 3], 'C': [4, 5, 6]}))
+    mito.filter(1, 'B', 'And', FC_NUMBER_GREATER, 1)
+    mito.add_column(0, 'D')
+    mito.set_formula('=VLOOKUP(A0, df2!B:C, 2)', 0, 'D', add_column=False)
+    assert pd.isna(mito.dfs[0]['D'].tolist()[0])
+    assert mito.dfs[0]['D'].tolist()[1:] == [5, 6]
+
+    # Replacing the filter means the VLOOKUP reads the unfiltered sheet, so it must be executed again
+    mito.filter(1, 'B', 'And', FC_NUMBER_GREATER, 2)
+    assert mito.dfs[0]['D'].tolist() == [4, 5, 6]
+
+
+def test_incremental_replay_matches_full_replay():
+    mito = create_mito_wrapper(pd.DataFrame({'A': [1, 2, 3]}), pd.DataFrame({'A': [4, 5, 6], 'B': [1, 2, 3]}))
+    mito.filter(0, 'A', 'And', FC_NUMBER_GREATER, 1)
+    mito.add_column(1, 'C')
+    mito.set_formula('=A + B', 1, 'C', add_column=False)
+    mito.pivot_sheet(1, ['A'], [], {'C': ['sum']})
+    mito.add_column(0, 'B')
+    mito.set_formula('=A * 2', 0, 'B', add_column=False)
+    mito.filter(0, 'A', 'And', FC_NUMBER_GREATER, 2)
+
+    steps = mito.mito_backend.steps_manager.steps_including_skipped
+    incremental_steps = execute_step_list_from_index(steps, start_index=0)
+    full_steps = execute_step_list_from_index(steps, start_index=0, incremental=False)
+
+    for incremental_step, full_step in zip(incremental_steps, full_steps):
+        if full_step.post_state is None:
+            continue
+        assert incremental_step.df_names == full_step.df_names
+        assert incremental_step.column_formulas == full_step.column_formulas
+        for incremental_df, full_df in zip(incremental_step.dfs, full_step.dfs):
+            assert incremental_df.equals(full_df)
+
+
+def _get_step_indexes_to_skip_by_comparing_all_steps(steps):
+    step_indexes_to_skip = set()
+    for step_index, step in enumerate(steps):
+        step_indexes_to_skip.update(step.step_indexes_to_skip(steps[:step_index]))
+    return step_indexes_to_skip
+
+
+def test_step_skip_index_matches_comparing_all_steps():
+    steps = [Step('initialize', 'initialize', {})]
+    for i in range(30):
+        if i % 3 == 0:
+            steps.append(Step('filter_column', f'filter{i}', {'sheet_index': 0, 'column_id': 'A' if i % 2 == 0 else 'B'}))
+        elif i % 3 == 1:
+            steps.append(Step('set_column_formula', f'formula{i}', {
+                'sheet_index': 0, 'column_id': 'C', 'index_labels_formula_is_applied_to': {'type': FORMULA_ENTIRE_COLUMN_TYPE}
+            }))
+        else:
+            steps.append(Step('pivot', f'pivot{i % 4}', {}))
+
+    step_skip_index = StepSkipIndex()
+    for step_index in range(len(steps)):
+        step_skip_index.append(steps[step_index])
+        assert step_skip_index.step_indexes_to_skip == _get_step_indexes_to_skip_by_comparing_all_steps(steps[:step_index + 1])
+
+    for num_steps in range(len(steps), 0, -1):
+        assert step_skip_index.get_step_indexes_to_skip(num_steps) == _get_step_indexes_to_skip_by_comparing_all_steps(steps[:num_steps])
+        step_skip_index.pop()
+
+    step_skip_index.update(steps[:10])
+    assert step_skip_index.step_indexes_to_skip == _get_step_indexes_to_skip_by_comparing_all_steps(steps[:10])
+    step_skip_index.update(steps[:5] + steps[20:])
+    assert step_skip_index.step_indexes_to_skip == _get_step_indexes_to_skip_by_comparing_all_steps(steps[:5] + steps[20:])
+
+
+def test_step_skip_index_is_kept_up_to_date():
+    mito = create_mito_wrapper_with_data([1, 2, 3])
+    steps_manager = mito.mito_backend.steps_manager
+    mito.filter(0, 'A', 'And', FC_NUMBER_GREATER, 1)
+    mito.add_column(0, 'B')
+    mito.set_formula('=A', 0, 'B', add_column=False)
+    mito.set_formula('=A + 1', 0, 'B', add_column=False)
+    mito.filter(0, 'A', 'And', FC_NUMBER_GREATER, 2)
+    assert steps_manager.step_skip_index.steps is steps_manager.steps_including_skipped
+    assert steps_manager.get_step_indexes_to_skip() == {1, 3}
+
+    mito.undo()
+    assert steps_manager.get_step_indexes_to_skip() == {3}
+    mito.redo()
+    assert steps_manager.get_step_indexes_to_skip() == {1, 3}
+    mito.clear()
+    assert steps_manager.get_step_indexes_to_skip() == set()
+    mito.undo()
+    assert steps_manager.get_step_indexes_to_skip() == {1, 3}
+    assert steps_manager.step_skip_index.steps is steps_manager.steps_including_skipped
+
+
+def test_code_chunks_are_cached_between_transpiles():
+    mito = create_mito_wrapper_with_data([1, 2, 3])
+    mito.add_column(0, 'B')
+    mito.set_formula('=A + 1', 0, 'B', add_column=False)
+    steps_manager = mito.mito_backend.steps_manager
+
+    code = steps_manager.code()
+    code_chunks = steps_manager.get_code_chunks()
+    assert steps_manager.get_code_chunks() == code_chunks
+    assert steps_manager.code() == code
+
+    # After an edit, the steps that did not change are not transpiled again
+    step_code_chunks = [step.get_code_chunks() for step in steps_manager.steps_including_skipped[1:]]
+    mito.add_column(0, 'C')
+    for step, old_step_code_chunks in zip(steps_manager.steps_including_skipped[1:], step_code_chunks):
+        assert all(a is b for a, b in zip(step.get_code_chunks(), old_step_code_chunks))
+
+    # Checking out a previous step transpiles only up to that step
+    mito.checkout_step_by_idx(1)
+    assert steps_manager.code() != code
+    mito.checkout_step_by_idx(2)
+    assert steps_manager.code()[:len(code)] == code
+
+
+def _decode_columnar_sheet_data(sheet_data_array):
+    # Mirrors the decoding in getSheetDataArrayFromString on the frontend
+    for sheet_data in sheet_data_array:
+        for column_data in sheet_data['data']:
+            column_data_buffer = column_data.pop('columnDataBuffer', None)
+            if column_data_buffer is None:
+                continue
+            values = np.frombuffer(base64.b64decode(column_data_buffer['data']), dtype='<f8' if column_data_buffer['dtype'] == 'float64' else np.uint8)
+            if column_data_buffer['dtype'] == 'uint8':
+                column_data['columnData'] = [bool(value) for value in values]
+            else:
+                column_data['columnData'] = [float(value) if np.isfinite(value) else 'NaN' for value in values]
+    return sheet_data_array
+
+
+def test_columnar_sheet_data_decodes_to_json_sheet_data():
+    df = pd.DataFrame({
+        'A': [1, 2, 3],
+        'B': [1.5, np.nan, np.inf],
+        'C': ['a', None, 'c'],
+        'D': [True, False, True],
+        'E': pd.to_datetime(['2020-01-01', None, '2020-01-03'])
+    })
+    mito = create_mito_wrapper(df)
+    steps_manager = mito.mito_backend.steps_manager
+    json_sheet_data = json.loads(steps_manager.sheet_data_json)
+
+    steps_manager.sheet_data_encoding = SHEET_DATA_ENCODING_COLUMNAR
+    columnar_sheet_data = json.loads(steps_manager.sheet_data_json)
+    assert [column_data['columnData'] for column_data in columnar_sheet_data[0]['data']][:2] == [[], []]
+    assert _decode_columnar_sheet_data(columnar_sheet_data) == json_sheet_data
+
+    # Edits are also sent in the columnar encoding
+    mito.set_formula('=A * 2', 0, 'A', add_column=False)
+    columnar_sheet_data = json.loads(steps_manager.sheet_data_json)
+    assert 'columnDataBuffer' in columnar_sheet_data[0]['data'][0]
+
+    steps_manager.sheet_data_encoding = SHEET_DATA_ENCODING_JSON
+    assert _decode_columnar_sheet_data(columnar_sheet_data) == json.loads(steps_manager.sheet_data_json)
+
+
+def test_sheet_data_encoding_can_be_passed_to_the_sheet():
+    df = pd.DataFrame({'A': [1, 2, 3], 'B': ['a', None, 'c']})
+    json_sheet_data = json.loads(MitoBackend(df).steps_manager.sheet_data_json)
+
+    mito = create_mito_wrapper(mito_backend=MitoBackend(df, sheet_data_encoding=SHEET_DATA_ENCODING_COLUMNAR))
+    columnar_sheet_data = json.loads(mito.mito_backend.steps_manager.sheet_data_json)
+    assert 'columnDataBuffer' in columnar_sheet_data[0]['data'][0]
+    assert columnar_sheet_data[0]['data'][1]['columnData'] == ['a', 'NaN', 'c']
+    assert _decode_columnar_sheet_data(columnar_sheet_data) == json_sheet_data
+
+    with pytest.raises(ValueError):
+        MitoBackend(df, sheet_data_encoding='parquet')
+
@@ -31,7 +31,7 @@ from mitosheet.types import (CodeOptions, ColumnHeader, ColumnHeaderWithFilter,
                              ColumnIDWithFilter, ColumnIDWithPivotTransform,
                              DataframeFormat, FormulaAppliedToType, GraphID,
                              MultiLevelColumnHeader, Filter, FilterGroup, OperatorType)
-from mitosheet.utils import NpEncoder, dfs_to_array_for_json, get_new_id
+from mitosheet.utils import SHEET_DATA_ENCODING_COLUMNAR, NpEncoder, dfs_to_array_for_json, get_new_id
 
 
 def check_transpiled_code_after_call(func):
@@ -115,7 +115,8 @@ def check_dataframes_equal(test_wrapper: "MitoWidgetTestWrapper") -> None:
         test_wrapper.mito_backend.steps_manager.curr_step.column_formulas,
         test_wrapper.mito_backend.steps_manager.curr_step.column_filters,
         test_wrapper.mito_backend.steps_manager.curr_step.column_ids,
-        test_wrapper.mito_backend.steps_manager.curr_step.df_formats
+        test_wrapper.mito_backend.steps_manager.curr_step.df_formats,
+        columnar=test_wrapper.mito_backend.steps_manager.sheet_data_encoding == SHEET_DATA_ENCODING_COLUMNAR
     ), cls=NpEncoder)
 
 
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Copyright (c) Saga Inc.
+# Distributed under the terms of the GPL License.
+"""
+Contains tests for the cache of the user.json file.
+"""
+import builtins
+import datetime
+import json
+import os
+
+from mitosheet.experiments.experiment_utils import set_experiment
+from mitosheet.enterprise.license_key import encode_date_to_license
+from mitosheet.enterprise.mito_config import get_enterprise_from_config, get_license_expiration_date
+from mitosheet.tests.user.conftest import write_fake_user_json
+from mitosheet.user.db import USER_JSON_PATH, get_user_field, get_user_json_object, set_user_field
+from mitosheet.user.schemas import UJ_EXPERIMENT, UJ_USER_EMAIL, USER_JSON_DEFAULT
+
+
+def count_user_json_reads(monkeypatch):
+    user_json_reads = []
+    original_open = builtins.open
+    def open(file, *args, **kwargs):
+        if isinstance(file, (str, os.PathLike)) and os.fspath(file) == USER_JSON_PATH:
+            user_json_reads.append(file)
+        return original_open(file, *args, **kwargs)
+    monkeypatch.setattr(builtins, 'open', open)
+    return user_json_reads
+
+
+def test_user_fields_are_read_from_cache_till_file_changes(monkeypatch):
+    write_fake_user_json(USER_JSON_DEFAULT, user_email='first@mito.com')
+    assert get_user_field(UJ_USER_EMAIL) == 'first@mito.com'
+
+    user_json_reads = count_user_json_reads(monkeypatch)
+    for _ in range(10):
+        assert get_user_field(UJ_USER_EMAIL) == 'first@mito.com'
+    assert len(user_json_reads) == 0
+
+    # Writing the file with another process changes its size, so we read it again
+    user_json = get_user_json_object()
+    user_json[UJ_USER_EMAIL] = 'second_email@mito.com'
+    monkeypatch.undo()
+    with open(USER_JSON_PATH, 'w+') as f:
+        f.write(json.dumps(user_json))
+    assert get_user_field(UJ_USER_EMAIL) == 'second_email@mito.com'
+
+    os.remove(USER_JSON_PATH)
+    assert get_user_field(UJ_USER_EMAIL) is None
+
+
+def test_set_user_field_writes_through_cache(monkeypatch):
+    write_fake_user_json(USER_JSON_DEFAULT, user_email='first@mito.com')
+    assert get_user_field(UJ_USER_EMAIL) == 'first@mito.com'
+    user_json_reads = count_user_json_reads(monkeypatch)
+
+    set_user_field(UJ_USER_EMAIL, 'second@mito.com')
+    assert get_user_field(UJ_USER_EMAIL) == 'second@mito.com'
+
+    # We only opened the file to write it
+    assert len(user_json_reads) == 1
+    monkeypatch.undo()
+
+    with open(USER_JSON_PATH) as f:
+        assert json.load(f)[UJ_USER_EMAIL] == 'second@mito.com'
+    os.remove(USER_JSON_PATH)
+
+
+def test_modifying_user_fields_does_not_modify_cache():
+    write_fake_user_json(USER_JSON_DEFAULT)
+    get_user_json_object()[UJ_USER_EMAIL] = 'changed@mito.com'
+    get_user_field('mitosheet_last_fifty_usages').append('changed')
+
+    assert get_user_field(UJ_USER_EMAIL) == ''
+    assert 'changed' not in get_user_field('mitosheet_last_fifty_usages')
+    os.remove(USER_JSON_PATH)
+
+
+def test_license_is_decoded_once():
+    license_key = encode_date_to_license(datetime.date.today() + datetime.timedelta(days=1))
+    get_license_expiration_date.cache_clear()
+
+    for _ in range(10):
+        assert get_enterprise_from_config(None, license_key)
+
+    assert get_license_expiration_date.cache_info().misses == 1
+    assert get_license_expiration_date.cache_info().hits == 9
+
+
+def test_set_experiment_without_experiment_field():
+    user_json_object = {key: value for key, value in USER_JSON_DEFAULT.items() if key != UJ_EXPERIMENT}
+    write_fake_user_json(user_json_object)
+
+    set_experiment('test_experiment', 'B')
+
+    assert get_user_field(UJ_EXPERIMENT) == {'experiment_id': 'test_experiment', 'variant': 'B'}
+    write_fake_user_json(USER_JSON_DEFAULT)
@@ -11,7 +11,6 @@ container and generates transpiled Python code.
 from typing import List, Optional
 from mitosheet.array_utils import deduplicate_array
 from mitosheet.code_chunks.code_chunk import CodeChunk
-from mitosheet.code_chunks.code_chunk_utils import get_code_chunks
 from mitosheet.code_chunks.postprocessing import POSTPROCESSING_CODE_CHUNKS
 from mitosheet.preprocessing import PREPROCESS_STEP_PERFORMERS
 
@@ -62,7 +61,7 @@ def transpile(
         imports_code.extend(preprocess_imports)
 
     # We only transpile up to the currently checked out step
-    all_code_chunks: List[CodeChunk] = get_code_chunks(steps_manager.steps_including_skipped[:steps_manager.curr_step_idx + 1], optimize=optimize)
+    all_code_chunks: List[CodeChunk] = steps_manager.get_code_chunks(optimize=optimize)
 
     # We also make sure to include all the post_processing code chunks, which are those
     # code chunks that are always at the end of the dataframe
@@ -74,10 +73,11 @@ def transpile(
         (gotten_code, code_chunk_imports) = code_chunk.get_code()
         (optional_code, optional_code_imports) = code_chunk.get_optional_code_that_successfully_executed()
 
-        # Make sure to not generate comments or code for steps with no code 
+        # Make sure to not generate comments or code for steps with no code. Note that 
+        # we do not modify the gotten_code, as code chunks are cached between transpiles
         if len(gotten_code) > 0:
             if add_comments:
-                gotten_code.insert(0, comment)
+                code.append(comment)
             code.extend(gotten_code)
             code.extend(optional_code)
 
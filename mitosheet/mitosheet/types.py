@@ -387,6 +387,9 @@ if sys.version_info[:3] > (3, 8, 0):
 
     DefaultEditingMode = Literal['cell', 'column']
 
+    # json sends every column as a list, columnar sends the numeric and boolean columns as typed-array buffers
+    SheetDataEncoding = Literal['json', 'columnar']
+
     UserDefinedFunctionParamType = Literal['any', 'str', 'int', 'float', 'bool', 'DataFrame', 'ColumnHeader', 'List[int]', 'Dict[str, str]']
 
     class MitoTheme(TypedDict):
@@ -414,6 +417,20 @@ if sys.version_info[:3] > (3, 8, 0):
         df_source: str
         overwrite: Optional[OverwriteSheetIndexParams]
 
+    # Controls which steps keep their prev and post states in memory. Full states are kept
+    # for every checkpoint_interval-th executed step, and the rest are rebuilt on demand. If
+    # max_step_history_bytes is set, checkpoints are also dropped until the history fits
+    class StepStateRetentionPolicy(TypedDict):
+        checkpoint_interval: int
+        max_step_history_bytes: Optional[int]
+
+    class StepHistoryMemoryFootprint(TypedDict):
+        total_bytes: int
+        num_steps: int
+        num_steps_with_states: int
+        num_steps_with_evicted_states: int
+        checkpoint_step_indexes: List[int]
+
 else:
     Filter = Any #type: ignore
     FilterGroup = Any #type: ignore
@@ -449,6 +466,8 @@ else:
     UserDefinedImporterParamType = Any # type: ignore
     OverwriteSheetIndexParams = Any # type: ignore
     ExecuteThroughTranspileNewDataframeParams = Any # type: ignore
+    StepStateRetentionPolicy = Any # type: ignore
+    StepHistoryMemoryFootprint = Any # type: ignore
     UserDefinedFunctionParamType = Any # type: ignore
     MitoTheme = Any # type: ignore
     MitoFrontendSelection = Any # type: ignore
@@ -457,6 +476,7 @@ else:
     ColumnDefinintion = Any # type: ignore
     ColumnDefinitions = Any # type: ignore
     DefaultEditingMode = Any # type: ignore
+    SheetDataEncoding = Any # type: ignore
 
     ParamName = str # type: ignore
     ParamType = str # type: ignore
@@ -474,12 +494,21 @@ FormulaAppliedToType = Union[FormulaLocationEntireColumn, FormulaLocationToSpeci
 
 
 if sys.version_info[:3] > (3, 8, 0):
-    from typing import TypedDict
+    from typing import TypedDict, Literal
+
+    class FormulaIndexRange(TypedDict):
+        type: Literal['range']
+        start: int
+        stop: int
+        step: int
 
     class FrontendFormulaAndLocation(TypedDict):
         frontend_formula: FrontendFormula
         location: FormulaAppliedToType
-        index: List[Any]
+        # The index when the formula was written. If the index is a range, we just store
+        # the range, and otherwise we store all of the index labels
+        index: Union[FormulaIndexRange, List[Any]]
 
 else:
+    FormulaIndexRange = Any # type:ignore
     FrontendFormulaAndLocation = Any # type:ignore
\ No newline at end of file
@@ -9,21 +9,60 @@ Helpers for accessing the user.json file
 """
 import os
 import json
-from typing import Any, Dict, Optional
+from copy import deepcopy
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
 from mitosheet.save_paths import MITO_FOLDER
 
 # The path of the user.json file
 USER_JSON_PATH = os.path.join(MITO_FOLDER, 'user.json')
 
+# We cache the user.json object, along with the modification time, size and inode of the 
+# file when we read it, and only read the file again once one of them changes. The lock 
+# guards the cache, as the API threads read user fields as well.
+_user_json_cache: Optional[Tuple[Tuple[int, int, int], Dict[str, Any]]] = None
+_user_json_cache_lock = Lock()
+
+
+def _get_user_json_file_version() -> Optional[Tuple[int, int, int]]:
+    try:
+        stat_result = os.stat(USER_JSON_PATH)
+        return (stat_result.st_mtime_ns, stat_result.st_size, stat_result.st_ino)
+    except OSError:
+        return None
+
+
+def _read_user_json_object() -> Optional[Dict[str, Any]]:
+    """
+    Returns the cached user json object, reading the user.json file if it has changed
+    since it was cached. The returned object must not be modified.
+    """
+    global _user_json_cache
+    with _user_json_cache_lock:
+        file_version = _get_user_json_file_version()
+        if file_version is None:
+            _user_json_cache = None
+            return None
+
+        if _user_json_cache is not None and _user_json_cache[0] == file_version:
+            return _user_json_cache[1]
+
+        try:
+            with open(USER_JSON_PATH) as f:
+                user_json_object = json.load(f)
+        except:
+            _user_json_cache = None
+            return None
+
+        _user_json_cache = (file_version, user_json_object)
+        return user_json_object
+
+
 def get_user_json_object() -> Optional[Dict[str, Any]]:
     """
     Gets the entire user json object
     """
-    try:
-        with open(USER_JSON_PATH) as f:
-            return json.load(f)
-    except: 
-        return None
+    return deepcopy(_read_user_json_object())
 
 def get_user_field(field: str) -> Optional[Any]:
     """
@@ -31,8 +70,7 @@ def get_user_field(field: str) -> Optional[Any]:
     but may read a different file if it passed
     """
     try:
-        with open(USER_JSON_PATH) as f:
-            return json.load(f)[field]
+        return deepcopy(_read_user_json_object()[field]) # type: ignore
     except: 
         return None
 
@@ -40,15 +78,22 @@ def set_user_json_object(user_json_object: Dict[str, Any]) -> None:
     """
     Updates the value of a specific feild in user.json
     """
-    with open(USER_JSON_PATH, 'w+') as f:
-        f.write(json.dumps(user_json_object))
+    global _user_json_cache
+    with _user_json_cache_lock:
+        with open(USER_JSON_PATH, 'w+') as f:
+            f.write(json.dumps(user_json_object))
+
+        # The write goes through the cache, so we don't read the file we just wrote
+        file_version = _get_user_json_file_version()
+        _user_json_cache = (file_version, deepcopy(user_json_object)) if file_version is not None else None
 
 def set_user_field(field: str, value: Any) -> None:
     """
     Updates the value of a specific feild in user.json
     """
-    with open(USER_JSON_PATH, 'r') as user_file_old:
-        old_user_json = json.load(user_file_old)
-        old_user_json[field] = value
-        with open(USER_JSON_PATH, 'w+') as f:
-            f.write(json.dumps(old_user_json))
+    old_user_json = get_user_json_object()
+    if old_user_json is None:
+        raise Exception(f'Cannot set {field} as {USER_JSON_PATH} does not exist or is not valid JSON')
+
+    old_user_json[field] = value
+    set_user_json_object(old_user_json)
@@ -6,18 +6,20 @@
 """
 Contains helpful utility functions
 """
+import base64
 import json
 import pprint
 from random import randint
 import random
 import re
 import uuid
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
 import os
 import keyword
 
 import numpy as np
 import pandas as pd
+from pandas.api.types import infer_dtype
 
 from mitosheet.column_headers import ColumnIDMap, get_column_header_display
 from mitosheet.is_type_utils import get_float_dt_td_columns, is_int_dtype
@@ -36,6 +38,9 @@ from mitosheet.excel_utils import get_df_name_as_valid_sheet_name
 
 from mitosheet.public.v3.formatting import add_formatting_to_excel_sheet
 
+if TYPE_CHECKING:
+    from mitosheet.pro.conditional_formatting_utils import ConditionalFormattingResultCache
+
 # We only send the first 1500 rows of a dataframe; note that this
 # must match this variable defined on the front-end
 MAX_ROWS = 1_500
@@ -46,6 +51,12 @@ ACCOUNTING = 'accounting'
 PERCENTAGE = 'percentage'
 SCIENTIFIC_NOTATION = 'scientific notation'
 
+# The encodings that the sheet data can be sent to the front-end in. The 
+# columnar encoding sends numeric and boolean columns as base64 encoded 
+# typed-array buffers, which are decoded in getSheetDataArrayFromString
+SHEET_DATA_ENCODING_JSON = 'json'
+SHEET_DATA_ENCODING_COLUMNAR = 'columnar'
+
 def get_first_unused_dataframe_name(existing_df_names: List[str], new_dataframe_name: str) -> str:
     """
     Appends _1, _2, .. to df name until it finds an unused 
@@ -141,7 +152,9 @@ def dfs_to_array_for_json(
         column_formulas_array: List[Dict[ColumnID, List[FrontendFormulaAndLocation]]],
         column_filters_array: List[Dict[ColumnID, Any]],
         column_ids: ColumnIDMap,
-        df_formats: List[DataframeFormat]
+        df_formats: List[DataframeFormat],
+        columnar: bool=False,
+        conditional_formatting_result_cache: Optional['ConditionalFormattingResultCache']=None
     ) -> List:
 
     new_array = []
@@ -160,7 +173,9 @@ def dfs_to_array_for_json(
                     df_formats[sheet_index],
                     # We only send the first 1500 rows and 1500 columns
                     max_rows=MAX_ROWS,
-                    max_columns=MAX_COLUMNS
+                    max_columns=MAX_COLUMNS,
+                    columnar=columnar,
+                    conditional_formatting_result_cache=conditional_formatting_result_cache
                 ) 
             )
         else:
@@ -411,7 +426,9 @@ def df_to_json_dumpsable(
         column_headers_to_column_ids: Dict[ColumnHeader, ColumnID],
         df_format: DataframeFormat,
         max_rows: Optional[int]=MAX_ROWS, # How many items you want to display. None when using this function to get unique value counts
-        max_columns: int=MAX_COLUMNS # How many columns you want to display. Unlike max_rows, this is always defined
+        max_columns: int=MAX_COLUMNS, # How many columns you want to display. Unlike max_rows, this is always defined
+        columnar: bool=False, # If the numeric and boolean columns should be sent as typed-array buffers
+        conditional_formatting_result_cache: Optional['ConditionalFormattingResultCache']=None
     ) -> Dict[str, Any]:
     """
     Returns a dataframe and other metadata represented in a way that can be turned into a 
@@ -428,6 +445,7 @@ def df_to_json_dumpsable(
             columnHeader: (string | number);
             columnDtype: string;
             columnData: (string | number)[];
+            columnDataBuffer?: {dtype: 'float64' | 'uint8', data: string};
         }[];
         columnIDsMap: ColumnIDsMap;
         columnSpreadsheetCodeMap: Record<string, string>;
@@ -437,11 +455,14 @@ def df_to_json_dumpsable(
         df_format: DataframeFormat;
         conditionalFormattingResult: ConditionalFormattingResult
     }
+
+    If columnar is True, the numeric and boolean columns have an empty columnData, 
+    and their data is instead in the columnDataBuffer.
     """
 
     (num_rows, num_columns) = original_df.shape 
 
-    json_obj = convert_df_to_parsed_json(original_df, max_rows=max_rows, max_columns=max_columns)
+    df = get_df_for_display(original_df, max_rows=max_rows, max_columns=max_columns)
 
     final_data = []
     column_dtype_map = {}
@@ -455,10 +476,12 @@ def df_to_json_dumpsable(
             'columnData': [],
         }
         column_dtype_map[column_id] = str(original_df[column_header].dtype)
-        for row in json_obj['data']:
-            # If we're beyond the max columns, we might not have data, and we leave column data empty
-            # in this case and don't append anything
-            column_final_data['columnData'].append(row[column_index] if column_index < MAX_COLUMNS else None)
+
+        # If we're beyond the max columns, we don't have data, and so we fill the column with None
+        if column_index >= df.shape[1]:
+            column_final_data['columnData'] = [None] * len(df)
+        else:
+            column_final_data.update(get_column_data_json(df.iloc[:, column_index], columnar=columnar))
         
         final_data.append(column_final_data) 
 
@@ -480,7 +503,7 @@ def df_to_json_dumpsable(
         'columnFormulasMap': column_formulas,
         'columnFiltersMap': column_filters,
         'columnDtypeMap': column_dtype_map,
-        'index': json_obj['index'],
+        'index': get_index_json(df),
         'dfFormat': df_format,
         'conditionalFormattingResult': get_conditonal_formatting_result(
             state,
@@ -488,6 +511,7 @@ def df_to_json_dumpsable(
             original_df,
             df_format['conditional_formats'],
             max_rows=max_rows,
+            conditional_formatting_result_cache=conditional_formatting_result_cache
         )
 
     }
@@ -500,9 +524,72 @@ def get_row_data_array(df: pd.DataFrame) -> List[Any]:
     json_obj = convert_df_to_parsed_json(df)
     return json_obj['data']
 
-def convert_df_to_parsed_json(original_df: pd.DataFrame, max_rows: Optional[int]=MAX_ROWS, max_columns: int=MAX_COLUMNS) -> Dict[str, Any]:
+def _get_column_data_list(column: pd.Series) -> List[Any]:
     """
-    Returns a dataframe as a json object with the correct formatting
+    Returns the data in a (display formatted) column as a list that can be 
+    turned into JSON, where null values are 'NaN' for display in the frontend.
+    """
+    if infer_dtype(column, skipna=True) == 'string':
+        # Strings are already valid JSON values, so we don't need pandas to encode and decode them
+        return np.where(column.isna().to_numpy(), 'NaN', column.to_numpy(dtype=object)).tolist()
+
+    column_data = json.loads(column.to_json(orient="values"))
+    return ['NaN' if value is None else value for value in column_data]
+
+
+def _get_column_data_buffer(column: pd.Series) -> Optional[Dict[str, str]]:
+    """
+    Returns the data in a numeric or boolean column as a base64 encoded buffer of 
+    little-endian float64s or uint8s, which the frontend reads as a typed array. 
+    
+    Returns None for all other columns, which must be sent as a list instead.
+    """
+    dtype = column.dtype
+    if not isinstance(dtype, np.dtype):
+        return None
+
+    if dtype.kind == 'b':
+        return {
+            'dtype': 'uint8',
+            'data': base64.b64encode(column.to_numpy(dtype=np.uint8).tobytes()).decode('ascii')
+        }
+    elif dtype.kind in 'iuf':
+        values = column.to_numpy(dtype='<f8')
+        if dtype.kind == 'f':
+            # Match the 10 digits of precision the JSON encoding uses
+            values = np.round(values, 10)
+        return {
+            'dtype': 'float64',
+            'data': base64.b64encode(values.tobytes()).decode('ascii')
+        }
+    
+    return None
+
+
+def get_column_data_json(column: pd.Series, columnar: bool=False) -> Dict[str, Any]:
+    """
+    Returns the columnData of a column that has been formatted for display with
+    get_df_for_display. If columnar is True, numeric and boolean columns instead
+    have an empty columnData and a columnDataBuffer.
+    """
+    column_data_buffer = _get_column_data_buffer(column) if columnar else None
+    if column_data_buffer is not None:
+        return {'columnData': [], 'columnDataBuffer': column_data_buffer}
+    return {'columnData': _get_column_data_list(column)}
+
+
+def get_index_json(df: pd.DataFrame) -> List[Any]:
+    """
+    Returns the index of a dataframe that has been formatted for display with 
+    get_df_for_display as a list that can be turned into JSON.
+    """
+    return json.loads(df.iloc[:, :0].to_json(orient="split"))['index']
+
+
+def get_df_for_display(original_df: pd.DataFrame, max_rows: Optional[int]=MAX_ROWS, max_columns: int=MAX_COLUMNS) -> pd.DataFrame:
+    """
+    Returns the first max_rows rows and max_columns columns of the dataframe, with
+    the dates and timedeltas in the data and index formatted as strings for display.
     """
     if max_rows is None:
         df = original_df.copy(deep=True) 
@@ -534,6 +621,15 @@ def convert_df_to_parsed_json(original_df: pd.DataFrame, max_rows: Optional[int]
     elif isinstance(df.index, pd.TimedeltaIndex):
         df.index = df.index.to_series().apply(lambda x: str(x))
 
+    return df
+
+
+def convert_df_to_parsed_json(original_df: pd.DataFrame, max_rows: Optional[int]=MAX_ROWS, max_columns: int=MAX_COLUMNS) -> Dict[str, Any]:
+    """
+    Returns a dataframe as a json object with the correct formatting
+    """
+    df = get_df_for_display(original_df, max_rows=max_rows, max_columns=max_columns)
+
     json_obj = json.loads(df.to_json(orient="split"))
     # Then, we go through and find all the null values (which are infinities),
     # and set them to 'NaN' for display in the frontend.
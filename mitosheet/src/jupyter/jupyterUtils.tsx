@@ -18,6 +18,7 @@
 
 import {
     AnalysisData,
+    ColumnDataBuffer,
     MitoAPI,
     PublicInterfaceVersion, SheetData, UserProfile
 } from "../mito";
@@ -108,11 +109,37 @@ export const getArgs = (analysisToReplayName: string | undefined, inputCellExecu
 
 
 
+const getColumnDataFromBuffer = (columnDataBuffer: ColumnDataBuffer): (string | number | boolean)[] => {
+    const binaryString = atob(columnDataBuffer.data);
+    const bytes = new Uint8Array(binaryString.length);
+    for (let i = 0; i < binaryString.length; i++) {
+        bytes[i] = binaryString.charCodeAt(i);
+    }
+
+    if (columnDataBuffer.dtype === 'uint8') {
+        return Array.from(bytes, value => value === 1);
+    }
+    // Just as in the JSON encoding, we display NaNs and infinities as NaN
+    return Array.from(new Float64Array(bytes.buffer), value => Number.isFinite(value) ? value : 'NaN');
+}
+
 export const getSheetDataArrayFromString = (sheet_data_json: string): SheetData[] => {
     if (sheet_data_json.length === 0) {
         return []
     }
-    return JSON.parse(sheet_data_json);
+    const sheetDataArray: SheetData[] = JSON.parse(sheet_data_json);
+
+    // If the sheet data is in the columnar encoding, we decode the numeric columns
+    sheetDataArray.forEach(sheetData => {
+        sheetData.data.forEach(columnData => {
+            if (columnData.columnDataBuffer !== undefined) {
+                columnData.columnData = getColumnDataFromBuffer(columnData.columnDataBuffer);
+                delete columnData.columnDataBuffer;
+            }
+        })
+    })
+
+    return sheetDataArray;
 }
 
 export const getUserProfileFromString = (user_profile_json: string): UserProfile => {
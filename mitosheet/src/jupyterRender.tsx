@@ -12,60 +12,70 @@ import {
 } from './jupyter/jupyterUtils';
 import { getCommSend } from './jupyter/comm';
 
-// We replace the following byte arrays with the real byte arrays of the utf8 encoded
-// JSON for the sheet data array, etc. We pass this encoded because the JSON parsing
-// when we don't gets really complicated trying to replace \t, etc.
-// Do not edit the following lines without updating the get_mito_frontend_code which searches 
-// for this code exactly to replace it.
-const sheetDataBytes = new Uint8Array(['REPLACE_THIS_WITH_SHEET_DATA_BYTES' as unknown as number]);
-const analysisDataBytes = new Uint8Array(['REPLACE_THIS_WITH_ANALYSIS_DATA_BYTES' as unknown as number]);
-const userProfileBytes = new Uint8Array(['REPLACE_THIS_WITH_USER_PROFILE_BYTES' as unknown as number]);
-
-const sheetDataArray = getSheetDataArrayFromString(new TextDecoder().decode(sheetDataBytes));
-const analysisData = getAnalysisDataFromString(new TextDecoder().decode(analysisDataBytes));
-const userProfile = getUserProfileFromString(new TextDecoder().decode(userProfileBytes));
-
-// We create a distinct comm channel for each Mito instance, so that they can 
-// each communicate with the backend seperately. We replace these values when
-// rendering the mitosheet as well
-const commTargetID = 'REPLACE_THIS_WITH_COMM_TARGET_ID';
-const divID = 'REPLACE_THIS_WITH_DIV_ID';
-const kernelID = 'REPLACE_THIS_WITH_KERNEL_ID';
-
 const css = `REPLACE_THIS_WITH_CSS`;
 
 // Append the style to the head. Note that we need to do this in the JS
-// because style tags can only be childen of the head element
+// because style tags can only be childen of the head element. As this bundle
+// is only loaded once per page, this only happens once
 const style = document.createElement('style');
 style.appendChild(document.createTextNode(css));
 document.head.append(style)
 
-// Then, render the mitosheet to the div id
-const div = document.getElementById(divID);
-console.log("Rendering to div", div);
+/**
+ * The sheet data array, etc are passed as base64 encoded utf8 encoded JSON. We pass this 
+ * encoded because the JSON parsing when we don't gets really complicated trying to replace \t, etc.
+ */
+const decodeBase64 = (base64String: string): string => {
+    return new TextDecoder().decode(Uint8Array.from(atob(base64String), character => character.charCodeAt(0)));
+}
 
 /**
- * The jupyter send function wraps a comm, and assumes the backend always will respond
- * with a single message.
+ * Renders a mitosheet to the div with the given id. The bundle that contains this function is loaded
+ * once per page, and then every mitosheet.sheet() call renders by calling this function. 
+ * 
+ * Do not edit the arguments of this function without updating the get_mito_frontend_code which
+ * writes the call to it.
  */
-async function getSendFunction() {
-    const sendFromComm = await getCommSend(kernelID, commTargetID);
-    return sendFromComm;
+export function renderMitosheet(
+    divID: string,
+    kernelID: string,
+    commTargetID: string,
+    sheetDataBase64: string,
+    analysisDataBase64: string,
+    userProfileBase64: string,
+): void {
+    const sheetDataArray = getSheetDataArrayFromString(decodeBase64(sheetDataBase64));
+    const analysisData = getAnalysisDataFromString(decodeBase64(analysisDataBase64));
+    const userProfile = getUserProfileFromString(decodeBase64(userProfileBase64));
+
+    // Then, render the mitosheet to the div id
+    const div = document.getElementById(divID);
+    console.log("Rendering to div", div);
+
+    /**
+     * The jupyter send function wraps a comm, and assumes the backend always will respond
+     * with a single message. We create a distinct comm channel for each Mito instance, so 
+     * that they can each communicate with the backend seperately.
+     */
+    async function getSendFunction() {
+        const sendFromComm = await getCommSend(kernelID, commTargetID);
+        return sendFromComm;
 
+    }
+    ReactDOM.render(
+        <Mito
+            getSendFunction={getSendFunction}
+            sheetDataArray={sheetDataArray}
+            analysisData={analysisData}
+            userProfile={userProfile}
+            jupyterUtils={{
+                getArgs: getArgs,
+                writeAnalysisToReplayToMitosheetCall: writeAnalysisToReplayToMitosheetCall,
+                writeGeneratedCodeToCell: writeGeneratedCodeToCell,
+                writeCodeSnippetCell: writeCodeSnippetCell,
+                overwriteAnalysisToReplayToMitosheetCall: overwriteAnalysisToReplayToMitosheetCall,
+            }}
+        />,
+        div
+    )
 }
-ReactDOM.render(
-    <Mito
-        getSendFunction={getSendFunction}
-        sheetDataArray={sheetDataArray}
-        analysisData={analysisData}
-        userProfile={userProfile}
-        jupyterUtils={{
-            getArgs: getArgs,
-            writeAnalysisToReplayToMitosheetCall: writeAnalysisToReplayToMitosheetCall,
-            writeGeneratedCodeToCell: writeGeneratedCodeToCell,
-            writeCodeSnippetCell: writeCodeSnippetCell,
-            overwriteAnalysisToReplayToMitosheetCall: overwriteAnalysisToReplayToMitosheetCall,
-        }}
-    />,
-    div
-)
@@ -1,7 +1,7 @@
 // Utilities for the cell editor
 
 import { FunctionDocumentationObject, functionDocumentationObjects } from "../../../data/function_documentation";
-import { AnalysisData, EditorState, FrontendFormulaAndLocation, IndexLabel, MitoSelection, SheetData } from "../../../types";
+import { AnalysisData, EditorState, FormulaIndexRange, FrontendFormulaAndLocation, IndexLabel, MitoSelection, SheetData } from "../../../types";
 import { getDisplayColumnHeader, isPrimitiveColumnHeader, rowIndexToColumnHeaderLevel } from "../../../utils/columnHeaders";
 import { getUpperLeftAndBottomRight } from "../selectionUtils";
 import { getCellDataFromCellIndexes } from "../utils";
@@ -371,10 +371,25 @@ export const getDocumentationFunction = (formula: string, selectionStart: number
     }
 }
 
-export const getNewIndexLabelAtRowOffsetFromOtherIndexLabel = (index: IndexLabel[], indexLabel: IndexLabel | undefined, rowOffset: number): IndexLabel | undefined => {
+export const getNewIndexLabelAtRowOffsetFromOtherIndexLabel = (index: IndexLabel[] | FormulaIndexRange, indexLabel: IndexLabel | undefined, rowOffset: number): IndexLabel | undefined => {
     if (indexLabel === undefined) {
         return undefined;
     }
+
+    // If the index is a range, we can calculate the new index label without the list of index labels
+    if (!Array.isArray(index)) {
+        const numIndexLabels = Math.max(Math.ceil((index.stop - index.start) / index.step), 0);
+        const indexOfIndexLabel = typeof indexLabel === 'number' ? (indexLabel - index.start) / index.step : -1;
+        if (!Number.isInteger(indexOfIndexLabel) || indexOfIndexLabel < 0 || indexOfIndexLabel >= numIndexLabels) {
+            return undefined;
+        }
+
+        const indexOfNewLabel = indexOfIndexLabel - rowOffset;
+        if (indexOfNewLabel < 0 || indexOfNewLabel >= numIndexLabels) {
+            return undefined;
+        }
+        return index.start + indexOfNewLabel * index.step;
+    }
     
     const indexOfIndexLabel = index.indexOf(indexLabel);
     if (indexOfIndexLabel === -1) {
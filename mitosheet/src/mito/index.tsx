@@ -1,6 +1,6 @@
 export { Mito } from './Mito';
 export { 
-    AnalysisData, GraphData, GraphDataArray as graphDataArray, GraphParamsBackend, PublicInterfaceVersion, SheetData, UserProfile,
+    AnalysisData, ColumnDataBuffer, GraphData, GraphDataArray as graphDataArray, GraphParamsBackend, PublicInterfaceVersion, SheetData, UserProfile,
     MitoTheme
 } from "./types"
 
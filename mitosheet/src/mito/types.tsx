@@ -287,13 +287,26 @@ export type IndexLabel = string | number;
 
 export type FormulaLocation = {'type': 'entire_column'} | {'type': 'specific_index_labels', 'index_labels': IndexLabel[]}
 
+// The index when a formula was written, if that index was a range of integers
+export type FormulaIndexRange = {'type': 'range', 'start': number, 'stop': number, 'step': number}
+
 export type FrontendFormulaAndLocation = {
     'frontend_formula': Formula,
     'location': FormulaLocation,
-    'index': IndexLabel[]
+    'index': IndexLabel[] | FormulaIndexRange
 }
 
 
+/**
+ * A numeric or boolean column sent in the columnar sheet data encoding, as a base64 
+ * encoded buffer of little-endian float64s or uint8s. It is decoded into the columnData
+ * of the column in getSheetDataArrayFromString.
+ */
+export type ColumnDataBuffer = {
+    dtype: 'float64' | 'uint8';
+    data: string;
+};
+
 /**
  * Data that will be displayed in the sheet itself.
  * 
@@ -318,6 +331,7 @@ export type SheetData = {
         columnHeader: ColumnHeader;
         columnDtype: string;
         columnData: (string | number | boolean)[];
+        columnDataBuffer?: ColumnDataBuffer;
     }[];
     columnIDsMap: ColumnIDsMap;
     columnFormulasMap: Record<ColumnID, FrontendFormulaAndLocation[]>;